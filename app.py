@@ -1,30 +1,61 @@
 import os
-import asyncio
+import io
 import json
-import tempfile
+import mimetypes
 import uuid
 from datetime import datetime
 from functools import wraps
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file
+from collections.abc import Mapping
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file, abort
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import FileSystemBytecodeCache
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
-import pdfkit
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 # Import components
-from src.classifiers.enhanced_scenario_classifier import EnhancedScenarioClassifier
-from src.policy_analyzer import PolicyAnalyzer
-from src.risk_assessor import RiskAssessor
-from src.explanation_generator import ExplanationGenerator
-from src.recommendation_engine import RecommendationEngine
+from src.registry import registry
+from src.rules.loader import RuleError, rule_store
+from src.services.pdf_renderer import PDFRenderService
+from src.services.result_store import ResultStore
+from src.services.sample_analyses import SampleAnalysisCache
+from src.services.upload_ingest import UploadIngestService
+from src.sample_scenarios import SAMPLE_SCENARIOS
+from src.services.static_assets import StaticAssetBuilder
+from src.utils.fragment_cache import FragmentCache
+from src.config.settings import settings
+from src.utils import profiler
+
+class ResultJSONProvider(DefaultJSONProvider):
+    """Serializes the slotted analysis results (src.results) as the objects they read as."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Mapping):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ResultJSONProvider(app)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev_secret_key")
 
+# Keep compiled templates on disk across restarts and rendered fragments in memory
+os.makedirs(settings.TEMPLATE_BYTECODE_CACHE_DIR, exist_ok=True)
+app.jinja_options = {
+    **app.jinja_options,
+    "bytecode_cache": FileSystemBytecodeCache(settings.TEMPLATE_BYTECODE_CACHE_DIR),
+    "extensions": ["src.utils.fragment_cache.FragmentCacheExtension"]
+}
+app.jinja_env.fragment_cache = FragmentCache(settings.FRAGMENT_CACHE_MAX_ENTRIES)
+
+# Fingerprinted, pre-compressed copies of static/ served from /assets/
+static_assets = StaticAssetBuilder(app.static_folder, settings.STATIC_BUILD_DIR)
+static_assets.build()
+
 # Configure file upload
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'jpg', 'jpeg', 'png'}
@@ -32,12 +63,14 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
 
-# Initialize components
-classifier = EnhancedScenarioClassifier()
-policy_analyzer = PolicyAnalyzer()
-risk_assessor = RiskAssessor()
-explanation_generator = ExplanationGenerator()
-recommendation_engine = RecommendationEngine()
+# Initialize services; analysis components are built on first use by the registry,
+# which shares them with the FastAPI app when both run in one process
+pdf_renderer = PDFRenderService()
+result_store = ResultStore()
+upload_ingest = UploadIngestService(UPLOAD_FOLDER)
+sample_analyses = SampleAnalysisCache(lambda: registry.pipeline, SAMPLE_SCENARIOS)
+if settings.SAMPLE_ANALYSIS_PRECOMPUTE:
+    sample_analyses.start()
 
 # Sample user profiles
 SAMPLE_USERS = {
@@ -115,13 +148,29 @@ SAMPLE_HISTORY = [
     }
 ]
 
+def seed_demo_history():
+    """Give the demo accounts the sample cases so their dashboards are not empty."""
+    for sample_user_id in SAMPLE_USERS:
+        registry.case_history.seed(sample_user_id, SAMPLE_HISTORY)
+
+@app.cli.command('seed-demo-history')
+def seed_demo_history_command():
+    """Add the sample cases to the demo accounts' case history (flask --app app seed-demo-history)."""
+    seed_demo_history()
+    print(f"Seeded {len(SAMPLE_USERS)} demo accounts in {settings.CASE_HISTORY_DB}")
+
 # Add global template context
 @app.context_processor
 def inject_globals():
     return {
-        'SAMPLE_USERS': SAMPLE_USERS
+        'SAMPLE_USERS': SAMPLE_USERS,
+        'asset_url': asset_url
     }
 
+def asset_url(path):
+    """URL of the fingerprinted copy of a file in static/."""
+    return url_for('assets', filename=static_assets.url_path(path))
+
 # Login required decorator
 def login_required(f):
     @wraps(f)
@@ -136,13 +185,21 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def run_async(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        return asyncio.run(func(*args, **kwargs))
-    return wrapper
-
 # Routes
+@app.route('/assets/<path:filename>')
+def assets(filename):
+    """Serve a fingerprinted asset, pre-compressed when the client accepts it."""
+    path, encoding = static_assets.resolve(filename, request.headers.get('Accept-Encoding', ''))
+    if path is None:
+        abort(404)
+
+    response = send_file(path, mimetype=mimetypes.guess_type(filename)[0], conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = f'public, max-age={settings.STATIC_ASSET_MAX_AGE}, immutable'
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -167,6 +224,7 @@ def login():
 @app.route('/logout')
 def logout():
     session.pop('user_id', None)
+    session.pop('latest_case_id', None)
     flash('You have been logged out', 'info')
     return redirect(url_for('index'))
 
@@ -269,8 +327,19 @@ def profile_edit():
 @login_required
 def dashboard():
     user = SAMPLE_USERS.get(session['user_id'])
-    history = SAMPLE_HISTORY
-    return render_template('dashboard.html', user=user, history=history)
+    filters = {
+        "scenario_type": request.args.get('scenario_type') or None,
+        "risk_level": request.args.get('risk_level') or None
+    }
+    history_version = registry.case_history.version(session['user_id'])
+    history, next_cursor = registry.case_history.page(
+        session['user_id'],
+        cursor=request.args.get('cursor'),
+        **filters
+    )
+    return render_template('dashboard.html', user=user, history=history,
+                           filters=filters, next_cursor=next_cursor,
+                           history_version=history_version)
 
 @app.route('/analyze', methods=['GET', 'POST'])
 @login_required
@@ -282,16 +351,15 @@ def analyze():
         uploaded_file = request.files.get('scenario_file')
         if uploaded_file and allowed_file(uploaded_file.filename):
             filename = secure_filename(uploaded_file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            uploaded_file.save(file_path)
-
-            # If it's a text file, append its content to the scenario
-            if filename.endswith('.txt'):
-                with open(file_path, 'r') as f:
-                    additional_text = f.read()
-                    scenario_text += "\n\nAdditional information from uploaded file:\n" + additional_text
+            upload = upload_ingest.save(uploaded_file.stream, filename)
+
+            extracted_text = upload_ingest.extract_text(upload)
+            if extracted_text:
+                scenario_text = upload_ingest.append_within_budget(
+                    scenario_text, extracted_text, "Additional information from uploaded file:"
+                )
             else:
-                # For non-text files, just note the upload
+                # Images, or text that is still being extracted
                 scenario_text += f"\n\nAdditional evidence provided: {filename}"
 
         if not scenario_text.strip():
@@ -302,8 +370,9 @@ def analyze():
             # Process scenario
             results = analyze_scenario(scenario_text)
 
-            # Save to session for PDF generation
-            session['latest_results'] = results
+            # Keep results server-side; the session only carries the case id
+            store_results(results)
+            pregenerate_pdf(results)
 
             return render_template('results.html', results=results)
         except Exception as e:
@@ -312,22 +381,13 @@ def analyze():
 
     return render_template('analyze.html')
 
-@run_async
-async def analyze_scenario(scenario_text):
+def analyze_scenario(scenario_text):
     """Analyze a scenario using our components."""
     user_id = session.get('user_id')
     user_profile = SAMPLE_USERS.get(user_id) if user_id else None
 
-    # Process scenario
-    classification = await classifier.classify_scenario(scenario_text)
-    policy_analysis = policy_analyzer.analyze_policies(classification)
-    risk_assessment = await risk_assessor.assess_risk(classification, scenario_text)
-    explanation = await explanation_generator.generate_explanation(
-        classification, policy_analysis, risk_assessment
-    )
-    recommendations = await recommendation_engine.generate_recommendations(
-        classification, policy_analysis, risk_assessment, user_profile
-    )
+    # Process scenario on the shared event loop
+    analysis = registry.run(registry.pipeline.analyze(scenario_text, user_id=user_id, user_profile=user_profile))
 
     # Generate a unique case ID
     case_id = f"case-{uuid.uuid4().hex[:8]}"
@@ -340,11 +400,11 @@ async def analyze_scenario(scenario_text):
         "case_id": case_id,
         "date": current_date,
         "scenario_text": scenario_text,
-        "classification": classification,
-        "policy_analysis": policy_analysis,
-        "risk_assessment": risk_assessment,
-        "explanation": explanation,
-        "recommendations": recommendations,
+        "classification": analysis["classification"],
+        "policy_analysis": analysis["policy_analysis"],
+        "risk_assessment": analysis["risk_assessment"],
+        "explanation": analysis["explanation"],
+        "recommendations": analysis["recommendations"],
         "user_profile": user_profile
     }
 
@@ -353,119 +413,120 @@ async def analyze_scenario(scenario_text):
 @app.route('/generate_pdf')
 @login_required
 def generate_pdf():
-    """Generate a PDF report of the latest analysis."""
-    if 'latest_results' not in session:
+    """Generate a PDF report of the latest analysis, or of the case given by ?case_id=."""
+    case_id = request.args.get('case_id') or session.get('latest_case_id')
+    results = result_store.get(case_id, user_id=session['user_id']) if case_id else None
+    if results is None:
         flash('No recent analysis found', 'warning')
         return redirect(url_for('dashboard'))
+    key = pdf_renderer.cache_key(results['case_id'], results)
 
-    results = session['latest_results']
-
-    # Create a temporary HTML file for the PDF
-    with tempfile.NamedTemporaryFile(suffix='.html', delete=False) as f:
-        html_path = f.name
-        html_content = render_template('pdf_template.html', results=results)
-        f.write(html_content.encode('utf-8'))
-
-    # Generate PDF from HTML
-    pdf_path = html_path.replace('.html', '.pdf')
     try:
-        pdfkit.from_file(html_path, pdf_path)
-        return send_file(pdf_path, as_attachment=True, download_name=f"analysis_{results['case_id']}.pdf")
+        pdf = pdf_renderer.get_cached(key)
+        if pdf is None:
+            html_content = render_template('pdf_template.html', results=results)
+            pdf = pdf_renderer.render(key, html_content)
+        return send_file(
+            io.BytesIO(pdf),
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=f"analysis_{results['case_id']}.pdf"
+        )
     except Exception as e:
         flash(f'Error generating PDF: {str(e)}', 'danger')
         return redirect(url_for('dashboard'))
-    finally:
-        # Clean up temporary files
-        if os.path.exists(html_path):
-            os.remove(html_path)
-        if os.path.exists(pdf_path):
-            os.remove(pdf_path)
+
+def store_results(results):
+    """Save results in the server-side store and remember the case in the session."""
+    result_store.put(results['case_id'], results, user_id=session['user_id'])
+    session['latest_case_id'] = results['case_id']
+    record_case_history(results)
+
+def record_case_history(results):
+    """Queue the case for the dashboard history; written in the background."""
+    risk_assessment = results.get('risk_assessment', {})
+    registry.case_history.record({
+        "case_id": results['case_id'],
+        "user_id": session.get('user_id'),
+        "created_at": datetime.now().isoformat(),
+        "date": results['date'],
+        "scenario_type": results.get('classification', {}).get('category', 'unknown'),
+        "risk_level": risk_assessment.get('risk_level', 'unknown'),
+        "risk_score": risk_assessment.get('risk_score'),
+        "financial_estimate": risk_assessment.get('financial_impact_estimate', {}).get('median_estimate'),
+        "status": "analyzed",
+        "description": results['scenario_text'][:100]
+    })
+
+@app.route('/results/<case_id>')
+@login_required
+def view_results(case_id):
+    """Show a previously analyzed case."""
+    results = result_store.get(case_id, user_id=session['user_id'])
+    if results is None:
+        flash('Analysis not found', 'warning')
+        return redirect(url_for('dashboard'))
+
+    session['latest_case_id'] = case_id
+    return render_template('results.html', results=results)
+
+def pregenerate_pdf(results):
+    """Start rendering the PDF report in the background if pre-generation is enabled."""
+    if not settings.PDF_PREGENERATE:
+        return
+    key = pdf_renderer.cache_key(results['case_id'], results)
+    pdf_renderer.submit(key, render_template('pdf_template.html', results=results))
 
 @app.route('/sample_scenarios')
 @login_required
 def sample_scenarios():
-    scenarios = [
-        {
-            "title": "Rear-End Collision",
-            "text": """I was stopped at a red light when another driver rear-ended my car.
-            There was visible damage to my rear bumper, and I'm experiencing some neck pain.
-            The incident occurred on a clear day with good visibility. The other driver
-            admitted fault and we exchanged insurance information."""
-        },
-        {
-            "title": "Parking Lot Damage",
-            "text": """While my car was parked at the grocery store, someone scratched
-            the driver's side door. The scratch is deep and goes across both doors.
-            I was only in the store for about 30 minutes. There were no witnesses
-            and no note was left."""
-        },
-        {
-            "title": "Weather Damage",
-            "text": """My car was damaged during a severe hailstorm last night. There are
-            multiple dents on the hood and roof of the vehicle. I had parked on the street
-            because my garage was full. The weather service had issued a severe weather
-            warning for our area."""
-        },
-        {
-            "title": "Vehicle Theft",
-            "text": """My car was stolen from outside my apartment building last night.
-            I parked it at around 9 PM and discovered it was missing at 7 AM when I was
-            leaving for work. I've filed a police report, and they said there have been
-            several similar thefts in the area recently."""
-        }
-    ]
-    return render_template('sample_scenarios.html', scenarios=scenarios)
+    return render_template('sample_scenarios.html', scenarios=SAMPLE_SCENARIOS)
 
 @app.route('/analyze_sample/<int:scenario_id>')
 @login_required
 def analyze_sample(scenario_id):
-    scenarios = [
-        {
-            "title": "Rear-End Collision",
-            "text": """I was stopped at a red light when another driver rear-ended my car.
-            There was visible damage to my rear bumper, and I'm experiencing some neck pain.
-            The incident occurred on a clear day with good visibility. The other driver
-            admitted fault and we exchanged insurance information."""
-        },
-        {
-            "title": "Parking Lot Damage",
-            "text": """While my car was parked at the grocery store, someone scratched
-            the driver's side door. The scratch is deep and goes across both doors.
-            I was only in the store for about 30 minutes. There were no witnesses
-            and no note was left."""
-        },
-        {
-            "title": "Weather Damage",
-            "text": """My car was damaged during a severe hailstorm last night. There are
-            multiple dents on the hood and roof of the vehicle. I had parked on the street
-            because my garage was full. The weather service had issued a severe weather
-            warning for our area."""
-        },
-        {
-            "title": "Vehicle Theft",
-            "text": """My car was stolen from outside my apartment building last night.
-            I parked it at around 9 PM and discovered it was missing at 7 AM when I was
-            leaving for work. I've filed a police report, and they said there have been
-            several similar thefts in the area recently."""
-        }
-    ]
-
-    if scenario_id < 0 or scenario_id >= len(scenarios):
+    if scenario_id < 0 or scenario_id >= len(SAMPLE_SCENARIOS):
         flash('Invalid scenario selected', 'danger')
         return redirect(url_for('sample_scenarios'))
 
     try:
-        # Process scenario
-        results = analyze_scenario(scenarios[scenario_id]["text"])
+        # Served from the precomputed analyses; falls back to a live run until they are ready
+        results = analyze_sample_scenario(scenario_id)
 
-        # Save to session for PDF generation
-        session['latest_results'] = results
+        # Keep results server-side; the session only carries the case id
+        store_results(results)
+        pregenerate_pdf(results)
 
         return render_template('results.html', results=results)
     except Exception as e:
         flash(f'Error processing scenario: {str(e)}', 'danger')
         return redirect(url_for('sample_scenarios'))
 
+def analyze_sample_scenario(scenario_id):
+    """Build results for a sample scenario, adding only the per-user recommendations."""
+    scenario_text = SAMPLE_SCENARIOS[scenario_id]["text"]
+    analysis = sample_analyses.get(scenario_id)
+    if analysis is None:
+        return analyze_scenario(scenario_text)
+
+    user_id = session.get('user_id')
+    user_profile = SAMPLE_USERS.get(user_id) if user_id else None
+    recommendations = registry.run(registry.recommendation_engine.generate_recommendations(
+        analysis["classification"], analysis["policy_analysis"], analysis["risk_assessment"], user_profile
+    ))
+
+    return {
+        "case_id": f"case-{uuid.uuid4().hex[:8]}",
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "scenario_text": scenario_text,
+        "classification": analysis["classification"],
+        "policy_analysis": analysis["policy_analysis"],
+        "risk_assessment": analysis["risk_assessment"],
+        "explanation": analysis["explanation"],
+        "recommendations": recommendations,
+        "user_profile": user_profile
+    }
+
 @app.route('/api/analyze', methods=['POST'])
 def api_analyze():
     """API endpoint for scenario analysis."""
@@ -483,35 +544,23 @@ def api_analyze():
     user_profile = data.get('user_profile')
 
     try:
-        # Process scenario asynchronously
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        # Process scenario
-        classification = loop.run_until_complete(classifier.classify_scenario(scenario_text))
-        policy_analysis = policy_analyzer.analyze_policies(classification)
-        risk_assessment = loop.run_until_complete(risk_assessor.assess_risk(classification, scenario_text))
-
-        include_explanation = data.get('include_explanation', True)
-        include_recommendations = data.get('include_recommendations', True)
-
-        explanation = None
-        if include_explanation:
-            explanation = loop.run_until_complete(explanation_generator.generate_explanation(
-                classification, policy_analysis, risk_assessment
-            ))
-
-        recommendations = None
-        if include_recommendations:
-            recommendations = loop.run_until_complete(recommendation_engine.generate_recommendations(
-                classification, policy_analysis, risk_assessment, user_profile
-            ))
+        # Process scenario on the shared event loop
+        analysis = registry.run(registry.pipeline.analyze(
+            scenario_text,
+            user_id=(user_profile or {}).get("id"),
+            user_profile=user_profile,
+            user_policy=data.get('user_policy'),
+            include_explanation=data.get('include_explanation', True),
+            include_recommendations=data.get('include_recommendations', True)
+        ))
+        explanation = analysis["explanation"]
+        recommendations = analysis["recommendations"]
 
         # Combine results
         results = {
-            "classification": classification,
-            "policy_analysis": policy_analysis,
-            "risk_assessment": risk_assessment
+            "classification": analysis["classification"],
+            "policy_analysis": analysis["policy_analysis"],
+            "risk_assessment": analysis["risk_assessment"]
         }
 
         if explanation:
@@ -520,12 +569,64 @@ def api_analyze():
         if recommendations:
             results["recommendations"] = recommendations
 
-        loop.close()
-
         return jsonify(results)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/metrics/llm')
+def api_llm_metrics():
+    """API endpoint for LLM token usage and estimated spend."""
+    api_key = request.headers.get('X-API-Key')
+    if api_key != os.getenv("API_KEY", "demo_key"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    return jsonify(registry.run(registry.performance_monitor.get_llm_usage_report()))
+
+@app.route('/api/metrics/slow')
+def api_slow_requests():
+    """API endpoint for the slowest recent analyses with their stage breakdown."""
+    api_key = request.headers.get('X-API-Key')
+    if api_key != os.getenv("API_KEY", "demo_key"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    limit = request.args.get('limit', 10, type=int)
+    return jsonify(registry.run(registry.performance_monitor.get_slowest_requests(limit)))
+
+@app.route('/api/admin/profile')
+def api_admin_profile():
+    """Admin endpoint that profiles this worker for a number of seconds."""
+    admin_key = os.getenv("ADMIN_API_KEY")
+    if not admin_key or request.headers.get('X-Admin-Key') != admin_key:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    mode = request.args.get('mode', 'sampling')
+    seconds = request.args.get('seconds', 5.0, type=float)
+    interval_ms = request.args.get('interval_ms', 5.0, type=float)
+
+    try:
+        if mode == 'sampling':
+            stacks = profiler.sample_stacks(seconds, interval_ms / 1000)
+            return profiler.format_collapsed(stacks), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+        if mode == 'tracemalloc':
+            return jsonify(profiler.tracemalloc_diff(seconds))
+    except profiler.ProfilerBusyError as e:
+        return jsonify({"error": str(e)}), 409
+
+    # cProfile only sees the thread it runs in, which is useless in a threaded WSGI worker
+    return jsonify({"error": f"Unsupported profiling mode: {mode}"}), 400
+
+@app.route('/api/admin/rules/reload', methods=['POST'])
+def api_admin_reload_rules():
+    """Admin endpoint that recompiles the rule files and swaps the new snapshot in."""
+    admin_key = os.getenv("ADMIN_API_KEY")
+    if not admin_key or request.headers.get('X-Admin-Key') != admin_key:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        return jsonify(rule_store().reload())
+    except RuleError as e:
+        return jsonify({"error": str(e)}), 400
+
 @app.route('/api/docs')
 def api_docs():
     """API documentation page."""
@@ -540,4 +641,5 @@ def server_error(e):
     return render_template('500.html'), 500
 
 if __name__ == '__main__':
+    seed_demo_history()
     app.run(debug=True)
@@ -0,0 +1,16 @@
+"""
+Single ASGI entry point: the FastAPI API with the Flask UI mounted underneath.
+
+Both apps take their components from src.registry, so they share rule tables,
+caches and one event loop. Routes FastAPI defines (including /api/docs) take
+precedence; everything else falls through to Flask.
+
+    uvicorn asgi:app
+    python serve.py --workers 4
+"""
+from a2wsgi import WSGIMiddleware
+from src.api.main import app
+from src.config.settings import settings
+import app as flask_ui
+
+app.mount("/", WSGIMiddleware(flask_ui.app, workers=settings.WSGI_THREADS))
@@ -0,0 +1,110 @@
+"""
+Cold-start benchmark: how long a fresh interpreter takes to import each entry point.
+
+Every sample runs in a new process, so nothing is shared with earlier imports.
+Heavy optional dependencies are reported when an entry point loads them:
+
+    python -m benchmarks.bench_import --runs 15 --save-baseline benchmarks/import_baseline.json
+    python -m benchmarks.bench_import --baseline benchmarks/import_baseline.json --max-regression 25
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.bench_pipeline import compare_results, summarize
+
+ENTRY_POINTS = ["src.cli", "src.api.main", "app"]
+
+# Loaded on first use only; an entry point importing one of these regressed
+HEAVY_MODULES = ["openai", "pdfkit", "pypdf"]
+
+PROBE = """
+import sys, time
+start = time.perf_counter_ns()
+import {module}
+elapsed = time.perf_counter_ns() - start
+print(elapsed, ",".join(name for name in {heavy!r} if name in sys.modules) or "-")
+"""
+
+def probe_env(workdir: str) -> Dict[str, str]:
+    """Environment that lets every entry point import without side effects."""
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "benchmark-stub")
+    env["SAMPLE_ANALYSIS_PRECOMPUTE"] = "false"
+    env["CASE_HISTORY_DB"] = os.path.join(workdir, "case_history.db")
+    return env
+
+def import_once(module: str, env: Dict[str, str]) -> Dict:
+    """Import a module in a fresh interpreter; returns its import time and heavy modules loaded."""
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, env=env, check=True
+    )
+    elapsed, loaded = completed.stdout.splitlines()[-1].split()
+    return {"elapsed_ns": int(elapsed), "heavy_modules": [name for name in loaded.split(",") if name != "-"]}
+
+def run_benchmarks(runs: int) -> Dict[str, Dict]:
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        env = probe_env(workdir)
+        for module in ENTRY_POINTS:
+            samples = [import_once(module, env) for _ in range(runs)]
+            result = summarize([s["elapsed_ns"] for s in samples])
+            result["heavy_modules"] = samples[-1]["heavy_modules"]
+            results[f"import_{module}"] = result
+    return results
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark cold-start import time of the entry points")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per entry point")
+    parser.add_argument("--output", type=str, help="Write results JSON to this path")
+    parser.add_argument("--baseline", type=str, help="Compare against a stored baseline JSON")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="Fail if any import slows down by more than this percentage")
+    parser.add_argument("--metric", choices=["median_us", "min_us", "mean_us", "p95_us"], default="min_us",
+                        help="Timing statistic compared against the baseline")
+    parser.add_argument("--save-baseline", type=str, help="Store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "runs": args.runs
+        },
+        "results": run_benchmarks(args.runs)
+    }
+
+    print("{:<24} {:>12} {:>12}  {}".format("Entry point", "median ms", "min ms", "heavy modules loaded"))
+    for name, result in results["results"].items():
+        print("{:<24} {:>12.1f} {:>12.1f}  {}".format(
+            name, result["median_us"] / 1000, result["min_us"] / 1000, ", ".join(result["heavy_modules"]) or "-"))
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = any(result["heavy_modules"] for result in results["results"].values())
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        comparisons = compare_results(results, baseline, args.max_regression, args.metric)
+        print(f"\nComparison of {args.metric} against {args.baseline} (max regression {args.max_regression}%):")
+        for c in comparisons:
+            flag = "REGRESSION" if c["regressed"] else "ok"
+            print(f"  {c['benchmark']:<24} {c['baseline_us'] / 1000:>8.1f} -> {c['current_us'] / 1000:>8.1f} ms "
+                  f"({c['change_pct']:+.1f}%) {flag}")
+        failed = failed or any(c["regressed"] for c in comparisons)
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Micro-benchmarks for each analysis stage and the end-to-end pipeline.
+
+The LLM is replaced by an in-process stub, so runs are offline, free and
+deterministic. Results are written as JSON and can be compared against a
+stored baseline:
+
+    python -m benchmarks.bench_pipeline --output bench.json --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_pipeline --baseline benchmarks/baseline.json --max-regression 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-stub")
+
+from src.classifiers.enhanced_scenario_classifier import EnhancedScenarioClassifier
+from src.policy_analyzer import PolicyAnalyzer
+from src.risk_assessor import RiskAssessor
+from src.explanation_generator import ExplanationGenerator
+from src.recommendation_engine import RecommendationEngine
+from src.pipeline import AnalysisPipeline
+from src.loss_simulator import LossSimulator
+from benchmarks.corpus import SCENARIOS
+from benchmarks.stubs import StubOpenAIClient
+
+SAMPLE_PROFILE = {
+    "id": "bench-user",
+    "years_as_customer": 4,
+    "other_policies": ["home_insurance"],
+    "driving_record": {"accidents": 0, "violations": 1}
+}
+
+def summarize(samples_ns: List[int]) -> Dict:
+    """Summarize per-operation timings in microseconds."""
+    samples = sorted(s / 1000 for s in samples_ns)
+    median = statistics.median(samples)
+    return {
+        "median_us": round(median, 3),
+        "mean_us": round(statistics.fmean(samples), 3),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_us": round(samples[0], 3),
+        "ops_per_sec": round(1_000_000 / median, 1) if median else None,
+        "samples": len(samples)
+    }
+
+def time_sync(func: Callable, inputs: List, iterations: int, warmup: int) -> Dict:
+    for item in inputs * warmup:
+        func(item)
+    samples = []
+    for _ in range(iterations):
+        for item in inputs:
+            start = time.perf_counter_ns()
+            func(item)
+            samples.append(time.perf_counter_ns() - start)
+    return summarize(samples)
+
+async def time_async(func: Callable, inputs: List, iterations: int, warmup: int) -> Dict:
+    for item in inputs * warmup:
+        await func(item)
+    samples = []
+    for _ in range(iterations):
+        for item in inputs:
+            start = time.perf_counter_ns()
+            await func(item)
+            samples.append(time.perf_counter_ns() - start)
+    return summarize(samples)
+
+def build_components() -> Dict:
+    """Create every component with the LLM stubbed out and caching disabled."""
+    classifier = EnhancedScenarioClassifier(use_cache=False)
+    classifier.client = StubOpenAIClient()
+    explanation_generator = ExplanationGenerator()
+    explanation_generator.client = StubOpenAIClient()
+    return {
+        "classifier": classifier,
+        "policy_analyzer": PolicyAnalyzer(),
+        "risk_assessor": RiskAssessor(),
+        "explanation_generator": explanation_generator,
+        "recommendation_engine": RecommendationEngine()
+    }
+
+async def run_benchmarks(iterations: int, warmup: int) -> Dict:
+    c = build_components()
+    classifier = c["classifier"]
+    policy_analyzer = c["policy_analyzer"]
+    risk_assessor = c["risk_assessor"]
+    explanation_generator = c["explanation_generator"]
+    recommendation_engine = c["recommendation_engine"]
+
+    # Precompute stage inputs so each benchmark measures only its own stage
+    classifications = [classifier._validate_classification(classifier._rule_based_classification(s))
+                       for s in SCENARIOS]
+    policy_analyses = [policy_analyzer.analyze_policies(cl) for cl in classifications]
+    risk_assessments = [await risk_assessor.assess_risk(cl, s) for cl, s in zip(classifications, SCENARIOS)]
+    staged = list(zip(classifications, policy_analyses, risk_assessments))
+
+    def explanation_templates(stage_input):
+        classification, policy_analysis, risk_assessment = stage_input
+        explanation_generator._generate_classification_explanation(classification)
+        explanation_generator._generate_policy_explanation(policy_analysis)
+        explanation_generator._generate_risk_explanation(risk_assessment)
+        explanation_generator._generate_financial_explanation(risk_assessment)
+
+    async def recommendations(stage_input):
+        recommendation_engine.cache.clear()
+        await recommendation_engine.generate_recommendations(*stage_input, SAMPLE_PROFILE)
+
+    # Portfolio re-scoring: factors are already extracted, only the weights changed
+    portfolio_categories = [cl["category"] for cl in classifications] * 50
+    portfolio_factors = [ra["risk_factors"] for ra in risk_assessments] * 50
+
+    # One claim, 1M draws: the inline loss simulation budget
+    loss_simulator = LossSimulator(draws=1_000_000)
+    claims = [(cl["category"], ra["financial_impact_estimate"]["median_estimate"])
+              for cl, ra in zip(classifications, risk_assessments)]
+
+    pipeline = AnalysisPipeline(**c)
+
+    async def end_to_end(scenario_text):
+        explanation_generator.cache.clear()
+        recommendation_engine.cache.clear()
+        await pipeline.analyze(scenario_text, user_profile=SAMPLE_PROFILE)
+
+    return {
+        "rule_based_classification": time_sync(
+            classifier._rule_based_classification, SCENARIOS, iterations, warmup),
+        "classify_scenario_stubbed_llm": await time_async(
+            classifier.classify_scenario, SCENARIOS, iterations, warmup),
+        "risk_assessment": await time_async(
+            lambda pair: risk_assessor.assess_risk(*pair),
+            list(zip(classifications, SCENARIOS)), iterations, warmup),
+        "risk_rescoring_batch": time_sync(
+            lambda factors: risk_assessor.score_batch(portfolio_categories, factors),
+            [portfolio_factors], iterations, warmup),
+        "loss_simulation_1m_draws": time_sync(
+            lambda claim: loss_simulator.simulate(*claim), claims[:1], max(1, iterations // 10), min(warmup, 1)),
+        "policy_analysis": time_sync(
+            policy_analyzer.analyze_policies, classifications, iterations, warmup),
+        "recommendations": await time_async(recommendations, staged, iterations, warmup),
+        "explanation_templates": time_sync(explanation_templates, staged, iterations, warmup),
+        "end_to_end_pipeline": await time_async(end_to_end, SCENARIOS, iterations, warmup)
+    }
+
+def compare_results(current: Dict, baseline: Dict, max_regression: float,
+                    metric: str = "median_us") -> List[Dict]:
+    """
+    Compare benchmark timings against a baseline.
+
+    Args:
+        current: Results of this run
+        baseline: Stored baseline results
+        max_regression: Allowed slowdown in percent
+        metric: Timing statistic to compare
+
+    Returns:
+        List of comparisons, one per benchmark present in both runs
+    """
+    comparisons = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base or not base.get(metric):
+            continue
+        change = (result[metric] - base[metric]) / base[metric] * 100
+        comparisons.append({
+            "benchmark": name,
+            "baseline_us": base[metric],
+            "current_us": result[metric],
+            "change_pct": round(change, 1),
+            "regressed": change > max_regression
+        })
+    return comparisons
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline stages")
+    parser.add_argument("--iterations", type=int, default=200, help="Passes over the corpus per benchmark")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed passes before measuring")
+    parser.add_argument("--output", type=str, help="Write results JSON to this path")
+    parser.add_argument("--baseline", type=str, help="Compare against a stored baseline JSON")
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="Fail if any benchmark slows down by more than this percentage")
+    parser.add_argument("--metric", choices=["median_us", "min_us", "mean_us", "p95_us"], default="median_us",
+                        help="Timing statistic compared against the baseline (min_us is least noisy)")
+    parser.add_argument("--save-baseline", type=str, help="Store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "corpus_size": len(SCENARIOS)
+        },
+        "results": asyncio.run(run_benchmarks(args.iterations, args.warmup))
+    }
+
+    print("{:<32} {:>12} {:>12} {:>14}".format("Benchmark", "median µs", "p95 µs", "ops/sec"))
+    for name, result in results["results"].items():
+        print("{:<32} {:>12.2f} {:>12.2f} {:>14,.0f}".format(
+            name, result["median_us"], result["p95_us"], result["ops_per_sec"] or 0))
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    comparisons = compare_results(results, baseline, args.max_regression, args.metric)
+    print(f"\nComparison of {args.metric} against {args.baseline} (max regression {args.max_regression}%):")
+    for c in comparisons:
+        flag = "REGRESSION" if c["regressed"] else "ok"
+        print(f"  {c['benchmark']:<32} {c['baseline_us']:>10.2f} -> {c['current_us']:>10.2f} µs "
+              f"({c['change_pct']:+.1f}%) {flag}")
+
+    return 1 if any(c["regressed"] for c in comparisons) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
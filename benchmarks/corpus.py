@@ -0,0 +1,32 @@
+# Fixed scenario corpus used by the benchmarks. Do not edit existing entries:
+# results are only comparable against baselines taken on the same corpus.
+SCENARIOS = [
+    """I was stopped at a red light when another driver rear-ended my car.
+    There was visible damage to my rear bumper, and I'm experiencing some neck pain.
+    The incident occurred on a clear day with good visibility. The other driver
+    admitted fault and we exchanged insurance information.""",
+    """While my car was parked at the grocery store, someone scratched
+    the driver's side door. The scratch is deep and goes across both doors.
+    I was only in the store for about 30 minutes. There were no witnesses
+    and no note was left.""",
+    """My car was damaged during a severe hailstorm last night. There are
+    multiple dents on the hood and roof of the vehicle. I had parked on the street
+    because my garage was full. The weather service had issued a severe weather
+    warning for our area.""",
+    """My car was stolen from outside my apartment building last night.
+    I parked it at around 9 PM and discovered it was missing at 7 AM when I was
+    leaving for work. I've filed a police report, and they said there have been
+    several similar thefts in the area recently.""",
+    """Someone keyed my car and sprayed graffiti on the hood while it was in a
+    dangerous part of town. The paint damage is extensive.""",
+    """I was speeding on a wet highway and hit two vehicles when I lost control.
+    It was my fault and one of the other drivers was taken to the hospital.""",
+    """A passenger in my car was hurt when I braked suddenly. She went to the
+    hospital for treatment and her medical bills are significant.""",
+    """A shopping cart rolled into my car in a private garage and left a small dent
+    on the passenger door.""",
+    """A tree branch fell on my car during a major storm and cracked the windshield.
+    The flood water also reached the wheels.""",
+    """I'm not sure what happened, but there is a strange noise coming from under the
+    car after I drove over something on the road this morning."""
+]
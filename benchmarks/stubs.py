@@ -0,0 +1,73 @@
+import json
+from types import SimpleNamespace
+from typing import Dict, List
+
+# Keyword table mirroring the classifier's categories, so stubbed answers look like real ones
+CATEGORY_KEYWORDS = {
+    "collision": (["rear-ended", "hit", "crash", "collision", "accident"], ["liability", "collision"]),
+    "parking_damage": (["parked", "parking", "dent", "scratch"], ["comprehensive", "collision"]),
+    "weather_damage": (["storm", "hail", "flood", "weather"], ["comprehensive"]),
+    "theft": (["stolen", "theft", "break-in", "stole"], ["comprehensive"]),
+    "vandalism": (["vandalized", "keyed", "graffiti", "damaged"], ["comprehensive"]),
+    "medical": (["injury", "hurt", "hospital", "pain", "medical"], ["medical_payments", "personal_injury_protection"])
+}
+
+EXPLANATION_TEXT = (
+    "This scenario has been reviewed against the applicable coverages. "
+    "The primary policy should respond to the described loss, subject to the deductible.\n\n"
+    "The assessed risk reflects the factors identified in the description. "
+    "Review the recommendations to reduce exposure to similar incidents in the future."
+)
+
+def classification_payload(scenario_text: str) -> Dict:
+    """Build a schema-valid classification answer for a scenario."""
+    text = scenario_text.lower()
+    best, best_matches = "general_incident", 0
+    policies: List[str] = ["liability"]
+    for category, (keywords, category_policies) in CATEGORY_KEYWORDS.items():
+        matches = sum(1 for keyword in keywords if keyword in text)
+        if matches > best_matches:
+            best, best_matches, policies = category, matches, category_policies
+
+    return {
+        "category": best,
+        "confidence": round(min(0.95, 0.6 + 0.1 * best_matches), 2),
+        "relevant_policies": policies,
+        "reasoning": f"Stubbed classification matched {best_matches} keywords for '{best}'"
+    }
+
+def is_classification_request(messages: List[Dict]) -> bool:
+    """Tell classification prompts apart from explanation prompts."""
+    return any(m.get("role") == "system" and "classifier" in m.get("content", "") for m in messages)
+
+def completion_content(messages: List[Dict]) -> str:
+    """Produce the assistant message content for a chat request."""
+    if is_classification_request(messages):
+        user_text = next((m["content"] for m in messages if m.get("role") == "user"), "")
+        return json.dumps(classification_payload(user_text))
+    return EXPLANATION_TEXT
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+class _StubCompletions:
+    def create(self, model: str, messages: List[Dict], **kwargs):
+        content = completion_content(messages)
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = estimate_tokens(content)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens
+            )
+        )
+
+class StubOpenAIClient:
+    """In-process stand-in for the OpenAI client with deterministic, instant answers."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=_StubCompletions())
@@ -0,0 +1,187 @@
+"""
+Async load generator for the Flask and FastAPI analysis endpoints.
+
+Runs either open-loop at a target request rate (--rps) or closed-loop with a
+fixed number of concurrent clients (--concurrency), then reports throughput
+and latency percentiles:
+
+    python -m loadtest.load_generator --target flask --url http://127.0.0.1:5000 --rps 20 --duration 30
+    python -m loadtest.load_generator --target fastapi --url http://127.0.0.1:8000 --concurrency 16
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+import httpx
+from benchmarks.corpus import SCENARIOS
+
+class LoadGenerator:
+    """Drives one analysis endpoint and records per-request latency and status."""
+
+    def __init__(self, target: str, base_url: str, api_key: str = "demo_key",
+                 username: str = "demo", password: str = "password",
+                 unique_scenarios: bool = False, timeout: float = 60.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        if target not in ("flask", "fastapi"):
+            raise ValueError(f"Unknown target: {target}")
+        self.target = target
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.username = username
+        self.password = password
+        self.unique_scenarios = unique_scenarios
+        self.timeout = timeout
+        # Default: real connections; tests pass an httpx.MockTransport
+        self.transport = transport
+
+        self.latencies: List[float] = []
+        self.statuses = Counter()
+        self._scenarios = itertools.cycle(SCENARIOS)
+        self._headers: Dict[str, str] = {}
+
+    async def prepare(self, client: httpx.AsyncClient) -> None:
+        """Resolve authentication headers for the target."""
+        if self.target == "flask":
+            self._headers = {"X-API-Key": self.api_key}
+            return
+
+        response = await client.post(
+            f"{self.base_url}/api/v1/token",
+            data={"username": self.username, "password": self.password}
+        )
+        response.raise_for_status()
+        self._headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def send_one(self, client: httpx.AsyncClient) -> None:
+        scenario_text = next(self._scenarios)
+        if self.unique_scenarios:
+            # Defeat the result caches so every request exercises the full pipeline
+            scenario_text += f" (ref {uuid.uuid4().hex[:8]})"
+
+        path = "/api/analyze" if self.target == "flask" else "/api/v1/classify"
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                f"{self.base_url}{path}",
+                json={"scenario_text": scenario_text},
+                headers=self._headers
+            )
+            self.statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            self.statuses[type(e).__name__] += 1
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    async def run_open_loop(self, rps: float, duration: float, max_in_flight: int) -> float:
+        """Issue requests at a fixed rate regardless of how fast they complete."""
+        limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits, transport=self.transport) as client:
+            await self.prepare(client)
+            in_flight = asyncio.Semaphore(max_in_flight)
+            tasks = []
+
+            async def guarded():
+                try:
+                    await self.send_one(client)
+                finally:
+                    in_flight.release()
+
+            start = time.perf_counter()
+            for i in itertools.count():
+                scheduled = start + i / rps
+                if scheduled - start >= duration:
+                    break
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                if in_flight.locked():
+                    # The service cannot keep up; count the request as shed rather than queueing it
+                    self.statuses["dropped"] += 1
+                    continue
+                await in_flight.acquire()
+                tasks.append(asyncio.create_task(guarded()))
+
+            await asyncio.gather(*tasks)
+            return time.perf_counter() - start
+
+    async def run_closed_loop(self, concurrency: int, duration: float) -> float:
+        """Keep a fixed number of requests in flight for the duration."""
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits, transport=self.transport) as client:
+            await self.prepare(client)
+            start = time.perf_counter()
+            deadline = start + duration
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await self.send_one(client)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> Dict:
+        """Summarize throughput and latency percentiles."""
+        latencies = sorted(self.latencies)
+        successes = sum(count for status, count in self.statuses.items()
+                        if isinstance(status, int) and status < 400)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 2)
+
+        return {
+            "target": self.target,
+            "elapsed_seconds": round(elapsed, 2),
+            "requests": len(latencies),
+            "successes": successes,
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0,
+            "success_rps": round(successes / elapsed, 2) if elapsed else 0,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "latency_ms": {
+                "p50": percentile(0.50),
+                "p90": percentile(0.90),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(latencies[-1] * 1000, 2) if latencies else None
+            }
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the analysis endpoints")
+    parser.add_argument("--target", choices=["flask", "fastapi"], required=True)
+    parser.add_argument("--url", required=True, help="Base URL of the service")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rps", type=float, help="Open-loop target requests per second")
+    mode.add_argument("--concurrency", type=int, help="Closed-loop number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test duration in seconds")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Open-loop cap on outstanding requests")
+    parser.add_argument("--unique", action="store_true", help="Make every scenario unique to bypass caches")
+    parser.add_argument("--api-key", default="demo_key", help="X-API-Key for the Flask API")
+    parser.add_argument("--username", default="demo", help="FastAPI user")
+    parser.add_argument("--password", default="password", help="FastAPI password")
+    parser.add_argument("--output", type=str, help="Write the report JSON to this path")
+    args = parser.parse_args()
+
+    generator = LoadGenerator(
+        args.target, args.url,
+        api_key=args.api_key,
+        username=args.username,
+        password=args.password,
+        unique_scenarios=args.unique
+    )
+    if args.rps:
+        elapsed = asyncio.run(generator.run_open_loop(args.rps, args.duration, args.max_in_flight))
+    else:
+        elapsed = asyncio.run(generator.run_closed_loop(args.concurrency, args.duration))
+
+    report = generator.report(elapsed)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint.
+
+Answers classification prompts with schema-valid classification JSON and
+everything else with explanation text, after a configurable latency and with
+configurable error and rate-limit rates. Point the app at it with:
+
+    python -m loadtest.mock_openai_server --port 8089 --latency lognormal:0.8,0.4 --rate-limit-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=mock python app.py
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from typing import Callable, Dict, Tuple
+from benchmarks.stubs import completion_content, estimate_tokens
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """
+    Build a latency sampler (seconds) from a spec string.
+
+    Supported specs:
+        fixed:S               always S
+        uniform:LOW,HIGH      uniform between LOW and HIGH
+        normal:MEAN,STD       normal, clipped at 0
+        lognormal:MEDIAN,SIGMA  lognormal with the given median
+        exponential:MEAN      exponential with the given mean
+    """
+    name, _, raw = spec.partition(":")
+    params = [float(p) for p in raw.split(",") if p]
+
+    if name == "fixed":
+        return lambda: params[0]
+    if name == "uniform":
+        return lambda: rng.uniform(params[0], params[1])
+    if name == "normal":
+        return lambda: max(0.0, rng.gauss(params[0], params[1]))
+    if name == "lognormal":
+        mu = math.log(params[0])
+        return lambda: rng.lognormvariate(mu, params[1])
+    if name == "exponential":
+        return lambda: rng.expovariate(1 / params[0])
+
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+class MockOpenAIServer:
+    """Minimal asyncio HTTP/1.1 server implementing POST /v1/chat/completions."""
+
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float = 1.0, seed: int = None):
+        self.rng = random.Random(seed)
+        self.sample_latency = parse_latency(latency, self.rng)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"Mock OpenAI server listening on http://{host}:{port}/v1")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, extra_headers, payload = await self._respond(method, path, body)
+
+                data = json.dumps(payload).encode("utf-8")
+                response_headers = {
+                    "Content-Type": "application/json",
+                    "Content-Length": str(len(data)),
+                    **extra_headers
+                }
+                writer.write(f"HTTP/1.1 {status}\r\n".encode("latin-1"))
+                writer.write("".join(f"{k}: {v}\r\n" for k, v in response_headers.items()).encode("latin-1"))
+                writer.write(b"\r\n" + data)
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, path: str, body: bytes) -> Tuple[str, Dict, Dict]:
+        if method != "POST" or not path.rstrip("/").endswith("/chat/completions"):
+            return "404 Not Found", {}, {"error": {"message": f"Unknown endpoint {path}", "type": "invalid_request_error"}}
+
+        self.stats["requests"] += 1
+        await asyncio.sleep(self.sample_latency())
+
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return "429 Too Many Requests", {"Retry-After": str(self.retry_after)}, {
+                "error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded", "code": "rate_limit_exceeded"}
+            }
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.stats["errors"] += 1
+            return "500 Internal Server Error", {}, {
+                "error": {"message": "The server had an error (mock)", "type": "server_error"}
+            }
+
+        request = json.loads(body or b"{}")
+        messages = request.get("messages", [])
+        content = completion_content(messages)
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = estimate_tokens(content)
+
+        self.stats["ok"] += 1
+        return "200 OK", {}, {
+            "id": f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0", help="Latency distribution, e.g. lognormal:0.8,0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible latency and error sequences")
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"\nServed: {server.stats}")
+
+if __name__ == "__main__":
+    main()
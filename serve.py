@@ -0,0 +1,140 @@
+"""
+Preloading multi-worker launcher for the combined ASGI app.
+
+In preload mode (the default) the master imports asgi.py, builds every
+component, rule table and compiled template, then freezes the heap with
+gc.freeze() before forking. Workers share those pages copy-on-write, so each
+extra worker costs only the memory it writes to. The master binds the
+listening socket, forks uvicorn workers that accept on it, restarts any worker
+that dies and reports per-worker memory:
+
+    python serve.py --workers 4 --port 8000
+    python serve.py --workers 4 --no-preload    # every worker imports the app itself
+"""
+import argparse
+import gc
+import json
+import os
+import signal
+import sys
+import time
+import uvicorn
+from src.config.settings import settings
+from src.utils.process_memory import read_memory
+
+def preload():
+    """Import and fully build the app in the master so workers inherit it."""
+    # Without collections during the import, objects are not touched (and their
+    # pages not dirtied) by the collector before the heap is frozen
+    gc.disable()
+
+    from asgi import app
+    from src.registry import registry
+    import app as flask_ui
+
+    registry.warm_up()
+    for name in flask_ui.app.jinja_env.list_templates():
+        flask_ui.app.jinja_env.get_template(name)
+
+    gc.collect()
+    # Move everything built so far into the permanent generation; the collector
+    # never scans it again, so workers do not write to those pages
+    gc.freeze()
+    return app
+
+def run_worker(config: uvicorn.Config, sock, precompute_samples: bool) -> None:
+    """Serve on the inherited socket until told to stop."""
+    # The master's handlers forward signals; workers need uvicorn's own
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    gc.enable()
+
+    if precompute_samples:
+        import app as flask_ui
+        flask_ui.sample_analyses.start()
+
+    uvicorn.Server(config).run(sockets=[sock])
+
+def spawn_worker(config: uvicorn.Config, sock, precompute_samples: bool) -> int:
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 0
+        try:
+            run_worker(config, sock, precompute_samples)
+        except BaseException:
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+    return pid
+
+def memory_report(workers) -> dict:
+    """Memory of the master and each worker; uss is what a worker adds on its own."""
+    report = {"master": read_memory(), "workers": [read_memory(pid) for pid in sorted(workers)]}
+    worker_uss = [m["uss"] for m in report["workers"] if m]
+    if worker_uss:
+        report["mean_worker_uss_mb"] = round(sum(worker_uss) / len(worker_uss) / 2 ** 20, 1)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the UI and API from preloaded worker processes")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=settings.SERVER_PRELOAD,
+                        help="Build the app in the master before forking")
+    parser.add_argument("--memory-interval", type=float, default=60.0,
+                        help="Seconds between per-worker memory reports (0 disables)")
+    args = parser.parse_args()
+
+    # A thread making LLM calls at fork time would leave its locks and pooled
+    # connections to every worker, so sample precomputation starts in the workers
+    precompute_samples = settings.SAMPLE_ANALYSIS_PRECOMPUTE
+    settings.SAMPLE_ANALYSIS_PRECOMPUTE = False
+
+    # Without preload, uvicorn imports the app separately in each worker
+    app = preload() if args.preload else "asgi:app"
+
+    config = uvicorn.Config(app, host=args.host, port=args.port, log_level=args.log_level, lifespan="on")
+    sock = config.bind_socket()
+
+    workers = {spawn_worker(config, sock, precompute_samples) for _ in range(args.workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    # First report once the workers have started serving
+    next_report = time.time() + 10 if args.memory_interval else None
+    while workers:
+        # Wait on our workers only; libraries may run short-lived subprocesses of their own
+        for pid in list(workers):
+            try:
+                exited, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                exited, status = pid, 0
+            if not exited:
+                continue
+            workers.discard(pid)
+            if not stopping:
+                print(f"Worker {pid} exited with status {status}; restarting", file=sys.stderr)
+                workers.add(spawn_worker(config, sock, precompute_samples))
+
+        if next_report and time.time() >= next_report and not stopping:
+            print(json.dumps({"memory": memory_report(workers)}), file=sys.stderr)
+            next_report = time.time() + args.memory_interval
+        time.sleep(0.5)
+
+    sock.close()
+
+if __name__ == "__main__":
+    main()
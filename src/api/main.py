@@ -1,7 +1,9 @@
 from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
+import asyncio
 import jwt
 import time
 from datetime import datetime, timedelta
@@ -11,16 +13,17 @@ import sys
 # Add parent directory to sys.path to enable imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from src.classifiers.enhanced_scenario_classifier import EnhancedScenarioClassifier
-from src.policy_analyzer import PolicyAnalyzer
-from src.risk_assessor import RiskAssessor
-from src.explanation_generator import ExplanationGenerator
-from src.recommendation_engine import RecommendationEngine
-from src.utils.performance_monitor import PerformanceMonitor
+from src.utils import profiler
+from src.utils.process_memory import read_memory
+from src.pipeline import AnalysisPipeline
+from src.registry import registry
+from src.results import to_plain
+from src.rules.loader import RuleError, rule_store
 from src.config.settings import settings
 
-# Initialize performance monitoring
-performance_monitor = PerformanceMonitor()
+def get_pipeline() -> AnalysisPipeline:
+    """Analysis pipeline from the shared registry, built on first use."""
+    return registry.pipeline
 
 # Models
 class ScenarioRequest(BaseModel):
@@ -58,6 +61,7 @@ class HealthResponse(BaseModel):
     status: str
     version: str
     uptime: float
+    engine_mode: str
 
 # API setup
 app = FastAPI(
@@ -69,6 +73,16 @@ app = FastAPI(
     openapi_url="/api/openapi.json"
 )
 
+@app.on_event("startup")
+async def attach_shared_loop():
+    """Run work submitted by synchronous code (the mounted Flask UI) on the server's loop."""
+    registry.attach_loop(asyncio.get_running_loop())
+
+@app.on_event("shutdown")
+async def flush_components():
+    """Write the case history and slow-request entries still queued before the worker exits."""
+    registry.close()
+
 # Security setup
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/token")
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "development_key")
@@ -146,6 +160,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
 
     return user
 
+def require_scope(scope: str):
+    """Build a dependency that only admits users whose token carries `scope`."""
+    async def dependency(token: str = Depends(oauth2_scheme)):
+        user = await get_current_user(token)
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if scope not in payload.get("scopes", []):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Not authorized: '{scope}' scope required"
+            )
+        return user
+    return dependency
+
 # Middleware for request tracking
 @app.middleware("http")
 async def track_requests(request: Request, call_next):
@@ -159,7 +186,7 @@ async def track_requests(request: Request, call_next):
 
     # Track metrics only for API endpoints
     if request.url.path.startswith("/api/v1/"):
-        await performance_monitor.track_request(
+        await registry.performance_monitor.track_request(
             request_type=request.url.path,
             start_time=start_time,
             end_time=time.time(),
@@ -183,7 +210,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     # Determine scopes based on user
     scopes = ["classify"]
     if user.username == "admin":
-        scopes.extend(["analyze", "metrics"])
+        scopes.extend(["analyze", "metrics", "admin"])
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token, expire_time = create_access_token(
@@ -206,7 +233,8 @@ async def health_check():
     return {
         "status": "healthy",
         "version": settings.VERSION,
-        "uptime": time.time() - start_time
+        "uptime": time.time() - start_time,
+        "engine_mode": settings.ENGINE_MODE
     }
 
 @app.post("/api/v1/classify", response_model=ClassificationResponse)
@@ -223,62 +251,32 @@ async def classify_scenario(
     request_start_time = time.time()
 
     try:
-        # Initialize classifier
-        classifier = EnhancedScenarioClassifier()
-
-        # Classify scenario
-        classification = await classifier.classify_scenario(request.scenario_text)
+        analysis = await get_pipeline().analyze(
+            request.scenario_text,
+            user_id=current_user.username,
+            user_profile=request.user_profile,
+            user_policy=request.user_policy,
+            include_explanation=request.include_explanation,
+            include_recommendations=request.include_recommendations
+        )
+        classification = analysis["classification"]
 
         response = ClassificationResponse(
             category=classification["category"],
             confidence=classification["confidence"],
-            relevant_policies=classification["relevant_policies"]
+            relevant_policies=classification["relevant_policies"],
+            policy_analysis=to_plain(analysis["policy_analysis"]),
+            risk_assessment=to_plain(analysis["risk_assessment"]),
+            explanation=analysis["explanation"],
+            recommendations=to_plain(analysis["recommendations"])
         )
 
-        # Initialize additional components
-        policy_analyzer = PolicyAnalyzer()
-        risk_assessor = RiskAssessor()
-
-        # Perform analysis
-        policy_analysis = policy_analyzer.analyze_policies(
-            classification,
-            user_policy=request.user_policy
-        )
-
-        risk_assessment = await risk_assessor.assess_risk(
-            classification,
-            request.scenario_text
-        )
-
-        # Add to response
-        response.policy_analysis = policy_analysis
-        response.risk_assessment = risk_assessment
-
-        # Add explanation if requested
-        if request.include_explanation:
-            explanation_generator = ExplanationGenerator()
-            explanation = await explanation_generator.generate_explanation(
-                classification, policy_analysis, risk_assessment
-            )
-            response.explanation = explanation
-
-        # Add recommendations if requested
-        if request.include_recommendations:
-            recommendation_engine = RecommendationEngine()
-            recommendations = await recommendation_engine.generate_recommendations(
-                classification,
-                policy_analysis,
-                risk_assessment,
-                user_profile=request.user_profile
-            )
-            response.recommendations = recommendations
-
         # Calculate and add processing time
         processing_time = time.time() - request_start_time
         response.processing_time = round(processing_time, 4)
 
         # Track successful classification
-        await performance_monitor.track_request(
+        await registry.performance_monitor.track_request(
             request_type="classification",
             start_time=request_start_time,
             end_time=time.time(),
@@ -293,7 +291,7 @@ async def classify_scenario(
         return response
     except Exception as e:
         # Track failed classification
-        await performance_monitor.track_request(
+        await registry.performance_monitor.track_request(
             request_type="classification",
             start_time=request_start_time,
             end_time=time.time(),
@@ -323,5 +321,97 @@ async def get_metrics(current_user: User = Depends(get_current_user)):
             detail="Not authorized to access metrics"
         )
 
-    report = await performance_monitor.get_performance_report()
+    report = await registry.performance_monitor.get_performance_report()
     return report
+
+@app.get("/api/v1/metrics/llm")
+async def get_llm_usage_metrics(current_user: User = Depends(require_scope("metrics"))):
+    """Get LLM token usage, token rates and estimated spend."""
+    return await registry.performance_monitor.get_llm_usage_report()
+
+@app.get("/api/v1/metrics/slow")
+async def get_slow_requests(limit: int = 10, current_user: User = Depends(require_scope("metrics"))):
+    """Get the slowest recent analyses with their stage breakdown."""
+    return await registry.performance_monitor.get_slowest_requests(limit)
+
+@app.get("/api/v1/metrics/memory")
+async def get_memory_metrics(current_user: User = Depends(require_scope("metrics"))):
+    """Get this worker's memory; uss is what the worker costs beyond pages shared with the master."""
+    memory = read_memory()
+    if memory is None:
+        raise HTTPException(status_code=501, detail="Memory breakdown is only available on Linux")
+    return memory
+
+@app.get("/api/v1/admin/portfolio")
+async def get_portfolio_aggregate(
+    user_id: Optional[str] = None,
+    partial: bool = False,
+    current_user: User = Depends(require_scope("admin"))
+):
+    """
+    Category and risk-level rollups over the case history, streamed with constant memory.
+
+    With partial=true the mergeable aggregate is returned instead of the
+    report, for combining with other shards (`python -m src.cli aggregate --merge`).
+    """
+    from src.services.portfolio_aggregation import PortfolioAggregator
+
+    def aggregate():
+        return PortfolioAggregator().consume(registry.case_history.iter_all(user_id))
+
+    aggregator = await asyncio.to_thread(aggregate)
+    return aggregator.to_dict() if partial else aggregator.report()
+
+@app.get("/api/v1/admin/rules")
+async def get_rules(current_user: User = Depends(require_scope("admin"))):
+    """Fingerprints and versions of the rule snapshot this worker is serving."""
+    rule_set = rule_store().current
+    return {
+        "fingerprint": rule_set.fingerprint,
+        "versions": rule_set.versions,
+        "files": rule_set.file_fingerprints
+    }
+
+@app.post("/api/v1/admin/rules/reload")
+async def reload_rules(current_user: User = Depends(require_scope("admin"))):
+    """
+    Recompile the rule files and swap the new snapshot in without a restart.
+
+    In-flight requests finish on the snapshot they started with, and caches
+    only drop entries that depend on a rule file that changed. This reloads
+    the worker serving the request; with RULES_WATCH_INTERVAL set, every
+    worker follows changes to the files by itself.
+    """
+    try:
+        return await asyncio.to_thread(rule_store().reload)
+    except RuleError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/v1/admin/profile")
+async def capture_profile(
+    mode: str = "sampling",
+    seconds: float = 5.0,
+    interval_ms: float = 5.0,
+    current_user: User = Depends(require_scope("admin"))
+):
+    """
+    Profile this worker for a number of seconds.
+
+    Modes:
+    - sampling: stack samples of all threads, collapsed for flame graphs
+    - cprofile: cProfile of the event loop, collapsed caller;callee edges
+    - tracemalloc: allocation growth between two snapshots
+    """
+    try:
+        if mode == "sampling":
+            stacks = await asyncio.to_thread(profiler.sample_stacks, seconds, interval_ms / 1000)
+            return PlainTextResponse(profiler.format_collapsed(stacks))
+        if mode == "cprofile":
+            stacks = await profiler.profile_event_loop(seconds)
+            return PlainTextResponse(profiler.format_collapsed(stacks))
+        if mode == "tracemalloc":
+            return await asyncio.to_thread(profiler.tracemalloc_diff, seconds)
+    except profiler.ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    raise HTTPException(status_code=400, detail=f"Unknown profiling mode: {mode}")
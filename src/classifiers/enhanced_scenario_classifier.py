@@ -1,10 +1,12 @@
 import os
-from typing import Dict, List, Optional
-from openai import OpenAI
+from typing import Dict, List, Optional, Union
 import json
 import time
 from src.utils.cache import TokenCache
-from src.utils.validators import DataValidator
+from src.scenario_document import ScenarioDocument
+from src.utils.llm_usage import build_usage_record
+from src.utils.llm_client import create_chat_completion, create_openai_client
+from src.rules.loader import current_rules, pinned_rules
 from src.config.settings import settings
 
 class ClassificationError(Exception):
@@ -14,56 +16,55 @@ class ClassificationError(Exception):
 class EnhancedScenarioClassifier:
     """Enhanced auto insurance scenario classifier with ML integration."""
 
-    def __init__(self, use_cache=True):
+    def __init__(self, use_cache=True, offline: Optional[bool] = None, rules=None):
+        # Offline mode classifies with the rule tables only and needs no API key
+        self.offline = settings.ENGINE_MODE == "offline" if offline is None else offline
+
         # Initialize OpenAI client
         self.api_key = os.getenv("OPENAI_API_KEY")
-        if not self.api_key:
+        if not self.api_key and not self.offline:
             raise EnvironmentError("OPENAI_API_KEY not found in environment variables")
-        self.client = OpenAI(api_key=self.api_key)
+        self._client = None
 
         # Initialize cache
         self.use_cache = use_cache
         if use_cache:
-            self.cache = TokenCache()
-
-        # Load scenario categories and rules
-        self._load_classification_rules()
-
-    def _load_classification_rules(self):
-        """Load scenario classification rules."""
-        self.categories = {
-            "collision": {
-                "keywords": ["rear-ended", "hit", "crash", "collision", "accident"],
-                "policies": ["liability", "collision"]
-            },
-            "parking_damage": {
-                "keywords": ["parked", "parking", "dent", "scratch"],
-                "policies": ["comprehensive", "collision"]
-            },
-            "weather_damage": {
-                "keywords": ["storm", "hail", "flood", "weather"],
-                "policies": ["comprehensive"]
-            },
-            "theft": {
-                "keywords": ["stolen", "theft", "break-in", "stole"],
-                "policies": ["comprehensive"]
-            },
-            "vandalism": {
-                "keywords": ["vandalized", "keyed", "graffiti", "damaged"],
-                "policies": ["comprehensive"]
-            },
-            "medical": {
-                "keywords": ["injury", "hurt", "hospital", "pain", "medical"],
-                "policies": ["medical_payments", "personal_injury_protection"]
-            }
-        }
-
-    async def classify_scenario(self, scenario_text: str) -> Dict:
+            self.cache = TokenCache("classification")
+
+        # Scenario categories and keywords come from the rule files; None follows reloads
+        self._rules = rules
+
+    @property
+    def client(self):
+        """OpenAI client, created on the first LLM call."""
+        if self.offline:
+            raise ClassificationError("LLM classification is disabled in offline engine mode")
+        if self._client is None:
+            self._client = create_openai_client(self.api_key)
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    @property
+    def rule_set(self):
+        """Rules this classifier evaluates against: the ones it was given, else the current snapshot."""
+        return self._rules or current_rules()
+
+    @property
+    def categories(self) -> Dict:
+        """Scenario categories with their keywords and policies."""
+        return self.rule_set.categories
+
+    @pinned_rules
+    async def classify_scenario(self, scenario: Union[str, ScenarioDocument]) -> Dict:
         """
         Classify an auto insurance scenario using hybrid approach.
 
         Args:
-            scenario_text: Text description of the insurance scenario
+            scenario: Text description of the insurance scenario, or its
+                already validated ScenarioDocument
 
         Returns:
             Dict with classification results
@@ -71,43 +72,53 @@ class EnhancedScenarioClassifier:
         # Start performance timing
         start_time = time.time()
 
-        # Validate input
-        validator = DataValidator()
-        scenario_text = validator.validate(scenario_text)
+        # Validate input (a document was validated when it was built)
+        document = scenario if isinstance(scenario, ScenarioDocument) else ScenarioDocument.parse(scenario)
+        scenario_text = document.text
 
-        # Check cache
+        # Check cache (entries of other classification rule versions are dropped)
         if self.use_cache:
-            cached_result = self.cache.get(scenario_text)
+            rules_version = self.rule_set.fingerprint_of("classification")
+            self.cache.invalidate_unless(rules_version)
+            cache_key = f"{rules_version}:{scenario_text}"
+            cached_result = self.cache.get(cache_key)
             if cached_result:
-                return cached_result
+                return {**cached_result, "llm_usage": [], "cache_hit": True}
 
         # Track whether we used rule-based fallback
         used_rule_based_fallback = False
 
+        # Token usage of every LLM call made for this scenario
+        llm_usage = []
+
         # Classification pipeline:
-        # 1. Try ML classification first (OpenAI)
+        # 1. Try ML classification first (OpenAI), unless running offline
         # 2. Use rule-based as fallback
-        try:
-            ml_result = await self._ml_classification(scenario_text)
-            confidence = ml_result.get("confidence", 0)
-
-            # If ML confidence is high, use ML result
-            if confidence > 0.7:
-                result = ml_result
-            else:
-                # Get rule-based classification
-                rule_result = self._rule_based_classification(scenario_text)
-
-                # Choose higher confidence result
-                if rule_result.get("confidence", 0) > confidence:
-                    result = rule_result
-                    used_rule_based_fallback = True
-                else:
+        if self.offline:
+            # Offline mode is rules by design, not a fallback
+            result = self._rule_based_classification(document)
+        else:
+            try:
+                ml_result = await self._ml_classification(scenario_text, llm_usage)
+                confidence = ml_result.get("confidence", 0)
+
+                # If ML confidence is high, use ML result
+                if confidence > 0.7:
                     result = ml_result
-        except Exception as e:
-            # Fallback to rule-based
-            result = self._rule_based_classification(scenario_text)
-            used_rule_based_fallback = True
+                else:
+                    # Get rule-based classification
+                    rule_result = self._rule_based_classification(document)
+
+                    # Choose higher confidence result
+                    if rule_result.get("confidence", 0) > confidence:
+                        result = rule_result
+                        used_rule_based_fallback = True
+                    else:
+                        result = ml_result
+            except Exception as e:
+                # Fallback to rule-based
+                result = self._rule_based_classification(document)
+                used_rule_based_fallback = True
 
         # Validate and enhance result
         result = self._validate_classification(result)
@@ -116,17 +127,22 @@ class EnhancedScenarioClassifier:
         result["processing_time"] = time.time() - start_time
         result["rule_based_fallback"] = used_rule_based_fallback
 
-        # Cache result
+        # Cache result (usage belongs to this call only, not to later cache hits)
         if self.use_cache:
-            self.cache.store(scenario_text, result)
+            self.cache.store(cache_key, dict(result))
+
+        result["llm_usage"] = llm_usage
+        result["cache_hit"] = False
 
         return result
 
-    async def _ml_classification(self, scenario_text: str) -> Dict:
+    async def _ml_classification(self, scenario_text: str, usage_log: Optional[List[Dict]] = None) -> Dict:
         """Classify scenario using ML approach with OpenAI."""
         try:
-            completion = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            call_start = time.time()
+            completion = await create_chat_completion(
+                self.client,
+                model=settings.OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": """You are an auto insurance claims classifier.
                      Analyze the scenario and provide a JSON response with the following structure:
@@ -140,28 +156,33 @@ class EnhancedScenarioClassifier:
                 max_tokens=150
             )
 
+            # Record usage before parsing so malformed responses are still accounted for
+            if usage_log is not None:
+                usage_log.append(build_usage_record(
+                    "classification", settings.OPENAI_MODEL, completion, time.time() - call_start))
+
             # Parse the response as JSON
             result = json.loads(completion.choices[0].message.content)
             return result
         except (json.JSONDecodeError, AttributeError) as e:
             raise ClassificationError(f"Failed to parse ML classification result: {str(e)}")
 
-    def _rule_based_classification(self, scenario_text: str) -> Dict:
+    def _rule_based_classification(self, scenario: Union[str, ScenarioDocument]) -> Dict:
         """Rule-based classification system."""
-        scenario_lower = scenario_text.lower()
+        rules = self.rule_set
+        term_mask = ScenarioDocument.of(scenario).term_mask(rules)
 
         # Find matching category based on keywords
         max_matches = 0
         best_category = "general_incident"
         relevant_policies = ["liability"]
 
-        for category, rules in self.categories.items():
-            matches = sum(1 for keyword in rules["keywords"]
-                         if keyword in scenario_lower)
+        for category, category_rules in rules.categories.items():
+            matches = bin(term_mask & rules.category_keywords[category]).count("1")
             if matches > max_matches:
                 max_matches = matches
                 best_category = category
-                relevant_policies = rules["policies"]
+                relevant_policies = category_rules["policies"]
 
         # Calculate confidence based on number of matches
         match_confidence = min(0.9, 0.5 + (0.1 * max_matches))
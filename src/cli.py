@@ -1,9 +1,12 @@
 import asyncio
 import argparse
-from src.classifiers.scenario_classifier import ScenarioClassifier
+import json
+import sys
 
-async def process_scenario(scenario_text: str):
-    classifier = ScenarioClassifier()
+async def process_scenario(scenario_text: str, offline: bool = None):
+    # Imported here so `--help` and argument errors do not pay for the classifier's imports
+    from src.classifiers.enhanced_scenario_classifier import EnhancedScenarioClassifier
+    classifier = EnhancedScenarioClassifier(offline=offline)
     try:
         result = await classifier.classify_scenario(scenario_text)
         print("\nClassification Results:")
@@ -13,13 +16,95 @@ async def process_scenario(scenario_text: str):
     except Exception as e:
         print(f"Error: {str(e)}")
 
+def aggregate(args):
+    """Roll up analyzed claims from JSONL files, the case history or partial aggregates."""
+    from src.services.portfolio_aggregation import PortfolioAggregator
+    aggregator = PortfolioAggregator()
+
+    for path in args.inputs:
+        if path == "-":
+            aggregator.consume_jsonl(sys.stdin)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                aggregator.consume_jsonl(f)
+
+    if args.case_history:
+        from src.services.case_history import CaseHistoryStore
+        store = CaseHistoryStore(args.case_history)
+        try:
+            aggregator.consume(store.iter_all(args.user_id))
+        finally:
+            store.close()
+
+    for path in args.merge:
+        with open(path, "r", encoding="utf-8") as f:
+            aggregator.merge(PortfolioAggregator.from_dict(json.load(f)))
+
+    if args.partial_output:
+        with open(args.partial_output, "w", encoding="utf-8") as f:
+            json.dump(aggregator.to_dict(), f)
+    else:
+        print(json.dumps(aggregator.report(), indent=2))
+
+def coverage_gaps(args):
+    """Policyholders of a book whose coverage falls short for an event type."""
+    from src.services.coverage_book import CoverageBook
+    book = CoverageBook()
+
+    for path in args.inputs:
+        if path == "-":
+            book.consume_jsonl(sys.stdin)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                book.consume_jsonl(f)
+
+    print(json.dumps([book.report(category, args.max_ids) for category in args.category], indent=2))
+
+def build_rules(args):
+    """Compile the rule files into a snapshot that workers map at startup instead of compiling."""
+    from src.rules.loader import build_snapshot
+    from src.config.settings import settings
+    output = args.output or settings.RULES_SNAPSHOT
+    rule_set = build_snapshot(args.rules_dir, output)
+    print(f"Wrote rules {rule_set.fingerprint} to {output}")
+
 def main():
     parser = argparse.ArgumentParser(description='Auto Insurance Scenario Classifier')
     parser.add_argument('--scenario', type=str, help='Insurance scenario to classify')
+    parser.add_argument('--offline', action='store_true', default=None,
+                        help='Classify with the rule tables only (no API key or network needed)')
+
+    commands = parser.add_subparsers(dest='command')
+    aggregate_parser = commands.add_parser(
+        'aggregate', help='Category and risk-level rollups over analyzed claims, with constant memory')
+    aggregate_parser.add_argument('inputs', nargs='*', help='JSONL files of analysis results ("-" for stdin)')
+    aggregate_parser.add_argument('--case-history', metavar='DB', help='Also read the case history database')
+    aggregate_parser.add_argument('--user-id', help='Only this user\'s cases from the case history')
+    aggregate_parser.add_argument('--merge', nargs='+', default=[], metavar='PARTIAL',
+                                  help='Merge partial aggregates written with --partial-output')
+    aggregate_parser.add_argument('--partial-output', metavar='PATH',
+                                  help='Write a mergeable partial aggregate instead of the report')
+    gaps_parser = commands.add_parser(
+        'coverage-gaps', help='Under-covered policyholders for an event type, across a whole book of policies')
+    gaps_parser.add_argument('inputs', nargs='+',
+                             help='JSONL files of {"id": ..., "user_policy": {"coverages": ...}} ("-" for stdin)')
+    gaps_parser.add_argument('--category', nargs='+', required=True, help='Event types (scenario categories) to check')
+    gaps_parser.add_argument('--max-ids', type=int, default=100,
+                             help='Most under-covered policyholder ids to list per event type')
+    build_parser = commands.add_parser(
+        'build-rules', help='Precompile the rule files into a snapshot for fast worker startup')
+    build_parser.add_argument('--rules-dir', help='Directory with the rule files (default: RULES_DIR)')
+    build_parser.add_argument('--output', help='Snapshot file to write (default: RULES_SNAPSHOT)')
     args = parser.parse_args()
 
-    if args.scenario:
-        asyncio.run(process_scenario(args.scenario))
+    if args.command == 'aggregate':
+        aggregate(args)
+    elif args.command == 'coverage-gaps':
+        coverage_gaps(args)
+    elif args.command == 'build-rules':
+        build_rules(args)
+    elif args.scenario:
+        asyncio.run(process_scenario(args.scenario, args.offline))
     else:
         print("Please enter your insurance scenario (press Ctrl+D when finished):")
         scenario_lines = []
@@ -29,7 +114,7 @@ def main():
                 scenario_lines.append(line)
         except EOFError:
             scenario_text = "\n".join(scenario_lines)
-            asyncio.run(process_scenario(scenario_text))
+            asyncio.run(process_scenario(scenario_text, args.offline))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -4,6 +4,8 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 class Settings:
     # Project Settings
     PROJECT_NAME = "Auto Insurance Liability AI System"
@@ -14,6 +16,28 @@ class Settings:
 
     # OpenAI Settings
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # e.g. the local mock server for load tests
+
+    # Engine Mode: "hybrid" uses the LLM with rule-based fallback, "offline" uses
+    # rules and templates only and never constructs an LLM client
+    ENGINE_MODE = os.getenv("ENGINE_MODE", "hybrid").lower()
+
+    # Rule Settings
+    RULES_DIR = os.getenv("RULES_DIR", os.path.join(PROJECT_ROOT, "rules"))
+    # Compiled rules, rebuilt whenever the rule files change; empty disables the snapshot
+    RULES_SNAPSHOT = os.getenv("RULES_SNAPSHOT", os.path.join(PROJECT_ROOT, "data", "rules.snapshot"))
+    RULES_WATCH_INTERVAL = float(os.getenv("RULES_WATCH_INTERVAL", "0"))  # seconds; 0 disables the file watch
+    # Category/policy combinations the rules do not name, memoized
+    POLICY_ANALYSIS_MEMO_SIZE = int(os.getenv("POLICY_ANALYSIS_MEMO_SIZE", "1024"))
+
+    # LLM Usage Accounting (USD per 1K tokens)
+    LLM_PRICING = {
+        "gpt-3.5-turbo": {"prompt": 0.0005, "completion": 0.0015},
+        "gpt-4o-mini": {"prompt": 0.00015, "completion": 0.0006},
+        "gpt-4o": {"prompt": 0.0025, "completion": 0.01}
+    }
+    LLM_USAGE_WINDOW = 60  # seconds used for tokens/sec and tokens/min rates
 
     # Classification Settings
     EMBEDDING_MODEL = "text-embedding-ada-002"
@@ -23,4 +47,79 @@ class Settings:
     # Cache Settings
     CACHE_EXPIRATION = 3600  # 1 hour
 
+    # Profiler Settings
+    PROFILER_MAX_SECONDS = 30
+    PROFILER_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+    # Slow Request Log Settings
+    SLOW_REQUEST_THRESHOLD = float(os.getenv("SLOW_REQUEST_THRESHOLD", "2.0"))  # seconds
+    SLOW_REQUEST_LOG_PATH = os.getenv("SLOW_REQUEST_LOG_PATH", os.path.join(PROJECT_ROOT, "logs", "slow_requests.jsonl"))
+    SLOW_REQUEST_LOG_MAX_BYTES = 5 * 1024 * 1024
+    SLOW_REQUEST_LOG_BACKUPS = 5
+    SLOW_REQUEST_BATCH_SIZE = 20
+    SLOW_REQUEST_FLUSH_INTERVAL = 5.0  # seconds
+    SLOW_REQUEST_SCENARIO_CHARS = 120  # 0 logs only the scenario hash
+    RECENT_REQUEST_SAMPLES = 1000
+
+    # Loss Simulation Settings
+    LOSS_SIMULATION_INLINE = os.getenv("LOSS_SIMULATION_INLINE", "false").lower() == "true"  # add to every risk assessment
+    LOSS_SIMULATION_DRAWS = int(os.getenv("LOSS_SIMULATION_DRAWS", "1000000"))
+    LOSS_SIMULATION_CHUNK_SIZE = 262144  # draws simulated at once; bounds per-event memory
+    LOSS_SIMULATION_SEED = 20240601
+    LOSS_SIMULATION_PERCENTILES = (50, 75, 90, 95, 99, 99.5)
+    LOSS_SIMULATION_TAIL_LEVELS = (95, 99)  # expected shortfall beyond these percentiles
+
+    # PDF Report Settings
+    PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+    PDF_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    PDF_RENDER_TIMEOUT = 60  # seconds
+    PDF_PREGENERATE = os.getenv("PDF_PREGENERATE", "false").lower() == "true"
+    WKHTMLTOPDF_PATH = os.getenv("WKHTMLTOPDF_PATH")
+
+    # Result Store Settings
+    RESULT_STORE_MAX_ENTRIES = 1000
+    RESULT_STORE_DB = os.getenv("RESULT_STORE_DB")  # SQLite path; unset keeps results in memory only
+    RESULT_STORE_COMPRESSION_LEVEL = 6
+
+    # Case History Settings
+    CASE_HISTORY_DB = os.getenv("CASE_HISTORY_DB", os.path.join(PROJECT_ROOT, "data", "case_history.db"))
+    CASE_HISTORY_BATCH_SIZE = 50
+    CASE_HISTORY_FLUSH_INTERVAL = 1.0  # seconds
+    CASE_HISTORY_PAGE_SIZE = 20
+    CASE_HISTORY_SCAN_BATCH = 1000  # rows per query when streaming the whole history
+
+    # Portfolio Aggregation Settings
+    PORTFOLIO_SKETCH_ACCURACY = 0.01  # relative error of risk_score percentiles
+    PORTFOLIO_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+    # Sample Scenario Settings
+    SAMPLE_ANALYSIS_PRECOMPUTE = os.getenv("SAMPLE_ANALYSIS_PRECOMPUTE", "true").lower() == "true"
+    SAMPLE_ANALYSIS_SNAPSHOT = os.getenv("SAMPLE_ANALYSIS_SNAPSHOT",
+                                         os.path.join(PROJECT_ROOT, "data", "sample_analyses.json"))
+    SAMPLE_ANALYSIS_REFRESH_INTERVAL = 300  # seconds between rule table checks
+
+    # Upload Ingestion Settings
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+    UPLOAD_EXTRACT_WORKERS = int(os.getenv("UPLOAD_EXTRACT_WORKERS", "2"))
+    UPLOAD_EXTRACT_TIMEOUT = 10  # seconds a request waits for extracted text
+    UPLOAD_TEXT_CACHE_ENTRIES = 256
+    UPLOAD_TEXT_TOKEN_BUDGET = 750  # tokens of extracted text added to a scenario
+    CHARS_PER_TOKEN = 4
+    SCENARIO_MAX_CHARS = 5000  # ScenarioInput rejects longer scenarios
+
+    # Template and Static Asset Settings
+    TEMPLATE_BYTECODE_CACHE_DIR = os.getenv("TEMPLATE_BYTECODE_CACHE_DIR", os.path.join(PROJECT_ROOT, "data", "jinja_cache"))
+    STATIC_BUILD_DIR = os.getenv("STATIC_BUILD_DIR", os.path.join(PROJECT_ROOT, "static", "build"))
+    FRAGMENT_CACHE_MAX_ENTRIES = 2000
+    STATIC_ASSET_MAX_AGE = 31536000  # one year; asset URLs change whenever their content does
+
+    # Server Settings
+    SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+    SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "2"))
+    WSGI_THREADS = int(os.getenv("WSGI_THREADS", "10"))  # threads serving the mounted Flask UI
+    SERVER_PRELOAD = os.getenv("SERVER_PRELOAD", "true").lower() == "true"
+    SHARED_LOOP_TIMEOUT = 300  # seconds a synchronous caller waits on the shared event loop
+    LLM_CALL_THREADS = int(os.getenv("LLM_CALL_THREADS", "16"))  # LLM calls in flight at once per process
+
 settings = Settings()
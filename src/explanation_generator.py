@@ -1,17 +1,24 @@
 import os
 from typing import Dict, List, Optional
-from openai import OpenAI
 import json
+import time
 from src.utils.cache import TokenCache
+from src.utils.llm_usage import build_usage_record
+from src.utils.llm_client import create_chat_completion, create_openai_client
+from src.config.settings import settings
+from src.results import json_default
 
 class ExplanationGenerator:
     """Generates natural language explanations for classification results."""
 
-    def __init__(self):
+    def __init__(self, offline: Optional[bool] = None):
+        # Offline mode explains with the templates only and needs no API key
+        self.offline = settings.ENGINE_MODE == "offline" if offline is None else offline
+
         self.api_key = os.getenv("OPENAI_API_KEY")
-        if not self.api_key:
+        if not self.api_key and not self.offline:
             raise EnvironmentError("OPENAI_API_KEY not found in environment variables")
-        self.client = OpenAI(api_key=self.api_key)
+        self._client = None
 
         # Templates for different explanation types
         self.templates = {
@@ -22,7 +29,20 @@ class ExplanationGenerator:
         }
 
         # Load cache
-        self.cache = TokenCache()
+        self.cache = TokenCache("explanation")
+
+    @property
+    def client(self):
+        """OpenAI client, created on the first LLM call."""
+        if self.offline:
+            raise RuntimeError("AI explanations are disabled in offline engine mode")
+        if self._client is None:
+            self._client = create_openai_client(self.api_key)
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
 
     async def generate_explanation(self, classification: Dict,
                               policy_analysis: Dict,
@@ -42,13 +62,18 @@ class ExplanationGenerator:
         cache_key = json.dumps({
             "classification": classification.get("category"),
             "policy": policy_analysis.get("primary_coverage"),
+            # Gaps against a user's own policy differ between users with the same scenario
+            "gaps": [gap.get("description") for gap in policy_analysis.get("coverage_gaps", [])],
             "risk": risk_assessment.get("risk_level")
         })
 
         # Check cache
         cached = self.cache.get(cache_key)
         if cached:
-            return cached
+            return {**cached, "llm_usage": [], "cache_hit": True}
+
+        # Token usage of every LLM call made for this explanation
+        llm_usage = []
 
         # Generate individual explanation components
         classification_explanation = self._generate_classification_explanation(classification)
@@ -57,10 +82,10 @@ class ExplanationGenerator:
         financial_explanation = self._generate_financial_explanation(risk_assessment)
 
         # For complex scenarios, use AI to generate more natural explanations
-        if classification.get("confidence", 0) < 0.7 or risk_assessment.get("risk_level") == "high":
+        complex_scenario = classification.get("confidence", 0) < 0.7 or risk_assessment.get("risk_level") == "high"
+        if complex_scenario and not self.offline:
             detailed_explanation = await self._generate_ai_explanation(
-                classification, policy_analysis, risk_assessment)
-            complex_scenario = True
+                classification, policy_analysis, risk_assessment, llm_usage)
         else:
             detailed_explanation = "\n\n".join([
                 classification_explanation,
@@ -68,7 +93,6 @@ class ExplanationGenerator:
                 risk_explanation,
                 financial_explanation
             ])
-            complex_scenario = False
 
         # Generate concise summary
         summary = await self._generate_summary(
@@ -84,8 +108,11 @@ class ExplanationGenerator:
             "complex_scenario": complex_scenario
         }
 
-        # Cache result
-        self.cache.store(cache_key, result)
+        # Cache result (usage belongs to this call only, not to later cache hits)
+        self.cache.store(cache_key, dict(result))
+
+        result["llm_usage"] = llm_usage
+        result["cache_hit"] = False
 
         return result
 
@@ -152,7 +179,8 @@ class ExplanationGenerator:
 
     async def _generate_ai_explanation(self, classification: Dict,
                                  policy_analysis: Dict,
-                                 risk_assessment: Dict) -> str:
+                                 risk_assessment: Dict,
+                                 usage_log: Optional[List[Dict]] = None) -> str:
         """Generate more natural explanation using AI."""
         # Prepare context for AI
         context = {
@@ -174,20 +202,26 @@ class ExplanationGenerator:
         }
 
         try:
-            completion = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            call_start = time.time()
+            completion = await create_chat_completion(
+                self.client,
+                model=settings.OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": """You are an insurance expert assistant.
                      Generate a natural, cohesive explanation of the insurance scenario analysis
                      provided. Explain the classification, policy implications, risk assessment,
                      and financial impact in a clear, professional, and informative way.
                      Keep your explanation concise but comprehensive (3-4 paragraphs)."""},
-                    {"role": "user", "content": f"Generate an explanation based on this analysis: {json.dumps(context)}"}
+                    {"role": "user", "content": f"Generate an explanation based on this analysis: {json.dumps(context, default=json_default)}"}
                 ],
                 temperature=0.3,
                 max_tokens=400
             )
 
+            if usage_log is not None:
+                usage_log.append(build_usage_record(
+                    "explanation", settings.OPENAI_MODEL, completion, time.time() - call_start))
+
             return completion.choices[0].message.content.strip()
         except Exception as e:
             # Fallback to template-based explanation
@@ -0,0 +1,165 @@
+import math
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+from src.config.settings import settings
+
+class LossSimulator:
+    """
+    Monte Carlo loss distributions for claims.
+
+    Each claim's loss is the sum of its loss events: the incident itself plus
+    a Poisson number of additional events (more vehicles, more claimants,
+    follow-on claims), each with a lognormal severity. Severities are scaled
+    so the simulated mean equals the claim's point estimate, and the
+    distribution adds the tail the point estimate leaves out.
+    """
+
+    def __init__(self, draws: Optional[int] = None, chunk_size: Optional[int] = None,
+                 seed: Optional[int] = None):
+        self.draws = draws or settings.LOSS_SIMULATION_DRAWS
+        self.chunk_size = chunk_size or settings.LOSS_SIMULATION_CHUNK_SIZE
+        self.seed = settings.LOSS_SIMULATION_SEED if seed is None else seed
+        self.percentiles = settings.LOSS_SIMULATION_PERCENTILES
+        self.tail_levels = settings.LOSS_SIMULATION_TAIL_LEVELS
+
+        # Expected loss events per claim beyond the incident itself
+        self.additional_events = {
+            "collision": 0.4,
+            "parking_damage": 0.05,
+            "weather_damage": 0.1,
+            "theft": 0.05,
+            "vandalism": 0.1,
+            "medical": 0.6,
+            "general_incident": 0.1
+        }
+
+        # Lognormal shape of a single event's severity; larger means a heavier tail
+        self.severity_sigma = {
+            "collision": 0.8,
+            "parking_damage": 0.5,
+            "weather_damage": 0.7,
+            "theft": 0.6,
+            "vandalism": 0.5,
+            "medical": 1.1,
+            "general_incident": 0.7
+        }
+
+    def parameters(self) -> Dict:
+        """Everything that determines a simulated distribution, for fingerprinting."""
+        return {
+            "additional_events": self.additional_events,
+            "severity_sigma": self.severity_sigma,
+            "draws": self.draws,
+            "chunk_size": self.chunk_size,
+            "seed": self.seed
+        }
+
+    def simulate(self, category: str, expected_loss: float,
+                 draws: Optional[int] = None, seed: Optional[int] = None) -> Dict:
+        """
+        Simulate one claim's loss distribution.
+
+        Args:
+            category: Scenario category
+            expected_loss: Point estimate of the loss (USD); the simulated mean
+            draws: Number of simulated outcomes (defaults to settings)
+            seed: Random seed; the same seed, draws and chunk size give the same result
+
+        Returns:
+            Dict with mean, percentiles and expected shortfall of the loss
+        """
+        return self.simulate_portfolio([(category, expected_loss)], draws, seed)
+
+    def simulate_portfolio(self, claims: Iterable[Tuple[str, float]],
+                           draws: Optional[int] = None, seed: Optional[int] = None) -> Dict:
+        """
+        Simulate the total loss of independent claims.
+
+        Args:
+            claims: (category, expected loss) of each claim
+            draws: Number of simulated outcomes (defaults to settings)
+            seed: Random seed; the same seed, draws and chunk size give the same result
+
+        Returns:
+            Dict with mean, percentiles and expected shortfall of the total loss
+        """
+        claims = list(claims)
+        draws = draws or self.draws
+        seed = self.seed if seed is None else seed
+
+        # One independent stream per claim, so adding a claim does not reshuffle the others
+        generators = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(len(claims))]
+        parameters = [self._claim_parameters(category, expected_loss) for category, expected_loss in claims]
+
+        # Only the totals are kept at full size; per-event draws live for one chunk
+        totals = np.zeros(draws)
+        for start in range(0, draws, self.chunk_size):
+            chunk = totals[start:start + self.chunk_size]
+            for rng, (additional, mu, sigma) in zip(generators, parameters):
+                chunk += self._simulate_chunk(rng, additional, mu, sigma, len(chunk))
+
+        summary = self.summarize(totals)
+        summary["claims"] = len(claims)
+        return summary
+
+    def summarize(self, losses: np.ndarray) -> Dict:
+        """
+        Percentiles and expected shortfall of simulated losses.
+
+        Uses one partial sort for every statistic instead of a full sort.
+
+        Args:
+            losses: Simulated loss per draw
+
+        Returns:
+            Dict of summary statistics in USD
+        """
+        n = len(losses)
+        ranks = {q: self._rank(q, n) for q in (*self.percentiles, *self.tail_levels)}
+        partitioned = np.partition(losses, sorted(set(ranks.values())))
+
+        return {
+            "mean": round(float(losses.mean()), 2),
+            "std": round(float(losses.std()), 2),
+            "percentiles": {f"p{q:g}": round(float(partitioned[ranks[q]]), 2) for q in self.percentiles},
+            # Mean loss in the worst (100 - q)% of outcomes
+            "expected_shortfall": {f"es{q:g}": round(float(partitioned[ranks[q]:].mean()), 2)
+                                   for q in self.tail_levels},
+            "draws": n,
+            "currency": "USD"
+        }
+
+    def _claim_parameters(self, category: str, expected_loss: float) -> Tuple[float, float, float]:
+        additional = self.additional_events.get(category, self.additional_events["general_incident"])
+        sigma = self.severity_sigma.get(category, self.severity_sigma["general_incident"])
+        # E[loss] = E[events] * E[severity] = (1 + additional) * exp(mu + sigma^2 / 2)
+        mean_severity = max(expected_loss, 0.01) / (1 + additional)
+        mu = math.log(mean_severity) - sigma ** 2 / 2
+        return additional, mu, sigma
+
+    @staticmethod
+    def _simulate_chunk(rng: np.random.Generator, additional: float, mu: float, sigma: float,
+                        size: int) -> np.ndarray:
+        # The incident itself: one lognormal severity per draw, built in place
+        losses = rng.standard_normal(size)
+        losses *= sigma
+        losses += mu
+        np.exp(losses, out=losses)
+
+        # Additional events: a Poisson(additional * size) total spread uniformly over
+        # the draws gives each draw an independent Poisson(additional) count, without
+        # sampling a count for every draw
+        extra_events = rng.poisson(additional * size)
+        if extra_events:
+            owners = rng.integers(0, size, extra_events)
+            severities = rng.standard_normal(extra_events)
+            severities *= sigma
+            severities += mu
+            np.exp(severities, out=severities)
+            losses += np.bincount(owners, weights=severities, minlength=size)
+        return losses
+
+    @staticmethod
+    def _rank(q: float, n: int) -> int:
+        """Nearest-rank index of the q-th percentile."""
+        return min(n - 1, max(0, math.ceil(q / 100 * n) - 1))
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from src.utils.cache import track_cache_events
+from src.rules.loader import pin_rules
+from src.scenario_document import ScenarioDocument
+from src.config.settings import settings
+
+class AnalysisPipeline:
+    """Runs the scenario analysis stages in order and records a per-stage breakdown."""
+
+    def __init__(self, classifier, policy_analyzer, risk_assessor,
+                 explanation_generator, recommendation_engine,
+                 performance_monitor=None):
+        self.classifier = classifier
+        self.policy_analyzer = policy_analyzer
+        self.risk_assessor = risk_assessor
+        self.explanation_generator = explanation_generator
+        self.recommendation_engine = recommendation_engine
+        self.performance_monitor = performance_monitor
+
+    async def analyze(self, scenario_text: str,
+                      user_id: Optional[str] = None,
+                      user_profile: Optional[Dict] = None,
+                      user_policy: Optional[Dict] = None,
+                      include_explanation: bool = True,
+                      include_recommendations: bool = True) -> Dict:
+        """
+        Run every analysis stage for a scenario.
+
+        Args:
+            scenario_text: Text description of the insurance scenario
+            user_id: User the analysis is made for (used for usage accounting)
+            user_profile: Optional user profile for personalized recommendations
+            user_policy: Optional user policy for coverage gap analysis
+            include_explanation: Whether to generate an explanation
+            include_recommendations: Whether to generate recommendations
+
+        Returns:
+            Dict with the output of each stage plus timing metadata
+        """
+        start_time = time.time()
+        stage_timings = {}
+        llm_latency = {}
+        explanation = None
+        recommendations = None
+
+        # Validated, normalized and scanned once; every stage reads the same document
+        document = ScenarioDocument.parse(scenario_text)
+
+        # Every stage evaluates against the same rule snapshot, even if the rules are reloaded meanwhile
+        with track_cache_events() as cache_events, pin_rules():
+            stage_start = time.time()
+            classification = await self.classifier.classify_scenario(document)
+            stage_timings["classification"] = time.time() - stage_start
+            await self._track_llm_stage("classification", classification, user_id, llm_latency)
+
+            stage_start = time.time()
+            policy_analysis = self.policy_analyzer.analyze_policies(classification, user_policy)
+            stage_timings["policy_analysis"] = time.time() - stage_start
+
+            stage_start = time.time()
+            risk_assessment = await self.risk_assessor.assess_risk(classification, document)
+            stage_timings["risk_assessment"] = time.time() - stage_start
+
+            if include_explanation:
+                stage_start = time.time()
+                explanation = await self.explanation_generator.generate_explanation(
+                    classification, policy_analysis, risk_assessment
+                )
+                stage_timings["explanation"] = time.time() - stage_start
+                await self._track_llm_stage("explanation", explanation, user_id, llm_latency,
+                                            category=classification["category"])
+
+            if include_recommendations:
+                stage_start = time.time()
+                recommendations = await self.recommendation_engine.generate_recommendations(
+                    classification, policy_analysis, risk_assessment, user_profile
+                )
+                stage_timings["recommendations"] = time.time() - stage_start
+
+        processing_time = time.time() - start_time
+
+        if self.performance_monitor:
+            await self.performance_monitor.track_analysis({
+                "timestamp": datetime.now().isoformat(),
+                "user": user_id,
+                "category": classification["category"],
+                "risk_level": risk_assessment.get("risk_level"),
+                "processing_time": processing_time,
+                "stage_timings": stage_timings,
+                "cache": dict(cache_events),
+                "llm_latency": llm_latency,
+                **self._describe_scenario(document)
+            })
+
+        return {
+            "classification": classification,
+            "policy_analysis": policy_analysis,
+            "risk_assessment": risk_assessment,
+            "explanation": explanation,
+            "recommendations": recommendations,
+            "stage_timings": stage_timings,
+            "processing_time": processing_time
+        }
+
+    def rules_fingerprint(self) -> str:
+        """Hash the rule tables and model that determine an analysis, to detect stale precomputed results."""
+        loss_simulator = getattr(self.risk_assessor, "loss_simulator", None)
+        tables = {
+            "categories": getattr(self.classifier, "categories", None),
+            "policies": getattr(self.policy_analyzer, "policies", None),
+            "scenario_policies": getattr(self.policy_analyzer, "scenario_policies", None),
+            "risk_factors": getattr(self.risk_assessor, "risk_factors", None),
+            "base_risk_scores": getattr(self.risk_assessor, "base_risk_scores", None),
+            "rule_sets": sorted({rule_set.fingerprint for rule_set in (
+                getattr(component, "rule_set", None)
+                for component in (self.classifier, self.risk_assessor, self.policy_analyzer,
+                                  self.recommendation_engine))
+                if rule_set is not None}),
+            "explanation_templates": getattr(self.explanation_generator, "templates", None),
+            "loss_model": loss_simulator.parameters() if loss_simulator else None,
+            "model": settings.OPENAI_MODEL,
+            "engine_mode": settings.ENGINE_MODE
+        }
+        encoded = json.dumps(tables, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    async def _track_llm_stage(self, stage: str, result: Dict, user_id: Optional[str],
+                               llm_latency: Dict, category: Optional[str] = None) -> None:
+        """Move a stage's LLM usage out of its result and into the monitor."""
+        usage: List[Dict] = result.pop("llm_usage", [])
+        cache_hit = result.pop("cache_hit", False)
+        llm_latency[stage] = sum(record["latency"] for record in usage)
+
+        if self.performance_monitor:
+            await self.performance_monitor.track_llm_usage(
+                stage,
+                usage,
+                cache_hit=cache_hit,
+                user=user_id,
+                category=category or result.get("category")
+            )
+
+    def _describe_scenario(self, document: ScenarioDocument) -> Dict:
+        """Describe a scenario for logs without storing its full text."""
+        description = {
+            "scenario_length": document.length,
+            "scenario_hash": document.content_hash
+        }
+        if settings.SLOW_REQUEST_SCENARIO_CHARS:
+            description["scenario_preview"] = document.text[:settings.SLOW_REQUEST_SCENARIO_CHARS]
+        return description
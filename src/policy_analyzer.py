@@ -1,66 +1,133 @@
-from typing import Dict, List, Optional
+import functools
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from src.config.settings import settings
+from src.results import PolicyAnalysis, PolicyDetails, PolicyRecommendation, freeze
+from src.rules.loader import current_rules, pinned_rules
+
+class PolicyAnalysisTable:
+    """
+    Immutable policy analyses of one rule set, by category and relevant policies.
+
+    Without a user policy an analysis depends only on the category and the
+    ordered list of relevant policies, so the combinations the rules and the
+    classifier produce are built once up front and any other combination is
+    built on first use and memoized, up to a bound. Analyses reference a
+    read-only copy of the policy catalog and gap rules, so no caller can
+    change what the next request is served.
+    """
+
+    def __init__(self, rule_set, memo_size: Optional[int] = None):
+        self.fingerprint = rule_set.fingerprint
+        self._rule_set = rule_set
+        self.catalog = freeze(rule_set.policies)
+        self._build_memoized = functools.lru_cache(maxsize=memo_size or settings.POLICY_ANALYSIS_MEMO_SIZE)(self._build)
+
+        self.analyses: Dict[Tuple[str, Tuple[str, ...]], PolicyAnalysis] = {}
+        for category, relevant_policies in self._known_combinations(rule_set):
+            self.analyses[category, relevant_policies] = self._build(category, relevant_policies)
+
+    @staticmethod
+    def _known_combinations(rule_set) -> Iterable[Tuple[str, Tuple[str, ...]]]:
+        categories = dict.fromkeys([*rule_set.categories, *rule_set.scenario_policies, *rule_set.base_risk_scores])
+        for category in categories:
+            # Policies the classifier assigns, the category mapping, and the classifier's fallback
+            for policies in (rule_set.categories.get(category, {}).get("policies"),
+                             rule_set.scenario_policies.get(category), ["liability"]):
+                if policies:
+                    yield category, tuple(policies)
+
+    def get(self, category: str, relevant_policies: Tuple[str, ...]) -> PolicyAnalysis:
+        """The analysis of a combination, with recommendations at no particular confidence."""
+        analysis = self.analyses.get((category, relevant_policies))
+        if analysis is None:
+            analysis = self._build_memoized(category, relevant_policies)
+        return analysis
+
+    def _build(self, category: str, relevant_policies: Tuple[str, ...]) -> PolicyAnalysis:
+        policy_details = PolicyDetails(relevant_policies, self.catalog)
+        present = self._rule_set.policy_mask(policy_details)
+        coverage_gaps = tuple(freeze(gap) for gap in self._rule_set.coverage_gaps.lookup(category, None, present))
+        return PolicyAnalysis(
+            primary_coverage=relevant_policies[0] if relevant_policies else None,
+            secondary_coverage=relevant_policies[1:],
+            policy_details=policy_details,
+            coverage_gaps=coverage_gaps,
+            recommendations=_recommendations(coverage_gaps, None)
+        )
+
+# Recommended action for each type of coverage gap
+GAP_ACTIONS = {
+    "missing_coverage": "add_coverage",
+    "insufficient_limit": "increase_limit",
+    "high_deductible": "lower_deductible"
+}
+
+def _recommendations(coverage_gaps: Sequence, confidence: Optional[float]) -> Tuple[PolicyRecommendation, ...]:
+    """Recommendations that follow from coverage gaps."""
+    return tuple(
+        PolicyRecommendation(
+            action=GAP_ACTIONS[gap["type"]],
+            coverage=gap["policy"],
+            description=gap["description"],
+            priority=gap["severity"],
+            confidence=confidence
+        )
+        for gap in coverage_gaps if gap["type"] in GAP_ACTIONS
+    )
 
 class PolicyAnalyzer:
     """Analyzes insurance policies relevant to classified scenarios."""
 
-    def __init__(self):
-        # Load policy definitions
-        self.policies = {
-            "liability": {
-                "description": "Covers damage you cause to others",
-                "subtypes": ["bodily_injury", "property_damage"],
-                "typical_limits": ["$25,000/$50,000/$25,000", "$50,000/$100,000/$50,000"],
-                "required": True,
-                "coverage_details": "Liability coverage helps pay for the costs of the other driver's property and bodily injuries if you're found at fault in an accident."
-            },
-            "collision": {
-                "description": "Covers damage to your vehicle from a collision",
-                "subtypes": ["standard", "broad_form"],
-                "typical_deductibles": ["$250", "$500", "$1000"],
-                "required": False,
-                "coverage_details": "Collision coverage helps pay for damage to your vehicle after an accident, regardless of who is at fault."
-            },
-            "comprehensive": {
-                "description": "Covers non-collision damage to your vehicle",
-                "subtypes": ["standard", "named_perils"],
-                "typical_deductibles": ["$0", "$250", "$500", "$1000"],
-                "required": False,
-                "coverage_details": "Comprehensive coverage helps pay for damage to your car caused by events other than collision, such as theft, vandalism, or natural disasters."
-            },
-            "medical_payments": {
-                "description": "Covers medical expenses regardless of fault",
-                "typical_limits": ["$1,000", "$5,000", "$10,000"],
-                "required": False,
-                "coverage_details": "Medical payments coverage helps pay for medical expenses for you and your passengers after an accident, regardless of who is at fault."
-            },
-            "personal_injury_protection": {
-                "description": "Covers medical expenses, lost wages, and other costs",
-                "typical_limits": ["$10,000", "$25,000", "$50,000"],
-                "required": False,
-                "coverage_details": "Personal injury protection (PIP) helps cover medical expenses, lost wages, and other costs associated with injuries sustained in an accident, regardless of fault."
-            }
-        }
-
-        # Load scenario-policy mappings
-        self.scenario_policies = {
-            "collision": ["liability", "collision", "medical_payments"],
-            "parking_damage": ["comprehensive", "collision"],
-            "weather_damage": ["comprehensive"],
-            "theft": ["comprehensive"],
-            "vandalism": ["comprehensive"],
-            "medical": ["medical_payments", "personal_injury_protection"]
-        }
-
-    def analyze_policies(self, classification: Dict, user_policy: Dict = None) -> Dict:
+    def __init__(self, rules=None):
+        # Compiled rule files: policy definitions, scenario-policy mappings and coverage
+        # gap rules. None follows reloads of the default rules
+        self._rules = rules
+
+        # Analyses of the rule set last analyzed against; replaced when the rules are reloaded
+        self._table: Optional[PolicyAnalysisTable] = None
+        self._table_lock = threading.Lock()
+        if rules is not None:
+            self.analysis_table()
+
+    @property
+    def rule_set(self):
+        """Rules this analyzer evaluates against: the ones it was given, else the current snapshot."""
+        return self._rules or current_rules()
+
+    @property
+    def policies(self) -> Dict[str, Dict]:
+        """Policy definitions."""
+        return self.rule_set.policies
+
+    @property
+    def scenario_policies(self) -> Dict[str, List[str]]:
+        """Policies relevant to each scenario category."""
+        return self.rule_set.scenario_policies
+
+    def analysis_table(self) -> PolicyAnalysisTable:
+        """Precomputed analyses of the current rules, built on first use after each reload."""
+        rule_set = self.rule_set
+        table = self._table
+        if table is None or table.fingerprint != rule_set.fingerprint:
+            with self._table_lock:
+                table = self._table
+                if table is None or table.fingerprint != rule_set.fingerprint:
+                    table = self._table = PolicyAnalysisTable(rule_set)
+        return table
+
+    @pinned_rules
+    def analyze_policies(self, classification: Dict, user_policy: Dict = None) -> PolicyAnalysis:
         """
         Analyze policies based on scenario classification.
 
         Args:
             classification: Dictionary containing scenario classification
-            user_policy: Optional dictionary with user's current policy details
+            user_policy: Optional user policy; when it lists its coverages (see
+                CoverageRequirements.held), gaps are found against what it holds
 
         Returns:
-            Dict with policy analysis information
+            PolicyAnalysis, readable as the dict it replaces; shared and immutable
         """
         relevant_policies = classification.get("relevant_policies", [])
         category = classification.get("category", "")
@@ -70,69 +137,15 @@ class PolicyAnalyzer:
         if category in self.scenario_policies and not relevant_policies:
             relevant_policies = self.scenario_policies[category]
 
-        policy_analysis = {
-            "primary_coverage": None,
-            "secondary_coverage": [],
-            "policy_details": {},
-            "coverage_gaps": [],
-            "recommendations": []
-        }
-
-        # Determine primary coverage
-        if relevant_policies:
-            policy_analysis["primary_coverage"] = relevant_policies[0]
-            policy_analysis["secondary_coverage"] = relevant_policies[1:] if len(relevant_policies) > 1 else []
-
-        # Add policy details
-        for policy in relevant_policies:
-            if policy in self.policies:
-                policy_analysis["policy_details"][policy] = self.policies[policy]
-
-        # Identify potential coverage gaps
-        self._identify_coverage_gaps(policy_analysis, category, user_policy)
-
-        # Generate recommendations
-        self._generate_recommendations(policy_analysis, category, classification.get("confidence", 0.5))
-
-        return policy_analysis
-
-    def _identify_coverage_gaps(self, policy_analysis: Dict, category: str, user_policy: Dict = None) -> None:
-        """Identify potential coverage gaps based on scenario category."""
-        # Without user policy, identify standard gaps based on category
-        if category == "collision":
-            if "collision" not in policy_analysis["policy_details"]:
-                policy_analysis["coverage_gaps"].append({
-                    "type": "missing_coverage",
-                    "policy": "collision",
-                    "description": "Collision coverage not present but recommended for collision scenarios",
-                    "severity": "high"
-                })
-        elif category in ["weather_damage", "theft", "vandalism"]:
-            if "comprehensive" not in policy_analysis["policy_details"]:
-                policy_analysis["coverage_gaps"].append({
-                    "type": "missing_coverage",
-                    "policy": "comprehensive",
-                    "description": f"Comprehensive coverage not present but recommended for {category.replace('_', ' ')}",
-                    "severity": "high"
-                })
-        elif category == "medical":
-            if "medical_payments" not in policy_analysis["policy_details"] and "personal_injury_protection" not in policy_analysis["policy_details"]:
-                policy_analysis["coverage_gaps"].append({
-                    "type": "missing_coverage",
-                    "policy": "medical_payments",
-                    "description": "Medical payments or personal injury protection coverage not present but recommended for medical expenses",
-                    "severity": "high"
-                })
-
-    def _generate_recommendations(self, policy_analysis: Dict, category: str, confidence: float) -> None:
-        """Generate policy recommendations based on analysis."""
-        # Process coverage gaps first
-        for gap in policy_analysis["coverage_gaps"]:
-            if gap["type"] == "missing_coverage":
-                policy_analysis["recommendations"].append({
-                    "action": "add_coverage",
-                    "coverage": gap["policy"],
-                    "description": gap["description"],
-                    "priority": gap["severity"],
-                    "confidence": confidence
-                })
+        confidence = classification.get("confidence", 0.5)
+        analysis = self.analysis_table().get(category, tuple(relevant_policies))
+
+        held = self.rule_set.coverage.held(user_policy) if user_policy else None
+        if held is not None:
+            # Gaps against the coverages, limits and deductibles the user holds
+            coverage_gaps = tuple(freeze(gap) for gap in self.rule_set.coverage.gaps(category, held))
+            return PolicyAnalysis(analysis.primary_coverage, analysis.secondary_coverage, analysis.policy_details,
+                                  coverage_gaps, _recommendations(coverage_gaps, confidence))
+
+        # Without user policy, identify standard gaps based on category: a lookup
+        return analysis.with_confidence(confidence)
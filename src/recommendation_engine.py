@@ -3,123 +3,33 @@ from typing import Dict, List, Optional, Tuple
 import json
 import asyncio
 from src.utils.cache import TokenCache
+from src.results import Recommendation, freeze
+from src.rules.loader import current_rules, pinned_rules
 
 class RecommendationEngine:
     """Advanced recommendation engine for insurance scenarios."""
 
-    def __init__(self, db_connector=None):
+    def __init__(self, db_connector=None, rules=None):
         # Connect to database for historical data if provided
         self.db_connector = db_connector
 
-        # Load recommendation rules
-        self._load_recommendation_rules()
+        # Compiled rule files; recommendation rules are a decision-table lookup.
+        # None follows reloads of the default rules
+        self._rules = rules
 
         # Initialize cache
-        self.cache = TokenCache()
-
-    def _load_recommendation_rules(self):
-        """Load rule-based recommendation logic."""
-        self.rules = {
-            "collision": {
-                "high_risk": [
-                    {"action": "increase_coverage", "policy": "liability", "min_amount": "$100,000/$300,000",
-                     "reason": "Higher liability limits provide better protection in serious collision scenarios"},
-                    {"action": "add_coverage", "policy": "uninsured_motorist", "condition": "not_present",
-                     "reason": "Uninsured motorist coverage protects you when the at-fault driver has no insurance"}
-                ],
-                "moderate_risk": [
-                    {"action": "review_deductible", "policy": "collision", "suggestion": "evaluate_optimal",
-                     "reason": "Optimizing your deductible can balance premium costs with out-of-pocket expenses"},
-                    {"action": "consider_coverage", "policy": "medical_payments", "condition": "not_present",
-                     "reason": "Medical payments coverage provides additional protection for injury expenses"}
-                ],
-                "low_risk": [
-                    {"action": "maintain_coverage", "policy": "liability",
-                     "reason": "Your current liability coverage appears appropriate for this risk level"}
-                ]
-            },
-            "parking_damage": {
-                "high_risk": [
-                    {"action": "add_coverage", "policy": "comprehensive", "condition": "not_present",
-                     "reason": "Comprehensive coverage would protect against future parking damage incidents"},
-                    {"action": "decrease_deductible", "policy": "comprehensive", "max_amount": "$250",
-                     "reason": "A lower deductible reduces out-of-pocket expenses for frequent claims"}
-                ],
-                "moderate_risk": [
-                    {"action": "add_coverage", "policy": "comprehensive", "condition": "not_present",
-                     "reason": "Comprehensive coverage protects against damage while parked"},
-                    {"action": "review_deductible", "policy": "comprehensive", "suggestion": "evaluate_optimal",
-                     "reason": "Consider your deductible based on the frequency of claims and premium costs"}
-                ]
-            },
-            "weather_damage": {
-                "high_risk": [
-                    {"action": "add_coverage", "policy": "comprehensive", "condition": "not_present",
-                     "reason": "Comprehensive coverage is essential for weather-related damage protection"},
-                    {"action": "review_coverage_limits", "policy": "comprehensive", "suggestion": "increase",
-                     "reason": "Higher coverage limits provide better protection against severe weather damage"}
-                ],
-                "moderate_risk": [
-                    {"action": "add_coverage", "policy": "comprehensive", "condition": "not_present",
-                     "reason": "Comprehensive coverage protects against weather damage to your vehicle"},
-                    {"action": "consider_coverage", "policy": "roadside_assistance", "condition": "not_present",
-                     "reason": "Roadside assistance can help in weather-related breakdown situations"}
-                ]
-            },
-            "theft": {
-                "high_risk": [
-                    {"action": "add_coverage", "policy": "comprehensive", "condition": "not_present",
-                     "reason": "Comprehensive coverage is essential for theft protection"},
-                    {"action": "consider_coverage", "policy": "rental_reimbursement", "condition": "not_present",
-                     "reason": "Rental reimbursement provides transportation while your vehicle is being replaced"}
-                ],
-                "moderate_risk": [
-                    {"action": "add_coverage", "policy": "comprehensive", "condition": "not_present",
-                     "reason": "Comprehensive coverage includes theft protection"}
-                ]
-            },
-            "vandalism": {
-                "high_risk": [
-                    {"action": "add_coverage", "policy": "comprehensive", "condition": "not_present",
-                     "reason": "Comprehensive coverage protects against vandalism damage"},
-                    {"action": "decrease_deductible", "policy": "comprehensive", "max_amount": "$500",
-                     "reason": "A lower deductible reduces out-of-pocket expenses for vandalism claims"}
-                ],
-                "moderate_risk": [
-                    {"action": "add_coverage", "policy": "comprehensive", "condition": "not_present",
-                     "reason": "Comprehensive coverage includes protection against vandalism"}
-                ]
-            },
-            "medical": {
-                "high_risk": [
-                    {"action": "increase_coverage", "policy": "medical_payments", "min_amount": "$10,000",
-                     "reason": "Higher medical payments limits provide better protection for serious injuries"},
-                    {"action": "add_coverage", "policy": "personal_injury_protection", "condition": "not_present",
-                     "reason": "Personal injury protection provides broader medical coverage and lost wages"}
-                ],
-                "moderate_risk": [
-                    {"action": "review_coverage_limits", "policy": "medical_payments", "suggestion": "evaluate",
-                     "reason": "Ensure your medical coverage limits match potential medical expenses"}
-                ]
-            }
-        }
+        self.cache = TokenCache("recommendation")
 
-        # Global rules that apply across categories
-        self.global_rules = [
-            {"condition": "high_value_vehicle",
-             "action": "consider_coverage",
-             "policy": "gap_insurance",
-             "reason": "Gap insurance covers the difference between your car's value and what you owe if it's totaled"},
-            {"condition": "multiple_claims",
-             "action": "review_deductible",
-             "policy": "all",
-             "reason": "With multiple claims, optimizing your deductible can reduce overall costs"}
-        ]
+    @property
+    def rule_set(self):
+        """Rules this engine evaluates against: the ones it was given, else the current snapshot."""
+        return self._rules or current_rules()
 
+    @pinned_rules
     async def generate_recommendations(self, classification: Dict,
                                  policy_analysis: Dict,
                                  risk_assessment: Dict,
-                                 user_profile: Dict = None) -> List[Dict]:
+                                 user_profile: Dict = None) -> Tuple[Recommendation, ...]:
         """
         Generate tailored recommendations based on scenario analysis.
 
@@ -130,10 +40,15 @@ class RecommendationEngine:
             user_profile: Optional user profile with policy history
 
         Returns:
-            List of recommendation objects
+            Recommendations, highest priority first; cached and shared, so immutable
         """
-        # Create cache key
-        cache_key = f"recommendation_{classification.get('category')}_{risk_assessment.get('risk_level')}"
+        # Create cache key; entries of other versions of the rules they depend on are dropped
+        rules_version = self.rule_set.fingerprint_of("risk", "policies", "recommendations")
+        self.cache.invalidate_unless(rules_version)
+        # Rule-based recommendations also depend on the policies present and the risk factors found
+        facts = self._facts(policy_analysis, risk_assessment)
+        cache_key = (f"recommendation_{rules_version}_{classification.get('category')}"
+                     f"_{risk_assessment.get('risk_level')}_{facts:x}")
         if user_profile:
             cache_key += f"_{user_profile.get('id', 'no_id')}"
 
@@ -146,7 +61,7 @@ class RecommendationEngine:
 
         # Get basic rule-based recommendations
         rule_recommendations = self._get_rule_based_recommendations(
-            classification, policy_analysis, risk_assessment)
+            classification, policy_analysis, risk_assessment, facts)
         recommendations.extend(rule_recommendations)
 
         # If historical data is available, enhance with data-driven recommendations
@@ -166,17 +81,35 @@ class RecommendationEngine:
         prioritized_recommendations = self._prioritize_recommendations(unique_recommendations)
 
         # Add tracking IDs to recommendations
-        for i, rec in enumerate(prioritized_recommendations):
-            rec["id"] = f"REC-{classification.get('category', 'general')}-{i+1}"
+        category = classification.get('category', 'general')
+        recommendations = tuple(
+            Recommendation(
+                id=f"REC-{category}-{i+1}",
+                type=rec.get("type"),
+                action=rec.get("action"),
+                policy=rec.get("policy"),
+                reason=rec.get("reason"),
+                details=freeze(rec.get("details", {})),
+                priority=rec.get("priority"),
+                confidence=rec.get("confidence")
+            )
+            for i, rec in enumerate(prioritized_recommendations)
+        )
 
         # Store in cache
-        self.cache.store(cache_key, prioritized_recommendations)
+        self.cache.store(cache_key, recommendations)
+
+        return recommendations
 
-        return prioritized_recommendations
+    def _facts(self, policy_analysis: Dict, risk_assessment: Dict) -> int:
+        """Policies present and identified risk factors, as one fact bitmask."""
+        return (self.rule_set.policy_mask(policy_analysis.get("policy_details", {}))
+                | self.rule_set.factor_mask(risk_assessment.get("identified_factors", [])))
 
     def _get_rule_based_recommendations(self, classification: Dict,
                                        policy_analysis: Dict,
-                                       risk_assessment: Dict) -> List[Dict]:
+                                       risk_assessment: Dict,
+                                       facts: Optional[int] = None) -> List[Dict]:
         """
         Get recommendations based on predefined rules.
 
@@ -184,47 +117,19 @@ class RecommendationEngine:
             classification: Scenario classification
             policy_analysis: Policy analysis results
             risk_assessment: Risk assessment results
+            facts: Fact bitmask of the analysis, if already computed
 
         Returns:
             List of rule-based recommendations
         """
         category = classification.get("category", "general_incident")
         risk_level = risk_assessment.get("risk_level", "moderate")
+        if facts is None:
+            facts = self._facts(policy_analysis, risk_assessment)
 
-        # Get applicable rules
-        category_rules = self.rules.get(category, {})
-        applicable_rules = category_rules.get(risk_level, [])
-
-        recommendations = []
-        for rule in applicable_rules:
-            # Check if rule conditions are met
-            if self._check_rule_conditions(rule, policy_analysis):
-                recommendations.append({
-                    "type": "rule_based",
-                    "action": rule.get("action"),
-                    "policy": rule.get("policy"),
-                    "reason": rule.get("reason", "Based on standard industry recommendations"),
-                    "details": {k: v for k, v in rule.items()
-                              if k not in ["action", "policy", "condition", "reason"]},
-                    "priority": self._get_rule_priority(rule, risk_level),
-                    "confidence": 0.85
-                })
-
-        # Add applicable global rules
-        for rule in self.global_rules:
-            if self._check_global_rule_condition(rule, classification, risk_assessment):
-                recommendations.append({
-                    "type": "global_rule",
-                    "action": rule.get("action"),
-                    "policy": rule.get("policy"),
-                    "reason": rule.get("reason", "Based on your overall risk profile"),
-                    "details": {k: v for k, v in rule.items()
-                              if k not in ["action", "policy", "condition", "reason"]},
-                    "priority": "medium",
-                    "confidence": 0.75
-                })
-
-        return recommendations
+        # Category rules, then global rules, with priority already resolved for the risk level
+        return [{**rec, "details": dict(rec["details"])}
+                for rec in self.rule_set.recommendations.lookup(category, risk_level, facts)]
 
     async def _get_data_driven_recommendations(self, classification: Dict,
                                         risk_assessment: Dict) -> List[Dict]:
@@ -340,76 +245,6 @@ class RecommendationEngine:
 
         return recommendations
 
-    def _check_rule_conditions(self, rule: Dict, policy_analysis: Dict) -> bool:
-        """
-        Check if conditions for a recommendation rule are met.
-
-        Args:
-            rule: Recommendation rule
-            policy_analysis: Policy analysis results
-
-        Returns:
-            True if conditions are met, False otherwise
-        """
-        condition = rule.get("condition")
-        policy = rule.get("policy")
-
-        if condition == "not_present":
-            current_policies = [p for p in policy_analysis.get("policy_details", {})]
-            return policy not in current_policies
-
-        # Default to True if no conditions or unknown condition
-        return True
-
-    def _check_global_rule_condition(self, rule: Dict, classification: Dict,
-                                   risk_assessment: Dict) -> bool:
-        """
-        Check if conditions for a global rule are met.
-
-        Args:
-            rule: Global recommendation rule
-            classification: Scenario classification
-            risk_assessment: Risk assessment results
-
-        Returns:
-            True if conditions are met, False otherwise
-        """
-        condition = rule.get("condition")
-
-        if condition == "high_value_vehicle":
-            return "vehicle_value" in risk_assessment.get("identified_factors", [])
-
-        if condition == "multiple_claims":
-            return "frequency" in risk_assessment.get("identified_factors", [])
-
-        # Default to False for global rules with unknown conditions
-        return False
-
-    def _get_rule_priority(self, rule: Dict, risk_level: str) -> str:
-        """
-        Determine priority of a recommendation based on rule and risk.
-
-        Args:
-            rule: Recommendation rule
-            risk_level: Assessed risk level
-
-        Returns:
-            Priority level (high, medium, low)
-        """
-        action = rule.get("action", "")
-
-        if risk_level in ["high", "very_high"]:
-            if action in ["add_coverage", "increase_coverage"]:
-                return "high"
-            return "medium"
-
-        if risk_level == "moderate":
-            if action in ["add_coverage"]:
-                return "medium"
-            return "low"
-
-        return "low"
-
     def _deduplicate_recommendations(self, recommendations: List[Dict]) -> List[Dict]:
         """
         Remove duplicate recommendations.
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import threading
+from typing import Any, Callable, Coroutine, Dict, Optional
+from src.config.settings import settings
+
+class ComponentRegistry:
+    """
+    Process-wide home of the analysis components and the event loop they run on.
+
+    The Flask UI and the FastAPI API both take their components from here, so
+    in a combined deployment they share one set of rule tables and caches.
+    """
+
+    def __init__(self):
+        self._components: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+
+        # Event loops and their threads do not survive fork
+        os.register_at_fork(after_in_child=self._reset_loop)
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the named component, building it on first use."""
+        component = self._components.get(name)
+        if component is None:
+            with self._lock:
+                component = self._components.get(name)
+                if component is None:
+                    component = factory()
+                    self._components[name] = component
+        return component
+
+    @property
+    def performance_monitor(self):
+        from src.utils.performance_monitor import PerformanceMonitor
+        from src.utils.slow_request_log import SlowRequestLog
+        return self.get("performance_monitor", lambda: PerformanceMonitor(slow_request_log=SlowRequestLog()))
+
+    @property
+    def case_history(self):
+        from src.services.case_history import CaseHistoryStore
+        return self.get("case_history", CaseHistoryStore)
+
+    @property
+    def classifier(self):
+        from src.classifiers.enhanced_scenario_classifier import EnhancedScenarioClassifier
+        return self.get("classifier", EnhancedScenarioClassifier)
+
+    @property
+    def policy_analyzer(self):
+        from src.policy_analyzer import PolicyAnalyzer
+        return self.get("policy_analyzer", PolicyAnalyzer)
+
+    @property
+    def loss_simulator(self):
+        from src.loss_simulator import LossSimulator
+        return self.get("loss_simulator", LossSimulator)
+
+    @property
+    def risk_assessor(self):
+        from src.risk_assessor import RiskAssessor
+        return self.get("risk_assessor", lambda: RiskAssessor(
+            loss_simulator=self.loss_simulator if settings.LOSS_SIMULATION_INLINE else None
+        ))
+
+    @property
+    def explanation_generator(self):
+        from src.explanation_generator import ExplanationGenerator
+        return self.get("explanation_generator", ExplanationGenerator)
+
+    @property
+    def recommendation_engine(self):
+        from src.recommendation_engine import RecommendationEngine
+        return self.get("recommendation_engine", RecommendationEngine)
+
+    @property
+    def pipeline(self):
+        from src.pipeline import AnalysisPipeline
+        return self.get("pipeline", lambda: AnalysisPipeline(
+            self.classifier,
+            self.policy_analyzer,
+            self.risk_assessor,
+            self.explanation_generator,
+            self.recommendation_engine,
+            performance_monitor=self.performance_monitor
+        ))
+
+    def warm_up(self) -> None:
+        """
+        Build every component and its rule tables now.
+
+        Called in a pre-fork master so the tables live in pages the workers
+        share copy-on-write instead of each worker building its own copy.
+        """
+        self.pipeline.rules_fingerprint()
+        self.policy_analyzer.analysis_table()
+
+    def close(self) -> None:
+        """
+        Flush the components that batch their writes, if they were built.
+
+        They also close at exit, but a serve.py worker never runs exit
+        handlers: it dies of the signal uvicorn re-raises after shutdown, or
+        leaves through os._exit(). The server's lifespan shutdown calls this.
+        """
+        case_history = self._components.get("case_history")
+        if case_history is not None:
+            case_history.close()
+        performance_monitor = self._components.get("performance_monitor")
+        if performance_monitor is not None and performance_monitor.slow_request_log:
+            performance_monitor.slow_request_log.close()
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Run coroutines submitted from threads on this loop (the ASGI server's loop)."""
+        self._loop = loop
+
+    def run(self, coro: Coroutine) -> Any:
+        """
+        Run a coroutine on the shared loop from a synchronous thread and wait for it.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            The coroutine's result
+        """
+        loop = self._get_loop()
+        if self._in_loop_thread(loop):
+            coro.close()
+            raise RuntimeError("registry.run() would deadlock when called from the event loop thread")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout=settings.SHARED_LOOP_TIMEOUT)
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            return loop
+
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                # No server loop attached (Flask on its own): run one in the background
+                loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=loop.run_forever, name="shared-event-loop", daemon=True)
+                self._loop_thread.start()
+                self._loop = loop
+            return self._loop
+
+    @staticmethod
+    def _in_loop_thread(loop: asyncio.AbstractEventLoop) -> bool:
+        try:
+            return asyncio.get_running_loop() is loop
+        except RuntimeError:
+            return False
+
+    def _reset_loop(self) -> None:
+        self._lock = threading.RLock()
+        self._loop = None
+        self._loop_thread = None
+
+registry = ComponentRegistry()
@@ -0,0 +1,253 @@
+import copy
+import copyreg
+import json
+from collections.abc import Mapping
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+_set_field = object.__setattr__
+
+def _proxy(mapping: Dict) -> MappingProxyType:
+    return MappingProxyType(mapping)
+
+def _reduce_proxy(proxy: MappingProxyType):
+    # By way of a module function: pickle cannot name the mappingproxy type itself
+    return _proxy, (dict(proxy),)
+
+# Frozen results hold mapping proxies; pickle and deepcopy them as the read-only views they are
+copyreg.pickle(MappingProxyType, _reduce_proxy)
+
+def to_plain(value: Any) -> Any:
+    """Deep copy of a result as plain dicts and lists, the shape JSON round trips produce."""
+    if isinstance(value, Mapping):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
+
+def freeze(value: Any) -> Any:
+    """Read-only deep copy: dicts become mapping proxies and lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+def json_default(value: Any) -> Any:
+    """json.dumps default= hook: result types as plain values, anything else as str."""
+    # Plain attribute lookup first: isinstance() against the Mapping ABC is the slow part
+    as_dict = getattr(type(value), "as_dict", None)
+    if as_dict is not None:
+        return as_dict(value)
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+def to_json(value: Any) -> str:
+    """Compact JSON of a result or of any structure containing results."""
+    return _encoder.encode(value)
+
+_encoder = json.JSONEncoder(separators=(",", ":"), default=json_default)
+
+class ResultRecord(Mapping):
+    """
+    Base of the slotted analysis result types.
+
+    A result reads like the dict it replaces: result["risk_level"],
+    result.get(...), iteration, dict(result) and equality with dicts all
+    work, so templates and callers are unchanged. Each result is one slotted
+    object instead of a dict carrying its own key table. Fields listed in
+    OPTIONAL are left out while None, as the dicts left out those keys.
+
+    Results are immutable once built, so one instance can be shared by
+    every request it answers; copy.copy() returns the same instance, while
+    copy.deepcopy() and pickle rebuild it field by field.
+    """
+
+    __slots__ = ()
+    OPTIONAL: Tuple[str, ...] = ()
+    _FIELDS: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELDS = frozenset(cls.__slots__)
+        cls._values = attrgetter(*cls.__slots__)
+
+    def _init(self, *values: Any) -> None:
+        """Set every field, in __slots__ order."""
+        for name, value in zip(self.__slots__, values):
+            _set_field(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        return _restore, (type(self), tuple(getattr(self, name) for name in self.__slots__))
+
+    def __copy__(self) -> "ResultRecord":
+        return self
+
+    def __deepcopy__(self, memo: Dict) -> "ResultRecord":
+        # Fields such as risk_factors are plain dicts, so a deep copy copies them
+        return _restore(type(self), copy.deepcopy(tuple(getattr(self, name) for name in self.__slots__), memo))
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELDS:
+            value = getattr(self, key)
+            if value is not None or key not in self.OPTIONAL:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.__slots__:
+            if name not in self.OPTIONAL or getattr(self, name) is not None:
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return to_plain(self) == to_plain(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{key}={value!r}' for key, value in self.items())})"
+
+    def as_dict(self) -> Dict:
+        """Shallow dict of the fields; nested results stay as they are."""
+        fields = dict(zip(self.__slots__, self._values(self)))
+        for name in self.OPTIONAL:
+            if fields[name] is None:
+                del fields[name]
+        return fields
+
+    def to_dict(self) -> Dict:
+        return to_plain(self)
+
+    def to_json(self) -> str:
+        return to_json(self)
+
+def _restore(cls: type, values: Tuple) -> ResultRecord:
+    """Rebuild a result from its field values, in __slots__ order, without calling __init__."""
+    record = cls.__new__(cls)
+    record._init(*values)
+    return record
+
+class FinancialImpact(ResultRecord):
+    """Estimated cost range of a claim."""
+
+    __slots__ = ("low_estimate", "median_estimate", "high_estimate", "currency")
+
+    def __init__(self, low_estimate: float, median_estimate: float, high_estimate: float, currency: str = "USD"):
+        self._init(low_estimate, median_estimate, high_estimate, currency)
+
+class RiskAssessment(ResultRecord):
+    """Result of RiskAssessor.assess_risk()."""
+
+    __slots__ = ("risk_score", "risk_level", "risk_factors", "identified_factors", "confidence",
+                 "primary_concerns", "financial_impact_estimate", "loss_distribution")
+    OPTIONAL = ("loss_distribution",)
+
+    def __init__(self, risk_score: float, risk_level: str, risk_factors: Dict[str, bool],
+                 identified_factors: Tuple[str, ...], confidence: float, primary_concerns: Tuple[str, ...],
+                 financial_impact_estimate: FinancialImpact, loss_distribution: Optional[Dict] = None):
+        self._init(risk_score, risk_level, risk_factors, identified_factors, confidence,
+                   primary_concerns, financial_impact_estimate, loss_distribution)
+
+class PolicyDetails(Mapping):
+    """Catalog entries of the policies an analysis covers, read from the shared catalog rather than copied."""
+
+    __slots__ = ("names", "catalog")
+
+    def __init__(self, names: Tuple[str, ...], catalog: Mapping):
+        _set_field(self, "names", tuple(name for name in names if name in catalog))
+        _set_field(self, "catalog", catalog)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("PolicyDetails is immutable")
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        return PolicyDetails, (self.names, self.catalog)
+
+    def __copy__(self) -> "PolicyDetails":
+        return self
+
+    def __deepcopy__(self, memo: Dict) -> "PolicyDetails":
+        return PolicyDetails(self.names, copy.deepcopy(self.catalog, memo))
+
+    def __getitem__(self, name: str) -> Dict:
+        if name in self.names:
+            return self.catalog[name]
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def as_dict(self) -> Dict:
+        catalog = self.catalog
+        return {name: catalog[name] for name in self.names}
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return to_plain(self) == to_plain(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PolicyDetails({list(self.names)!r})"
+
+class PolicyRecommendation(ResultRecord):
+    """Coverage recommendation that follows from a coverage gap."""
+
+    __slots__ = ("action", "coverage", "description", "priority", "confidence")
+
+    def __init__(self, action: str, coverage: str, description: str, priority: str, confidence: Optional[float]):
+        self._init(action, coverage, description, priority, confidence)
+
+    def with_confidence(self, confidence: float) -> "PolicyRecommendation":
+        return PolicyRecommendation(self.action, self.coverage, self.description, self.priority, confidence)
+
+class Recommendation(ResultRecord):
+    """One entry of RecommendationEngine.generate_recommendations()."""
+
+    __slots__ = ("id", "type", "action", "policy", "reason", "details", "priority", "confidence")
+
+    def __init__(self, id: str, type: str, action: str, policy: str, reason: str,
+                 details: Mapping, priority: str, confidence: float):
+        self._init(id, type, action, policy, reason, details, priority, confidence)
+
+class PolicyAnalysis(ResultRecord):
+    """Result of PolicyAnalyzer.analyze_policies()."""
+
+    __slots__ = ("primary_coverage", "secondary_coverage", "policy_details", "coverage_gaps", "recommendations")
+
+    def __init__(self, primary_coverage: Optional[str], secondary_coverage: Tuple[str, ...],
+                 policy_details: PolicyDetails, coverage_gaps: Tuple[Dict, ...],
+                 recommendations: Tuple[PolicyRecommendation, ...]):
+        self._init(primary_coverage, secondary_coverage, policy_details, coverage_gaps, recommendations)
+
+    def with_confidence(self, confidence: float) -> "PolicyAnalysis":
+        """
+        This analysis with its recommendations at the given confidence.
+
+        Only the recommendations are new objects; everything else is shared,
+        and an analysis without recommendations is returned as it is.
+        """
+        if not self.recommendations:
+            return self
+        return PolicyAnalysis(
+            self.primary_coverage, self.secondary_coverage, self.policy_details, self.coverage_gaps,
+            tuple(recommendation.with_confidence(confidence) for recommendation in self.recommendations)
+        )
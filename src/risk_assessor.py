@@ -1,71 +1,59 @@
-from typing import Dict, List, Optional
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from src.results import FinancialImpact, RiskAssessment
+from src.rules.loader import current_rules, pinned_rules
+from src.scenario_document import ScenarioDocument
+
+# Upper bounds of every risk level but the last, in order
+RISK_LEVEL_THRESHOLDS = (0.3, 0.6, 0.8)
+RISK_LEVELS = ("low", "moderate", "high", "very_high")
 
 class RiskAssessor:
     """Risk assessment system for auto insurance scenarios."""
 
-    def __init__(self):
-        # Risk factors and weights
-        self.risk_factors = {
-            "collision": {
-                "at_fault": 0.8,
-                "multiple_vehicles": 0.6,
-                "injuries": 0.9,
-                "weather_conditions": 0.5,
-                "vehicle_speed": 0.7
-            },
-            "parking_damage": {
-                "secured_location": 0.4,
-                "extent_of_damage": 0.6,
-                "frequency": 0.5
-            },
-            "weather_damage": {
-                "severe_weather": 0.7,
-                "extent_of_damage": 0.8,
-                "vehicle_storage": 0.5
-            },
-            "theft": {
-                "high_crime_area": 0.8,
-                "vehicle_type": 0.7,
-                "security_measures": 0.6
-            },
-            "vandalism": {
-                "high_crime_area": 0.7,
-                "extent_of_damage": 0.5,
-                "secured_location": 0.5
-            },
-            "medical": {
-                "severity_of_injury": 0.9,
-                "number_of_injured": 0.7,
-                "treatment_required": 0.8
-            }
-        }
+    def __init__(self, loss_simulator=None, rules=None):
+        # Optional LossSimulator; when set, every assessment includes a simulated loss distribution
+        self.loss_simulator = loss_simulator
 
-        # Base risk scores for each category
-        self.base_risk_scores = {
-            "collision": 0.6,
-            "parking_damage": 0.4,
-            "weather_damage": 0.5,
-            "theft": 0.7,
-            "vandalism": 0.5,
-            "medical": 0.8,
-            "general_incident": 0.5
-        }
+        # Compiled rule files; None follows reloads of the default rules
+        self._rules = rules
+
+    @property
+    def rule_set(self):
+        """Rules this assessor evaluates against: the ones it was given, else the current snapshot."""
+        return self._rules or current_rules()
 
-    async def assess_risk(self, classification: Dict, scenario_text: str) -> Dict:
+    @property
+    def risk_factors(self) -> Dict[str, Dict[str, float]]:
+        """Risk factor weights by category."""
+        return self.rule_set.risk_factors
+
+    @property
+    def base_risk_scores(self) -> Dict[str, float]:
+        """Base risk scores by category."""
+        return self.rule_set.base_risk_scores
+
+    @property
+    def base_costs(self) -> Dict[str, float]:
+        """Base costs by category (in USD)."""
+        return self.rule_set.base_costs
+
+    @pinned_rules
+    async def assess_risk(self, classification: Dict, scenario: Union[str, ScenarioDocument]) -> RiskAssessment:
         """
         Assess risk level for a classified scenario.
 
         Args:
             classification: Dictionary with scenario classification
-            scenario_text: Original scenario text
+            scenario: Original scenario text, or its ScenarioDocument
 
         Returns:
-            Dict with risk assessment information
+            RiskAssessment, readable as the dict it replaces
         """
         category = classification.get("category", "general_incident")
 
         # Extract risk factors from scenario text using simple rules
-        risk_factors = self._extract_risk_factors(category, scenario_text)
+        risk_factors = self._extract_risk_factors(category, scenario)
 
         # Calculate base risk score
         base_risk_score = self._calculate_base_risk(category)
@@ -82,57 +70,152 @@ class RiskAssessor:
         # Calculate financial impact estimate
         financial_impact = self._estimate_financial_impact(category, modified_risk_score)
 
-        return {
-            "risk_score": round(modified_risk_score, 2),
-            "risk_level": risk_level,
-            "risk_factors": risk_factors,
-            "identified_factors": list(filter(lambda f: risk_factors.get(f, False), risk_factors.keys())),
-            "confidence": classification.get("confidence", 0.5),
-            "primary_concerns": primary_concerns,
-            "financial_impact_estimate": financial_impact
-        }
+        loss_distribution = None
+        if self.loss_simulator is not None:
+            # CPU-bound for tens of milliseconds; keep it off the event loop
+            loss_distribution = await asyncio.to_thread(
+                self.loss_simulator.simulate, category, financial_impact.median_estimate)
+
+        return RiskAssessment(
+            risk_score=round(modified_risk_score, 2),
+            risk_level=risk_level,
+            risk_factors=risk_factors,
+            identified_factors=tuple(f for f, present in risk_factors.items() if present),
+            confidence=classification.get("confidence", 0.5),
+            primary_concerns=primary_concerns,
+            financial_impact_estimate=financial_impact,
+            loss_distribution=loss_distribution
+        )
+
+    @pinned_rules
+    def assess_risk_batch(self, classifications: Sequence[Dict],
+                          scenario_texts: Sequence[Union[str, ScenarioDocument]]) -> List[RiskAssessment]:
+        """
+        Assess many classified scenarios at once.
+
+        Factor extraction is per scenario; scoring, risk levels and financial
+        impact are computed for the whole batch in a few array operations.
+        Each result has the same shape as assess_risk()'s.
 
-    def _extract_risk_factors(self, category: str, scenario_text: str) -> Dict:
-        """Extract risk factors from scenario text using simple rules."""
-        extracted_factors = {}
-        text_lower = scenario_text.lower()
+        Args:
+            classifications: Classification of each scenario
+            scenario_texts: Original text (or ScenarioDocument) of each scenario, in the same order
 
-        # Common factors across categories
-        if any(word in text_lower for word in ["fault", "responsible", "caused", "my fault"]):
-            extracted_factors["at_fault"] = True
+        Returns:
+            List of risk assessments, one per scenario
+        """
+        categories = [c.get("category", "general_incident") for c in classifications]
+        extracted = [self._extract_risk_factors(category, text)
+                     for category, text in zip(categories, scenario_texts)]
+
+        # Plain lists: indexing numpy arrays element by element is slow
+        scores = {name: values.tolist() for name, values in self.score_batch(categories, extracted).items()}
+
+        results = []
+        for i, (classification, category, risk_factors) in enumerate(zip(classifications, categories, extracted)):
+            financial_impact = FinancialImpact(
+                low_estimate=round(scores["low_estimate"][i], 2),
+                median_estimate=round(scores["median_estimate"][i], 2),
+                high_estimate=round(scores["high_estimate"][i], 2)
+            )
+            loss_distribution = None
+            if self.loss_simulator is not None:
+                loss_distribution = self.loss_simulator.simulate(category, financial_impact.median_estimate)
+            results.append(RiskAssessment(
+                risk_score=round(scores["risk_score"][i], 2),
+                risk_level=RISK_LEVELS[scores["risk_level"][i]],
+                risk_factors=risk_factors,
+                identified_factors=tuple(f for f, present in risk_factors.items() if present),
+                confidence=classification.get("confidence", 0.5),
+                primary_concerns=self._identify_primary_concerns(category, risk_factors),
+                financial_impact_estimate=financial_impact,
+                loss_distribution=loss_distribution
+            ))
+        return results
+
+    @pinned_rules
+    def score_batch(self, categories: Sequence[str], risk_factors: Sequence[Dict]) -> Dict:
+        """
+        Score already-extracted risk factors against the current weights.
 
-        if any(word in text_lower for word in ["multiple", "several", "many", "two", "three"]) and any(word in text_lower for word in ["vehicles", "cars", "trucks"]):
-            extracted_factors["multiple_vehicles"] = True
+        Re-scoring a stored portfolio after a weight change only needs this
+        step, not factor extraction.
 
-        if any(word in text_lower for word in ["injury", "injuries", "hurt", "pain", "hospital"]):
-            extracted_factors["injuries"] = True
+        Args:
+            categories: Category of each scenario
+            risk_factors: Extracted risk factors of each scenario, as from assess_risk()
 
-        # Category-specific factors
-        if category == "collision":
-            if any(word in text_lower for word in ["fast", "speed", "speeding"]):
-                extracted_factors["vehicle_speed"] = True
+        Returns:
+            Dict of arrays: risk_score, risk_level (index into RISK_LEVELS),
+            low_estimate, median_estimate and high_estimate
+        """
+        # Imported on first batch so single-scenario paths keep their cold start
+        import numpy as np
+
+        category_names, factor_names, weights, base_scores, base_costs = self._risk_tables()
+        category_rows = {name: row for row, name in enumerate(category_names)}
+        factor_columns = {name: column for column, name in enumerate(factor_names)}
+        unknown_row = len(category_names)
+
+        # Scenarios x factors; unknown factors have no weight in any category
+        present = np.zeros((len(categories), len(factor_names)), dtype=bool)
+        for i, factors in enumerate(risk_factors):
+            for factor, value in factors.items():
+                column = factor_columns.get(factor)
+                if value and column is not None:
+                    present[i, column] = True
+
+        rows = np.fromiter((category_rows.get(c, unknown_row) for c in categories),
+                           dtype=np.intp, count=len(categories))
+
+        # Same arithmetic as _apply_risk_modifiers: base + 0.1 * weight per present
+        # factor, one column at a time. Columns follow the order extraction emits
+        # factors in, so both add in the same order and agree bit for bit at the
+        # level thresholds
+        increments = np.where(present, weights[rows] * 0.1, 0.0)
+        risk_score = base_scores[rows].copy()
+        for column in range(len(factor_names)):
+            risk_score += increments[:, column]
+        risk_score = np.clip(risk_score, 0.0, 1.0)
+        risk_level = np.searchsorted(np.asarray(RISK_LEVEL_THRESHOLDS), risk_score, side="right")
+
+        median_estimate = base_costs[rows] * (0.5 + risk_score * 2.5)
+        return {
+            "risk_score": risk_score,
+            "risk_level": risk_level,
+            "low_estimate": median_estimate * 0.7,
+            "median_estimate": median_estimate,
+            "high_estimate": median_estimate * 1.3
+        }
 
-            if any(word in text_lower for word in ["rain", "snow", "ice", "wet"]):
-                extracted_factors["weather_conditions"] = True
+    def _risk_tables(self) -> Tuple:
+        """
+        Dense copies of the weight tables for batch scoring.
 
-        elif category == "parking_damage":
-            if any(word in text_lower for word in ["secure", "garage", "private"]):
-                extracted_factors["secured_location"] = False  # Note the negation
-            else:
-                extracted_factors["secured_location"] = True
+        Built from the current rule snapshot on every call, so reloaded
+        weights apply to the next batch. The last row is for unknown
+        categories.
+        """
+        import numpy as np
 
-            if any(word in text_lower for word in ["significant", "extensive", "substantial"]):
-                extracted_factors["extent_of_damage"] = True
+        category_names = list(dict.fromkeys([*self.base_risk_scores, *self.risk_factors]))
+        factor_names = list(dict.fromkeys(
+            [*self.rule_set.factor_order, *(f for weights in self.risk_factors.values() for f in weights)]))
 
-        elif category == "weather_damage":
-            if any(word in text_lower for word in ["severe", "major", "strong", "hurricane"]):
-                extracted_factors["severe_weather"] = True
+        weights = np.zeros((len(category_names) + 1, len(factor_names)))
+        for row, category in enumerate(category_names):
+            for column, factor in enumerate(factor_names):
+                weights[row, column] = self.risk_factors.get(category, {}).get(factor, 0.0)
 
-        elif category in ["theft", "vandalism"]:
-            if any(word in text_lower for word in ["high crime", "dangerous", "unsafe"]):
-                extracted_factors["high_crime_area"] = True
+        base_scores = np.array([self._calculate_base_risk(c) for c in category_names] + [0.5])
+        base_costs = np.array([self.base_costs.get(c, 2500) for c in category_names] + [2500], dtype=float)
+        return category_names, factor_names, weights, base_scores, base_costs
 
-        return extracted_factors
+    def _extract_risk_factors(self, category: str, scenario: Union[str, ScenarioDocument]) -> Dict:
+        """Extract risk factors from scenario text with the factor rules."""
+        rules = self.rule_set
+        term_mask = ScenarioDocument.of(scenario).term_mask(rules)
+        return dict(rules.factor_extraction.lookup(category, None, term_mask))
 
     def _calculate_base_risk(self, category: str) -> float:
         """Calculate base risk score for category."""
@@ -154,61 +237,31 @@ class RiskAssessor:
 
     def _determine_risk_level(self, risk_score: float) -> str:
         """Determine risk level based on score."""
-        if risk_score < 0.3:
-            return "low"
-        elif risk_score < 0.6:
-            return "moderate"
-        elif risk_score < 0.8:
-            return "high"
+        if risk_score < RISK_LEVEL_THRESHOLDS[0]:
+            return RISK_LEVELS[0]
+        elif risk_score < RISK_LEVEL_THRESHOLDS[1]:
+            return RISK_LEVELS[1]
+        elif risk_score < RISK_LEVEL_THRESHOLDS[2]:
+            return RISK_LEVELS[2]
         else:
-            return "very_high"
+            return RISK_LEVELS[3]
 
-    def _identify_primary_concerns(self, category: str, risk_factors: Dict) -> List[str]:
+    def _identify_primary_concerns(self, category: str, risk_factors: Dict) -> Tuple[str, ...]:
         """Identify primary risk concerns."""
-        concerns = []
-
-        # Category-specific concerns
-        if category == "collision":
-            if risk_factors.get("at_fault", False):
-                concerns.append("Potential liability for damages")
-            if risk_factors.get("injuries", False):
-                concerns.append("Potential medical claims")
-            if risk_factors.get("multiple_vehicles", False):
-                concerns.append("Multiple vehicle involvement increases complexity")
-
-        elif category == "parking_damage":
-            if risk_factors.get("secured_location", False):
-                concerns.append("Unsecured location increases risk of recurrence")
-
-        elif category == "weather_damage":
-            if risk_factors.get("severe_weather", False):
-                concerns.append("Severe weather caused extensive damage")
-
-        elif category == "theft":
-            if risk_factors.get("high_crime_area", False):
-                concerns.append("High crime area increases risk of future theft")
+        present = self.rule_set.factor_mask(factor for factor, value in risk_factors.items() if value)
+        # The rule table's own tuple, shared by every assessment with the same facts
+        concerns = self.rule_set.concerns.lookup(category, None, present)
 
         # If no specific concerns identified, add a general one
         if not concerns:
-            concerns.append(f"Standard {category.replace('_', ' ')} risk assessment")
+            concerns = (f"Standard {category.replace('_', ' ')} risk assessment",)
 
         return concerns
 
-    def _estimate_financial_impact(self, category: str, risk_score: float) -> Dict:
+    def _estimate_financial_impact(self, category: str, risk_score: float) -> FinancialImpact:
         """Estimate financial impact of the incident."""
-        # Base costs by category (in USD)
-        base_costs = {
-            "collision": 3500,
-            "parking_damage": 1200,
-            "weather_damage": 2800,
-            "theft": 8000,
-            "vandalism": 1800,
-            "medical": 5000,
-            "general_incident": 2500
-        }
-
         # Get base cost for this category
-        base_cost = base_costs.get(category, 2500)
+        base_cost = self.base_costs.get(category, 2500)
 
         # Apply severity multiplier based on risk score
         severity_multiplier = 0.5 + (risk_score * 2.5)
@@ -218,9 +271,8 @@ class RiskAssessor:
         low_estimate = median_estimate * 0.7
         high_estimate = median_estimate * 1.3
 
-        return {
-            "low_estimate": round(low_estimate, 2),
-            "median_estimate": round(median_estimate, 2),
-            "high_estimate": round(high_estimate, 2),
-            "currency": "USD"
-        }
+        return FinancialImpact(
+            low_estimate=round(low_estimate, 2),
+            median_estimate=round(median_estimate, 2),
+            high_estimate=round(high_estimate, 2)
+        )
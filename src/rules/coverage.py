@@ -0,0 +1,160 @@
+import re
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+from src.rules.engine import FactIndex, RuleError
+
+# Bits are held in unsigned 64-bit integers when a whole book is evaluated at once
+MAX_COVERAGES = 64
+
+_AMOUNT = re.compile(r"[0-9][0-9,]*(?:\.[0-9]+)?")
+
+class Requirement(NamedTuple):
+    """
+    One coverage a category calls for.
+
+    Met when the policyholder holds any coverage in any_of whose limit is at
+    least min_limit and whose deductible is at most max_deductible. A limit
+    or deductible the policy does not state never counts as a gap.
+    """
+    any_of: Tuple[str, ...]
+    mask: int
+    min_limit: Optional[float]
+    max_deductible: Optional[float]
+    severity: str
+    description: str
+
+class HeldCoverage(NamedTuple):
+    """A user policy in the form requirements are checked against."""
+    mask: int
+    limits: Dict[str, float]
+    deductibles: Dict[str, float]
+
+def parse_amount(value) -> Optional[float]:
+    """
+    Dollar amount of a limit or deductible: 50000, "50000", "$50,000".
+
+    Split limits ("$25,000/$50,000/$25,000") are compared by their first
+    figure, the per-person limit.
+    """
+    if type(value) in (int, float):
+        return float(value)
+    if value is None or isinstance(value, bool):
+        return None
+    match = _AMOUNT.search(str(value))
+    return float(match.group().replace(",", "")) if match else None
+
+class CoverageRequirements:
+    """
+    Coverage requirements of every category, compiled against one bit per coverage.
+
+    Coverages take their bits in policy catalog order, so a policyholder's
+    held coverages are one integer and "holds none of these" is a single
+    AND. CoverageBook evaluates the same masks over a whole book of
+    policies with array operations.
+    """
+
+    def __init__(self, catalog: Iterable[str], requirements: Mapping[str, List[Dict]]):
+        self.coverages = FactIndex(catalog)
+        if len(self.coverages.bits) > MAX_COVERAGES:
+            raise RuleError(f"At most {MAX_COVERAGES} coverages can be checked for gaps")
+
+        self.by_category: Dict[str, Tuple[Requirement, ...]] = {}
+        for category, specs in requirements.items():
+            self.by_category[category] = tuple(self._compile(category, spec) for spec in specs)
+
+    def _compile(self, category: str, spec: Dict) -> Requirement:
+        any_of = tuple(spec.get("any_of") or ())
+        unknown = [name for name in any_of if name not in self.coverages.bits]
+        if not any_of or unknown:
+            raise RuleError(f"Coverage requirement for {category} names no coverage or unknown coverages {unknown}")
+        return Requirement(
+            any_of=any_of,
+            mask=self.coverages.mask(any_of),
+            min_limit=parse_amount(spec.get("min_limit")),
+            max_deductible=parse_amount(spec.get("max_deductible")),
+            severity=spec.get("severity", "medium"),
+            description=spec["description"]
+        )
+
+    def held(self, user_policy: Dict) -> Optional[HeldCoverage]:
+        """
+        Coverages, limits and deductibles of a user policy.
+
+        A user policy lists its coverages as {"coverages": {"collision":
+        {"limit": ..., "deductible": ...}, ...}} or simply as {"coverages":
+        ["liability", "collision"]}. Coverages not in the catalog are ignored.
+
+        Returns:
+            The held coverage, or None if the policy does not list coverages
+            in either form
+        """
+        # User policies arrive as parsed JSON, so plain dict checks suffice (and are much cheaper than ABCs)
+        coverages = user_policy.get("coverages") if isinstance(user_policy, dict) else None
+        if isinstance(coverages, (list, tuple)) and all(isinstance(name, str) for name in coverages):
+            coverages = dict.fromkeys(coverages)
+        elif not isinstance(coverages, dict):
+            # Client input: anything but a dict or a list of names is no coverage list
+            return None
+
+        bits = self.coverages.bits
+        limits, deductibles = {}, {}
+        for name, terms in coverages.items():
+            if type(terms) is not dict or name not in bits:
+                continue
+            limit = parse_amount(terms.get("limit"))
+            if limit is not None:
+                limits[name] = limit
+            deductible = parse_amount(terms.get("deductible"))
+            if deductible is not None:
+                deductibles[name] = deductible
+        return HeldCoverage(self.coverages.mask(coverages), limits, deductibles)
+
+    def gaps(self, category: str, held: HeldCoverage) -> List[Dict]:
+        """
+        Gaps of one policyholder for one category, in requirement order.
+
+        Each gap is {"type", "policy", "description", "severity"}; limit and
+        deductible gaps also carry the held and the recommended amount.
+        """
+        category_label = category.replace("_", " ")
+        gaps = []
+        for requirement in self.by_category.get(category, ()):
+            held_names = [name for name in requirement.any_of if held.mask & self.coverages.bits[name]]
+            if not held_names:
+                gaps.append({
+                    "type": "missing_coverage",
+                    "policy": requirement.any_of[0],
+                    "description": requirement.description.format(category_label=category_label),
+                    "severity": requirement.severity
+                })
+                continue
+
+            if requirement.min_limit is not None and not any(
+                    held.limits.get(name, requirement.min_limit) >= requirement.min_limit for name in held_names):
+                policy = held_names[0]
+                gaps.append({
+                    "type": "insufficient_limit",
+                    "policy": policy,
+                    "description": (f"{_label(policy)} limit of ${held.limits[policy]:,.0f} is below the "
+                                    f"${requirement.min_limit:,.0f} recommended for {category_label}"),
+                    "severity": requirement.severity,
+                    "limit": held.limits[policy],
+                    "recommended_limit": requirement.min_limit
+                })
+
+            if requirement.max_deductible is not None and not any(
+                    held.deductibles.get(name, requirement.max_deductible) <= requirement.max_deductible
+                    for name in held_names):
+                policy = held_names[0]
+                gaps.append({
+                    "type": "high_deductible",
+                    "policy": policy,
+                    "description": (f"{_label(policy)} deductible of ${held.deductibles[policy]:,.0f} is above the "
+                                    f"${requirement.max_deductible:,.0f} recommended for {category_label}"),
+                    "severity": requirement.severity,
+                    "deductible": held.deductibles[policy],
+                    "recommended_deductible": requirement.max_deductible
+                })
+        return gaps
+
+def _label(policy: str) -> str:
+    return policy.replace("_", " ").capitalize()
@@ -0,0 +1,198 @@
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+class RuleError(ValueError):
+    """A rule file is malformed or uses an unsupported format."""
+    pass
+
+class FactIndex:
+    """Assigns each named fact a bit, so a set of facts becomes one integer."""
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.bits: Dict[str, int] = {}
+        for name in names:
+            self.bit(name)
+
+    def bit(self, name: str) -> int:
+        bit = self.bits.get(name)
+        if bit is None:
+            bit = self.bits[name] = 1 << len(self.bits)
+        return bit
+
+    def mask(self, names: Iterable[str]) -> int:
+        """Bitmask of the known facts among `names`; unknown facts are ignored."""
+        mask = 0
+        bits = self.bits
+        for name in names:
+            mask |= bits.get(name, 0)
+        return mask
+
+    def compile(self, names: Iterable[str]) -> int:
+        """Bitmask of `names`, assigning bits to facts seen for the first time."""
+        mask = 0
+        for name in names:
+            mask |= self.bit(name)
+        return mask
+
+class CompiledRule(NamedTuple):
+    categories: Optional[frozenset]
+    risk_levels: Optional[frozenset]
+    all_mask: int
+    none_mask: int
+    any_masks: Tuple[int, ...]
+    payload: Any
+
+    @property
+    def mask(self) -> int:
+        """Every fact bit the rule reads."""
+        mask = self.all_mask | self.none_mask
+        for any_mask in self.any_masks:
+            mask |= any_mask
+        return mask
+
+    def matches(self, facts: int) -> bool:
+        return (facts & self.all_mask == self.all_mask
+                and not facts & self.none_mask
+                and all(facts & any_mask for any_mask in self.any_masks))
+
+def compile_rule(rule: Dict, facts: FactIndex) -> CompiledRule:
+    """
+    Compile one declarative rule.
+
+    A rule is {"id": ..., "when": {...}, "then": {...}}. Every condition in
+    "when" is optional:
+
+        category:   categories the rule applies to
+        risk_level: risk levels the rule applies to
+        all:        facts that must all be present
+        none:       facts that must all be absent
+        any:        list of fact groups; each group needs at least one present fact
+
+    Args:
+        rule: The rule as loaded from its file
+        facts: Index that names in the conditions are compiled against
+
+    Returns:
+        The compiled rule, with "then" as its payload
+    """
+    if "then" not in rule:
+        raise RuleError(f"Rule {rule.get('id', '?')} has no 'then'")
+    when = rule.get("when", {})
+    unknown = set(when) - {"category", "risk_level", "all", "none", "any"}
+    if unknown:
+        raise RuleError(f"Rule {rule.get('id', '?')} has unknown conditions: {', '.join(sorted(unknown))}")
+
+    return CompiledRule(
+        categories=frozenset(when["category"]) if "category" in when else None,
+        risk_levels=frozenset(when["risk_level"]) if "risk_level" in when else None,
+        all_mask=facts.compile(when.get("all", [])),
+        none_mask=facts.compile(when.get("none", [])),
+        any_masks=tuple(facts.compile(group) for group in when.get("any", [])),
+        payload=rule["then"]
+    )
+
+class _Cell:
+    """Decision table of one (category, risk level): relevant fact bits -> outcome."""
+
+    __slots__ = ("mask", "rules", "outcomes", "category", "risk_level")
+
+    def __init__(self, category: Optional[str], risk_level: Optional[str], rules: List[CompiledRule]):
+        self.category = category
+        self.risk_level = risk_level
+        self.rules = tuple(rules)
+        self.mask = 0
+        for rule in rules:
+            self.mask |= rule.mask
+        self.outcomes: Dict[int, Tuple] = {}
+
+class DecisionTable:
+    """
+    Rules compiled into lookup tables keyed by (category, risk_level, fact bitmask).
+
+    Rules are indexed by category and risk level at compile time. Within a
+    cell, the outcome depends only on the fact bits its rules read, so the
+    table is keyed by `facts & cell.mask`. Cells reading few enough bits are
+    fully materialized when built; larger ones fill in as fact combinations
+    are seen. Either way a lookup is two dict probes, however many rules
+    there are.
+
+    Outcomes are tuples of rendered payloads shared between lookups; callers
+    must copy them before mutating.
+    """
+
+    def __init__(self, rules: List[CompiledRule],
+                 render: Optional[Callable[[Any, Optional[str], Optional[str]], Any]] = None,
+                 categories: Iterable[Optional[str]] = (), risk_levels: Iterable[Optional[str]] = (None,),
+                 max_eager_bits: int = 10, max_outcomes: int = 4096):
+        self.rules = tuple(rules)
+        self.render = render or (lambda payload, category, risk_level: payload)
+        self.max_eager_bits = max_eager_bits
+        self.max_outcomes = max_outcomes
+        self._cells: Dict[Tuple[Optional[str], Optional[str]], _Cell] = {}
+
+        for category in categories:
+            for risk_level in risk_levels:
+                self._cell(category, risk_level)
+
+    def to_state(self) -> Tuple:
+        """Compiled rules and every materialized outcome, as plain marshallable values."""
+        # Payloads are dicts, so rules are not hashable; index them by identity
+        rule_index = {id(rule): i for i, rule in enumerate(self.rules)}
+        cells = {key: (tuple(rule_index[id(rule)] for rule in cell.rules), dict(cell.outcomes))
+                 for key, cell in self._cells.items()}
+        return tuple(tuple(rule) for rule in self.rules), self.max_eager_bits, self.max_outcomes, cells
+
+    @classmethod
+    def from_state(cls, state: Tuple,
+                   render: Optional[Callable[[Any, Optional[str], Optional[str]], Any]] = None) -> "DecisionTable":
+        """Rebuild a table from to_state() without evaluating any rule."""
+        rules, max_eager_bits, max_outcomes, cells = state
+        table = cls([CompiledRule(*rule) for rule in rules], render,
+                    max_eager_bits=max_eager_bits, max_outcomes=max_outcomes)
+        for (category, risk_level), (rule_indices, outcomes) in cells.items():
+            cell = _Cell(category, risk_level, [table.rules[i] for i in rule_indices])
+            cell.outcomes = outcomes
+            table._cells[(category, risk_level)] = cell
+        return table
+
+    def lookup(self, category: Optional[str], risk_level: Optional[str], facts: int) -> Tuple:
+        """
+        Rendered payloads of every rule matching, in rule order.
+
+        Args:
+            category: Scenario category
+            risk_level: Risk level, or None for tables that do not use it
+            facts: Bitmask of present facts
+
+        Returns:
+            Tuple of rendered payloads
+        """
+        cell = self._cells.get((category, risk_level)) or self._cell(category, risk_level)
+        key = facts & cell.mask
+        outcome = cell.outcomes.get(key)
+        if outcome is None:
+            outcome = self._evaluate(cell, key)
+            if len(cell.outcomes) < self.max_outcomes:
+                cell.outcomes[key] = outcome
+        return outcome
+
+    def _cell(self, category: Optional[str], risk_level: Optional[str]) -> _Cell:
+        rules = [rule for rule in self.rules
+                 if (rule.categories is None or category in rule.categories)
+                 and (rule.risk_levels is None or risk_level in rule.risk_levels)]
+        cell = _Cell(category, risk_level, rules)
+
+        if bin(cell.mask).count("1") <= self.max_eager_bits:
+            # Every subset of the cell's bits, via the (sub - 1) & mask enumeration
+            key = cell.mask
+            while True:
+                cell.outcomes[key] = self._evaluate(cell, key)
+                if key == 0:
+                    break
+                key = (key - 1) & cell.mask
+
+        self._cells[(category, risk_level)] = cell
+        return cell
+
+    def _evaluate(self, cell: _Cell, facts: int) -> Tuple:
+        return tuple(self.render(rule.payload, cell.category, cell.risk_level)
+                     for rule in cell.rules if rule.matches(facts))
@@ -0,0 +1,408 @@
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from src.rules.coverage import CoverageRequirements
+from src.rules.engine import DecisionTable, FactIndex, RuleError, compile_rule
+from src.rules.snapshot import read_snapshot, source_digests, write_snapshot
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Rule file format this loader understands
+RULE_FORMAT = 1
+RULE_FILES = ("classification", "risk", "policies", "recommendations")
+
+class RuleSet:
+    """
+    Every business rule of one version of the rule files, compiled for evaluation.
+
+    Keyword conditions compile against one fact index (terms found in the
+    scenario text); everything else compiles against another (extracted risk
+    factors and "policy:<name>" for policies present). Rule lists become
+    DecisionTables, so evaluation is a lookup however many rules there are.
+
+    A RuleSet is a snapshot: nothing mutates it after compilation. Reloading
+    the rule files builds a new one (see RuleStore).
+    """
+
+    def __init__(self, sources: Dict[str, Dict]):
+        for name in RULE_FILES:
+            if name not in sources:
+                raise RuleError(f"Missing rule file: {name}")
+            if sources[name].get("format") != RULE_FORMAT:
+                raise RuleError(f"Rule file {name} has unsupported format {sources[name].get('format')!r}")
+
+        self._set_sources(sources, {
+            name: hashlib.sha256(json.dumps(sources[name], sort_keys=True).encode("utf-8")).hexdigest()[:16]
+            for name in RULE_FILES
+        })
+        categories = list(dict.fromkeys([*self.base_risk_scores, *self.risk_factors]))
+
+        self.terms = FactIndex()
+        self.facts = FactIndex()
+
+        factor_rules = [compile_rule(rule, self.terms) for rule in sources["risk"]["factor_rules"]]
+        # Classification keywords share the term index, so one scan of the text serves both
+        self.category_keywords = {category: self.terms.compile(spec["keywords"])
+                                  for category, spec in self.categories.items()}
+        self.coverage = self._coverage_requirements()
+        # Order in which extraction emits factors; batch scoring adds weights in this order
+        self.factor_order = list(dict.fromkeys(rule.payload["factor"] for rule in factor_rules))
+        self.factor_extraction = DecisionTable(
+            factor_rules, render=self._render_factor, categories=categories, max_eager_bits=0)
+        self.concerns = DecisionTable(
+            [compile_rule(rule, self.facts) for rule in sources["risk"]["concern_rules"]],
+            render=self._render_concern, categories=categories)
+        self.coverage_gaps = DecisionTable(
+            [compile_rule(rule, self.facts) for rule in sources["policies"]["coverage_gap_rules"]],
+            render=self._render_gap, categories=categories)
+
+        recommendation_rules = [compile_rule(rule, self.facts) for rule in sources["recommendations"]["rules"]]
+        risk_levels = sorted({level for rule in recommendation_rules for level in rule.risk_levels or ()})
+        self.recommendations = DecisionTable(
+            recommendation_rules, render=self._render_recommendation,
+            categories=categories, risk_levels=risk_levels)
+
+    def _set_sources(self, sources: Dict[str, Dict], file_fingerprints: Dict[str, str]) -> None:
+        """The rule files and the tables taken from them as they are."""
+        self.sources = sources
+        self.versions = {name: sources[name].get("version") for name in RULE_FILES}
+        self.file_fingerprints = file_fingerprints
+        self.fingerprint = self.fingerprint_of(*RULE_FILES)
+
+        self.categories: Dict[str, Dict] = sources["classification"]["categories"]
+        self.base_risk_scores: Dict[str, float] = sources["risk"]["base_risk_scores"]
+        self.risk_factors: Dict[str, Dict[str, float]] = sources["risk"]["weights"]
+        self.base_costs: Dict[str, float] = sources["risk"]["base_costs"]
+        self.policies: Dict[str, Dict] = sources["policies"]["catalog"]
+        self.scenario_policies: Dict[str, list] = sources["policies"]["scenario_policies"]
+        self.priorities: Dict[str, Dict[str, str]] = sources["recommendations"]["priorities"]
+
+    def to_state(self) -> Dict:
+        """The compiled rule set as plain values that marshal can serialize (see src.rules.snapshot)."""
+        return {
+            "sources": self.sources,
+            "file_fingerprints": self.file_fingerprints,
+            "terms": tuple(self.terms.bits),
+            "facts": tuple(self.facts.bits),
+            "factor_order": tuple(self.factor_order),
+            "tables": {name: getattr(self, name).to_state() for name in self.TABLES}
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "RuleSet":
+        """Restore a rule set from to_state() without compiling anything."""
+        rule_set = cls.__new__(cls)
+        rule_set._set_sources(state["sources"], state["file_fingerprints"])
+        rule_set.terms = FactIndex(state["terms"])
+        rule_set.facts = FactIndex(state["facts"])
+        rule_set.category_keywords = {category: rule_set.terms.mask(spec["keywords"])
+                                      for category, spec in rule_set.categories.items()}
+        rule_set.coverage = rule_set._coverage_requirements()
+        rule_set.factor_order = list(state["factor_order"])
+        for name, render in rule_set._table_renderers().items():
+            setattr(rule_set, name, DecisionTable.from_state(state["tables"][name], render))
+        return rule_set
+
+    def _coverage_requirements(self) -> CoverageRequirements:
+        # Requirements checked against user policies (see src.rules.coverage)
+        return CoverageRequirements(self.policies, self.sources["policies"].get("coverage_requirements", {}))
+
+    def fingerprint_of(self, *names: str) -> str:
+        """Fingerprint of some of the rule files, for keying caches that depend only on those."""
+        encoded = "|".join(self.file_fingerprints[name] for name in names).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    def term_mask(self, text_lower: str) -> int:
+        """Bitmask of the rule keywords that occur in the (lowercased) text."""
+        mask = 0
+        for term, bit in self.terms.bits.items():
+            if term in text_lower:
+                mask |= bit
+        return mask
+
+    def factor_mask(self, factors: Iterable[str]) -> int:
+        return self.facts.mask(factors)
+
+    def policy_mask(self, policies: Iterable[str]) -> int:
+        return self.facts.mask(f"policy:{policy}" for policy in policies)
+
+    # Decision tables, in the order they are built
+    TABLES = ("factor_extraction", "concerns", "coverage_gaps", "recommendations")
+
+    def _table_renderers(self) -> Dict[str, Callable]:
+        return {
+            "factor_extraction": self._render_factor,
+            "concerns": self._render_concern,
+            "coverage_gaps": self._render_gap,
+            "recommendations": self._render_recommendation
+        }
+
+    @staticmethod
+    def _render_factor(then: Dict, category: Optional[str], risk_level: Optional[str]) -> tuple:
+        return then["factor"], then["value"]
+
+    @staticmethod
+    def _render_concern(then: Dict, category: Optional[str], risk_level: Optional[str]) -> str:
+        return then["concern"]
+
+    @staticmethod
+    def _render_gap(then: Dict, category: Optional[str], risk_level: Optional[str]) -> Dict:
+        category_label = (category or "").replace("_", " ")
+        return {**then, "description": then["description"].format(category_label=category_label)}
+
+    def _render_recommendation(self, then: Dict, category: Optional[str], risk_level: Optional[str]) -> Dict:
+        recommendation = dict(then)
+        if "priority" not in recommendation:
+            by_action = self.priorities.get(risk_level) or self.priorities["*"]
+            recommendation["priority"] = by_action.get(then["action"], by_action["*"])
+        return recommendation
+
+def read_rule_sources(rules_dir: str) -> Dict[str, bytes]:
+    """Raw bytes of every rule file of a rules directory."""
+    sources = {}
+    for name in RULE_FILES:
+        path = os.path.join(rules_dir, f"{name}.json")
+        try:
+            with open(path, "rb") as f:
+                sources[name] = f.read()
+        except FileNotFoundError:
+            raise RuleError(f"Missing rule file: {path}")
+    return sources
+
+def parse_rule_sources(rules_dir: str, sources: Dict[str, bytes]) -> Dict[str, Dict]:
+    parsed = {}
+    for name, data in sources.items():
+        try:
+            parsed[name] = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise RuleError(f"Invalid rule file {os.path.join(rules_dir, name + '.json')}: {e}")
+    return parsed
+
+def read_rule_files(rules_dir: str) -> Dict[str, Dict]:
+    """Load every rule file of a rules directory."""
+    return parse_rule_sources(rules_dir, read_rule_sources(rules_dir))
+
+def build_snapshot(rules_dir: Optional[str] = None, snapshot_path: Optional[str] = None) -> RuleSet:
+    """
+    Compile the rule files and write the result to a snapshot file.
+
+    Args:
+        rules_dir: Directory with the rule files (defaults to settings.RULES_DIR)
+        snapshot_path: File to write (defaults to settings.RULES_SNAPSHOT)
+
+    Returns:
+        The compiled RuleSet
+    """
+    rules_dir = rules_dir or settings.RULES_DIR
+    raw = read_rule_sources(rules_dir)
+    rule_set = RuleSet(parse_rule_sources(rules_dir, raw))
+    write_snapshot(snapshot_path or settings.RULES_SNAPSHOT, rule_set.to_state(), source_digests(raw))
+    return rule_set
+
+class RuleStore:
+    """
+    The current RuleSet of a rules directory, replaced atomically on reload.
+
+    reload() compiles the files into a new RuleSet off to the side and then
+    swaps one reference, so readers see the old snapshot or the new one,
+    never a mix; a file that fails to compile leaves the old one in place.
+    Requests that pinned a snapshot (pin_rules()) finish on it.
+
+    Each process holds its own store: the admin reload endpoint reloads the
+    worker that serves it, while watching the files reloads every worker.
+
+    With a snapshot path, rules whose files have not changed since the
+    snapshot was written are mapped from it instead of being compiled;
+    otherwise they are compiled and the snapshot is rewritten.
+    """
+
+    def __init__(self, rules_dir: str, snapshot_path: Optional[str] = None):
+        self.rules_dir = rules_dir
+        self.snapshot_path = snapshot_path
+        self._mtimes = self._read_mtimes()
+        self._current = self._load()
+        self._reload_lock = threading.Lock()
+
+        self.watch_interval: Optional[float] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    @property
+    def current(self) -> RuleSet:
+        return self._current
+
+    def reload(self) -> Dict:
+        """
+        Recompile the rule files and swap the new snapshot in if anything changed.
+
+        Returns:
+            Dict with reloaded, changed_files, fingerprint and versions
+
+        Raises:
+            RuleError: A rule file is missing or invalid (the current snapshot is kept)
+        """
+        with self._reload_lock:
+            mtimes = self._read_mtimes()
+            rule_set = self._load()
+            previous = self._current
+            changed = [name for name in RULE_FILES
+                       if rule_set.file_fingerprints[name] != previous.file_fingerprints[name]]
+            if changed:
+                self._current = rule_set
+                logger.info("Reloaded rules %s (changed: %s)", rule_set.fingerprint, ", ".join(changed))
+            self._mtimes = mtimes
+
+            current = self._current
+            return {
+                "reloaded": bool(changed),
+                "changed_files": changed,
+                "fingerprint": current.fingerprint,
+                "versions": current.versions
+            }
+
+    def _load(self) -> RuleSet:
+        """Rules of the current files: from the snapshot if it matches them, else compiled."""
+        raw = read_rule_sources(self.rules_dir)
+        digests = source_digests(raw)
+        if self.snapshot_path:
+            state = read_snapshot(self.snapshot_path, digests)
+            if state is not None:
+                try:
+                    return RuleSet.from_state(state)
+                except (KeyError, TypeError, ValueError):
+                    logger.warning("Ignoring rule snapshot %s: unexpected contents", self.snapshot_path)
+
+        rule_set = RuleSet(parse_rule_sources(self.rules_dir, raw))
+        if self.snapshot_path:
+            try:
+                write_snapshot(self.snapshot_path, rule_set.to_state(), digests)
+            except OSError:
+                logger.warning("Could not write rule snapshot %s", self.snapshot_path, exc_info=True)
+        return rule_set
+
+    def watch(self, interval: float) -> None:
+        """Reload whenever a rule file's modification time changes, checking every `interval` seconds."""
+        self.watch_interval = interval
+        if self._thread is None or not self._thread.is_alive():
+            self._start_thread()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _start_thread(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="rule-watch", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.watch_interval):
+            if self._read_mtimes() == self._mtimes:
+                continue
+            try:
+                self.reload()
+            except RuleError:
+                # Likely caught mid-edit; the next change triggers another attempt
+                logger.exception("Keeping rules %s; reload failed", self._current.fingerprint)
+                self._mtimes = self._read_mtimes()
+
+    def _after_fork(self) -> None:
+        """Restart the watch thread in a forked worker; threads and held locks do not survive fork."""
+        self._reload_lock = threading.Lock()
+        if self.watch_interval and not self._stopped.is_set():
+            self._start_thread()
+
+    def _read_mtimes(self) -> Dict[str, Optional[int]]:
+        mtimes = {}
+        for name in RULE_FILES:
+            try:
+                mtimes[name] = os.stat(os.path.join(self.rules_dir, f"{name}.json")).st_mtime_ns
+            except OSError:
+                mtimes[name] = None
+        return mtimes
+
+_stores: Dict[str, RuleStore] = {}
+_stores_lock = threading.Lock()
+
+# Snapshot the current request evaluates against (see pin_rules)
+_pinned_rules: ContextVar[Optional[RuleSet]] = ContextVar("pinned_rules", default=None)
+
+def rule_store(rules_dir: Optional[str] = None) -> RuleStore:
+    """
+    The process-wide store of a rules directory, created on first use.
+
+    Args:
+        rules_dir: Directory with the rule files (defaults to settings.RULES_DIR)
+
+    Returns:
+        The RuleStore
+    """
+    rules_dir = os.path.abspath(rules_dir or settings.RULES_DIR)
+    store = _stores.get(rules_dir)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(rules_dir)
+            if store is None:
+                is_default = rules_dir == os.path.abspath(settings.RULES_DIR)
+                store = _stores[rules_dir] = RuleStore(
+                    rules_dir, (settings.RULES_SNAPSHOT or None) if is_default else None)
+                if is_default and settings.RULES_WATCH_INTERVAL:
+                    store.watch(settings.RULES_WATCH_INTERVAL)
+    return store
+
+def load_rules(rules_dir: Optional[str] = None) -> RuleSet:
+    """
+    Current compiled rules of a rules directory, shared by every component that uses them.
+
+    Args:
+        rules_dir: Directory with the rule files (defaults to settings.RULES_DIR)
+
+    Returns:
+        The current RuleSet
+    """
+    return rule_store(rules_dir).current
+
+def current_rules() -> RuleSet:
+    """The snapshot pinned by the enclosing pin_rules(), else the current default rules."""
+    return _pinned_rules.get() or load_rules()
+
+@contextmanager
+def pin_rules() -> Iterator[RuleSet]:
+    """
+    Evaluate everything in this context against one snapshot of the default rules.
+
+    A reload during the context does not affect it, so a request never mixes
+    rules of two versions. Nested pins keep the outer snapshot.
+    """
+    pinned = _pinned_rules.get()
+    if pinned is not None:
+        yield pinned
+        return
+
+    rule_set = load_rules()
+    token = _pinned_rules.set(rule_set)
+    try:
+        yield rule_set
+    finally:
+        _pinned_rules.reset(token)
+
+def pinned_rules(method: Callable) -> Callable:
+    """Run a component's entry point (sync or async) inside pin_rules()."""
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            with pin_rules():
+                return await method(*args, **kwargs)
+    else:
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with pin_rules():
+                return method(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import logging
+import marshal
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# File layout: magic, header length, JSON header, marshal payload
+SNAPSHOT_MAGIC = b"RULESNAP"
+# Bump when the file layout or RuleSet.to_state() changes
+SNAPSHOT_FORMAT = 2
+_LENGTH = struct.Struct("<I")
+
+def _runtime() -> Dict:
+    # marshal's format is only stable within one Python version
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "python": "%d.%d" % sys.version_info[:2],
+        "marshal": marshal.version
+    }
+
+def source_digests(sources: Dict[str, bytes]) -> Dict[str, str]:
+    """sha256 of each rule file's raw bytes; a snapshot is only used for identical sources."""
+    return {name: hashlib.sha256(data).hexdigest() for name, data in sources.items()}
+
+def write_snapshot(path: str, state: Dict, digests: Dict[str, str]) -> None:
+    """
+    Write a compiled rule state to a snapshot file.
+
+    Args:
+        path: Snapshot file to (over)write
+        state: RuleSet.to_state()
+        digests: source_digests() of the rule files the state was compiled from
+    """
+    payload = marshal.dumps(state)
+    header = json.dumps({
+        **_runtime(),
+        "checksum": hashlib.sha256(payload).hexdigest(),
+        "sources": digests
+    }, sort_keys=True).encode("utf-8")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Write then rename, so a crash or a concurrent worker never leaves a truncated snapshot behind
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(_LENGTH.pack(len(header)))
+        f.write(header)
+        f.write(payload)
+    os.replace(temp_path, path)
+
+def read_snapshot(path: str, digests: Dict[str, str]) -> Optional[Dict]:
+    """
+    Map a snapshot file and unmarshal its compiled rule state.
+
+    Args:
+        path: Snapshot file
+        digests: source_digests() of the current rule files
+
+    Returns:
+        The state, or None if the file is missing, was built by another
+        Python version or from other rule files, or fails its checksum
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _read_mapped(path, mapped, digests)
+    except (OSError, ValueError):
+        # Missing or empty file (mmap refuses zero-length files)
+        return None
+
+def _read_mapped(path: str, mapped: mmap.mmap, digests: Dict[str, str]) -> Optional[Dict]:
+    offset = len(SNAPSHOT_MAGIC) + _LENGTH.size
+    if mapped[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC or len(mapped) < offset:
+        logger.warning("Ignoring rule snapshot %s: not a snapshot file", path)
+        return None
+
+    (header_length,) = _LENGTH.unpack(mapped[len(SNAPSHOT_MAGIC):offset])
+    try:
+        header = json.loads(mapped[offset:offset + header_length])
+    except ValueError:
+        logger.warning("Ignoring rule snapshot %s: unreadable header", path)
+        return None
+
+    if any(header.get(key) != value for key, value in _runtime().items()):
+        logger.info("Ignoring rule snapshot %s: built by another Python or snapshot format", path)
+        return None
+    if header.get("sources") != digests:
+        logger.info("Ignoring rule snapshot %s: rule files changed since it was built", path)
+        return None
+
+    with memoryview(mapped)[offset + header_length:] as payload:
+        if hashlib.sha256(payload).hexdigest() != header.get("checksum"):
+            logger.warning("Ignoring rule snapshot %s: checksum mismatch", path)
+            return None
+        try:
+            return marshal.loads(payload)
+        except (EOFError, ValueError, TypeError):
+            logger.warning("Ignoring rule snapshot %s: corrupt payload", path)
+            return None
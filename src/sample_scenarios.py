@@ -0,0 +1,31 @@
+# Built-in demo scenarios shown on the sample scenarios page
+SAMPLE_SCENARIOS = [
+    {
+        "title": "Rear-End Collision",
+        "text": """I was stopped at a red light when another driver rear-ended my car.
+            There was visible damage to my rear bumper, and I'm experiencing some neck pain.
+            The incident occurred on a clear day with good visibility. The other driver
+            admitted fault and we exchanged insurance information."""
+    },
+    {
+        "title": "Parking Lot Damage",
+        "text": """While my car was parked at the grocery store, someone scratched
+            the driver's side door. The scratch is deep and goes across both doors.
+            I was only in the store for about 30 minutes. There were no witnesses
+            and no note was left."""
+    },
+    {
+        "title": "Weather Damage",
+        "text": """My car was damaged during a severe hailstorm last night. There are
+            multiple dents on the hood and roof of the vehicle. I had parked on the street
+            because my garage was full. The weather service had issued a severe weather
+            warning for our area."""
+    },
+    {
+        "title": "Vehicle Theft",
+        "text": """My car was stolen from outside my apartment building last night.
+            I parked it at around 9 PM and discovered it was missing at 7 AM when I was
+            leaving for work. I've filed a police report, and they said there have been
+            several similar thefts in the area recently."""
+    }
+]
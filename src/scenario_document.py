@@ -0,0 +1,47 @@
+import hashlib
+from typing import Dict, Union
+from src.utils.validators import DataValidator
+
+class ScenarioDocument:
+    """
+    A scenario's text with the features every analysis stage reads, computed once.
+
+    The pipeline builds one per request and hands it to each stage, so the
+    text is validated, lowercased, hashed and scanned for rule keywords a
+    single time instead of once per stage.
+    """
+
+    __slots__ = ("text", "lower", "length", "content_hash", "_term_masks")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.length = len(text)
+        self.content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        # Rule set fingerprint -> bitmask of that rule set's keyword terms found in the text
+        self._term_masks: Dict[str, int] = {}
+
+    @classmethod
+    def parse(cls, scenario_text: str) -> "ScenarioDocument":
+        """
+        Validate and normalize raw input into a document.
+
+        Raises:
+            pydantic.ValidationError: The text is empty, too short or too long
+        """
+        return cls(DataValidator().validate(scenario_text))
+
+    @classmethod
+    def of(cls, scenario: Union[str, "ScenarioDocument"]) -> "ScenarioDocument":
+        """The document itself, or a document of already-validated text."""
+        return scenario if isinstance(scenario, ScenarioDocument) else cls(scenario)
+
+    def term_mask(self, rule_set) -> int:
+        """Bitmask of the rule set's keyword terms that occur in the text."""
+        mask = self._term_masks.get(rule_set.fingerprint)
+        if mask is None:
+            mask = self._term_masks[rule_set.fingerprint] = rule_set.term_mask(self.lower)
+        return mask
+
+    def __repr__(self) -> str:
+        return f"ScenarioDocument(length={self.length}, content_hash={self.content_hash!r})"
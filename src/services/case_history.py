@@ -0,0 +1,267 @@
+import atexit
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.config.settings import settings
+
+COLUMNS = ["case_id", "user_id", "created_at", "date", "scenario_type", "risk_level",
+           "risk_score", "financial_estimate", "status", "description"]
+
+class CaseHistoryStore:
+    """SQLite-backed history of analyzed cases with batched writes and keyset pagination."""
+
+    def __init__(self, db_path: str = None, batch_size: int = None, flush_interval: float = None):
+        self.db_path = db_path or settings.CASE_HISTORY_DB
+        self.batch_size = batch_size or settings.CASE_HISTORY_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.CASE_HISTORY_FLUSH_INTERVAL
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        self._pending: List[Tuple] = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._create_schema()
+
+        self._start_writer()
+        atexit.register(self.close)
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; SQLite connections must not be shared."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self) -> None:
+        db = self._connection()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS case_history (
+                case_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                date TEXT NOT NULL,
+                scenario_type TEXT NOT NULL,
+                risk_level TEXT NOT NULL,
+                risk_score REAL,
+                financial_estimate REAL,
+                status TEXT NOT NULL,
+                description TEXT,
+                PRIMARY KEY (user_id, case_id)
+            )
+        """)
+        # Every dashboard query is per user and ordered by (created_at, case_id), so each
+        # filter gets a composite index that serves both the WHERE and the ORDER BY
+        db.execute("CREATE INDEX IF NOT EXISTS idx_case_history_user_date "
+                   "ON case_history (user_id, created_at, case_id)")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_case_history_scenario_type "
+                   "ON case_history (user_id, scenario_type, created_at, case_id)")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_case_history_risk_level "
+                   "ON case_history (user_id, risk_level, created_at, case_id)")
+        # Per-user count of written batches: one primary-key seek keys the cached dashboard
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS history_version (
+                user_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        db.commit()
+
+    def record(self, case: Dict) -> None:
+        """
+        Queue a case for the next batched write.
+
+        Args:
+            case: Dict with at least case_id, user_id, created_at, date,
+                scenario_type, risk_level and status
+        """
+        row = tuple(case.get(column) for column in COLUMNS)
+        with self._pending_lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Write all queued cases in a single transaction."""
+        with self._pending_lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return
+
+        with self._write_lock:
+            db = self._connection()
+            db.executemany(
+                f"INSERT OR REPLACE INTO case_history ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                rows
+            )
+            # Same transaction as the rows, so no process sees a version without its cases
+            db.executemany(
+                "INSERT INTO history_version (user_id, version) VALUES (?, 1) "
+                "ON CONFLICT (user_id) DO UPDATE SET version = version + 1",
+                [(user_id,) for user_id in {row[1] for row in rows}]
+            )
+            db.commit()
+
+    def version(self, user_id: str) -> int:
+        """
+        Changes whenever cases for the user are written, by any process.
+
+        Read from the database, so every worker sharing it agrees on the
+        version. Queued cases are not flushed: read the version before the
+        cases it keys, and it is at worst older than the data, never newer.
+        """
+        row = self._connection().execute(
+            "SELECT version FROM history_version WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def seed(self, user_id: str, cases: List[Dict]) -> None:
+        """Insert demo cases for a user who has no history yet."""
+        if self._connection().execute(
+                "SELECT 1 FROM case_history WHERE user_id = ? LIMIT 1", (user_id,)).fetchone():
+            return
+        for case in cases:
+            self.record({
+                "case_id": case["id"],
+                "created_at": f"{case['date']}T00:00:00",
+                "user_id": user_id,
+                **case
+            })
+        self.flush()
+
+    def page(self, user_id: str, limit: int = None, cursor: Optional[str] = None,
+             scenario_type: Optional[str] = None, risk_level: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fetch one page of a user's cases, newest first.
+
+        Uses keyset pagination on (created_at, case_id), so the cost of a page
+        does not depend on how deep into the history it is.
+
+        Args:
+            user_id: Owner of the cases
+            limit: Page size
+            cursor: Cursor returned with the previous page
+            scenario_type: Optional scenario type filter
+            risk_level: Optional risk level filter
+
+        Returns:
+            Tuple of (cases, cursor for the next page or None)
+        """
+        if self._pending:
+            # Make the user's latest analyses visible without waiting for the writer
+            self.flush()
+
+        limit = limit or settings.CASE_HISTORY_PAGE_SIZE
+        clauses = ["user_id = ?"]
+        params: List = [user_id]
+
+        if scenario_type:
+            clauses.append("scenario_type = ?")
+            params.append(scenario_type)
+        if risk_level:
+            clauses.append("risk_level = ?")
+            params.append(risk_level)
+        if cursor:
+            created_at, _, case_id = cursor.partition("|")
+            clauses.append("(created_at, case_id) < (?, ?)")
+            params.extend([created_at, case_id])
+
+        rows = self._connection().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM case_history WHERE {' AND '.join(clauses)} "
+            "ORDER BY created_at DESC, case_id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        cases = [self._to_case(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = f"{last['created_at']}|{last['case_id']}"
+
+        return cases, next_cursor
+
+    def iter_all(self, user_id: Optional[str] = None, batch_size: int = None) -> Iterator[Dict]:
+        """
+        Stream every case, optionally for one user, in storage order.
+
+        Reads in batches keyed on rowid, so memory stays constant however
+        many cases are stored and each batch is an index seek.
+
+        Args:
+            user_id: Only this user's cases
+            batch_size: Rows fetched per query
+
+        Yields:
+            Case dicts, as returned by page()
+        """
+        if self._pending:
+            self.flush()
+
+        batch_size = batch_size or settings.CASE_HISTORY_SCAN_BATCH
+        clause = "AND user_id = ? " if user_id else ""
+        last_rowid = 0
+        while True:
+            params = [last_rowid] + ([user_id] if user_id else []) + [batch_size]
+            rows = self._connection().execute(
+                f"SELECT rowid, {', '.join(COLUMNS)} FROM case_history WHERE rowid > ? {clause}"
+                "ORDER BY rowid LIMIT ?",
+                params
+            ).fetchall()
+            for row in rows:
+                case = self._to_case(row)
+                del case["rowid"]
+                yield case
+            if len(rows) < batch_size:
+                return
+            last_rowid = rows[-1]["rowid"]
+
+    def close(self) -> None:
+        """Stop the writer and flush queued cases."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join(timeout=self.flush_interval * 2)
+        self.flush()
+
+    def _start_writer(self) -> None:
+        self._writer = threading.Thread(target=self._run, name="case-history-writer", daemon=True)
+        self._writer.start()
+
+    def _after_fork(self) -> None:
+        """SQLite connections, threads and held locks must not be carried across fork."""
+        self._local = threading.local()
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        if not self._closed:
+            self._start_writer()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Keep the writer alive; the rows are lost but requests are unaffected
+                pass
+
+    @staticmethod
+    def _to_case(row: sqlite3.Row) -> Dict:
+        case = dict(row)
+        # Templates and the results view address cases by "id"
+        case["id"] = case["case_id"]
+        return case
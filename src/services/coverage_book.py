@@ -0,0 +1,177 @@
+import json
+from array import array
+from collections.abc import Mapping
+from typing import Dict, IO, Iterable, List, Optional
+import numpy as np
+from src.rules.coverage import Requirement
+from src.rules.loader import current_rules
+
+GAP_TYPES = ("missing_coverage", "insufficient_limit", "high_deductible")
+
+class CoverageBook:
+    """
+    Held coverages of a whole book of policies, as arrays.
+
+    One row per policyholder: held coverages as a uint64 bitmask with the
+    bits of the rule set's CoverageRequirements, and limits and deductibles
+    as one column per coverage (NaN where the policy does not state one).
+    Finding the under-covered policyholders for an event type is then a few
+    bitwise operations over the book instead of a loop over policyholders.
+    Gaps are the same as CoverageRequirements.gaps() finds one policy at a time.
+    """
+
+    def __init__(self, rule_set=None):
+        self.rule_set = rule_set or current_rules()
+        self.coverage = self.rule_set.coverage
+        # Column of each coverage in the limit and deductible arrays: the index of its bit
+        self.columns = {name: bit.bit_length() - 1 for name, bit in self.coverage.coverages.bits.items()}
+        self.ids: List[str] = []
+        # Records without a coverage list, or lines that are not valid JSON
+        self.skipped = 0
+
+        self._masks = array("Q")
+        # Row, column and amount of every stated limit and of every stated deductible,
+        # in typed arrays that numpy reads without converting element by element
+        self._limits = (array("q"), array("q"), array("f"))
+        self._deductibles = (array("q"), array("q"), array("f"))
+        self._arrays = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, policyholder_id: str, user_policy: Mapping) -> bool:
+        """
+        Add one policyholder's policy (in the user_policy format of CoverageRequirements.held).
+
+        Returns:
+            Whether the policy was added
+        """
+        held = self.coverage.held(user_policy)
+        if held is None:
+            self.skipped += 1
+            return False
+
+        row = len(self.ids)
+        self.ids.append(policyholder_id)
+        self._masks.append(held.mask)
+        for (rows, columns, amounts), stated in ((self._limits, held.limits), (self._deductibles, held.deductibles)):
+            for name, amount in stated.items():
+                rows.append(row)
+                columns.append(self.columns[name])
+                amounts.append(amount)
+        self._arrays = None
+        return True
+
+    def consume(self, records: Iterable[Mapping]) -> "CoverageBook":
+        """
+        Add policyholder records: {"id": ..., "user_policy": {...}}, or the
+        user policy itself with an "id" next to its "coverages".
+        """
+        for record in records:
+            self._add_record(record)
+        return self
+
+    def _add_record(self, record: Mapping) -> bool:
+        policyholder_id = record.get("policyholder_id") or record.get("id") or len(self.ids) + self.skipped
+        return self.add(str(policyholder_id), record.get("user_policy") or record)
+
+    def consume_jsonl(self, stream: IO[str]) -> "CoverageBook":
+        """Add every policyholder record of a JSONL stream, one line at a time."""
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                self.skipped += 1
+                continue
+            if isinstance(record, dict):
+                self._add_record(record)
+            else:
+                self.skipped += 1
+        return self
+
+    def _book(self):
+        if self._arrays is None:
+            rows, columns = len(self.ids), len(self.columns)
+            masks = np.frombuffer(self._masks, dtype=np.uint64).copy()
+            # float32 holds every whole-dollar amount up to $16M exactly, at half the memory
+            limits = np.full((rows, columns), np.nan, dtype=np.float32)
+            deductibles = np.full((rows, columns), np.nan, dtype=np.float32)
+            for book, (row, column, amount) in ((limits, self._limits), (deductibles, self._deductibles)):
+                book[np.frombuffer(row, dtype=np.int64), np.frombuffer(column, dtype=np.int64)] = \
+                    np.frombuffer(amount, dtype=np.float32)
+            self._arrays = masks, limits, deductibles
+        return self._arrays
+
+    def requirement_gaps(self, requirement: Requirement) -> Dict[str, np.ndarray]:
+        """
+        Which policyholders have each type of gap for one requirement.
+
+        Returns:
+            Boolean array per gap type, one element per policyholder
+        """
+        masks, limits, deductibles = self._book()
+        bits = self.coverage.coverages.bits
+        required = np.uint64(requirement.mask)
+        holds_any = (masks & required) != 0
+
+        gaps = {"missing_coverage": ~holds_any}
+        for gap_type, amounts, threshold, adequate in (
+                ("insufficient_limit", limits, requirement.min_limit, np.greater_equal),
+                ("high_deductible", deductibles, requirement.max_deductible, np.less_equal)):
+            if threshold is None:
+                gaps[gap_type] = np.zeros(len(masks), dtype=bool)
+                continue
+            # Bits of the required coverages whose amount meets the threshold; unstated amounts always do
+            adequate_bits = np.zeros(len(masks), dtype=np.uint64)
+            for name in requirement.any_of:
+                column = amounts[:, self.columns[name]]
+                meets = adequate(column, threshold) | np.isnan(column)
+                adequate_bits |= np.where(meets, np.uint64(bits[name]), np.uint64(0))
+            gaps[gap_type] = holds_any & ((masks & adequate_bits) == 0)
+        return gaps
+
+    def under_covered(self, category: str) -> np.ndarray:
+        """Boolean array: which policyholders have any coverage gap for the category."""
+        under = np.zeros(len(self.ids), dtype=bool)
+        for requirement in self.coverage.by_category.get(category, ()):
+            for gap in self.requirement_gaps(requirement).values():
+                under |= gap
+        return under
+
+    def report(self, category: str, max_ids: Optional[int] = None) -> Dict:
+        """
+        Under-covered policyholders for one event type.
+
+        Args:
+            category: Scenario category (event type)
+            max_ids: Most policyholder ids to list (None lists them all)
+
+        Returns:
+            Dict with the number of policyholders and of under-covered ones,
+            gap counts per requirement, and the under-covered ids
+        """
+        under = np.zeros(len(self.ids), dtype=bool)
+        requirements = []
+        for requirement in self.coverage.by_category.get(category, ()):
+            gaps = self.requirement_gaps(requirement)
+            for gap in gaps.values():
+                under |= gap
+            requirements.append({
+                "any_of": list(requirement.any_of),
+                "severity": requirement.severity,
+                **{gap_type: int(np.count_nonzero(gaps[gap_type])) for gap_type in GAP_TYPES}
+            })
+
+        rows = np.flatnonzero(under)
+        if max_ids is not None:
+            rows = rows[:max_ids]
+        return {
+            "category": category,
+            "policyholders": len(self.ids),
+            "under_covered": int(np.count_nonzero(under)),
+            "requirements": requirements,
+            "policyholder_ids": [self.ids[row] for row in rows.tolist()],
+            "skipped": self.skipped
+        }
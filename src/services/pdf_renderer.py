@@ -0,0 +1,112 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+from src.config.settings import settings
+from src.results import json_default
+
+class PDFRenderService:
+    """Renders HTML reports to PDF on a bounded worker pool and caches finished PDFs."""
+
+    # Quiet output and UTF-8 input; anything wkhtmltopdf prints on stdout would corrupt the PDF
+    DEFAULT_OPTIONS = {"quiet": "", "encoding": "UTF-8"}
+
+    def __init__(self, max_workers: int = None, max_cache_bytes: int = None,
+                 options: Optional[Dict] = None):
+        self.max_cache_bytes = max_cache_bytes or settings.PDF_CACHE_MAX_BYTES
+        self.options = options or dict(self.DEFAULT_OPTIONS)
+
+        # Resolve the wkhtmltopdf binary once instead of on every render
+        self._configuration = None
+        self._configuration_lock = threading.Lock()
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.PDF_RENDER_WORKERS,
+            thread_name_prefix="pdf-render"
+        )
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(case_id: str, results: Dict) -> str:
+        """Key a report by case and by the content it was rendered from."""
+        digest = hashlib.sha256(json.dumps(results, sort_keys=True, default=json_default).encode("utf-8")).hexdigest()
+        return f"{case_id}:{digest[:16]}"
+
+    def get_cached(self, key: str) -> Optional[bytes]:
+        """Return a finished PDF if it is cached."""
+        with self._lock:
+            pdf = self._cache.get(key)
+            if pdf is not None:
+                self._cache.move_to_end(key)
+            return pdf
+
+    def submit(self, key: str, html: str) -> Future:
+        """
+        Schedule a render unless the PDF is cached or already being rendered.
+
+        Args:
+            key: Cache key from cache_key()
+            html: Fully rendered report HTML
+
+        Returns:
+            Future resolving to the PDF bytes
+        """
+        with self._lock:
+            pdf = self._cache.get(key)
+            if pdf is not None:
+                self._cache.move_to_end(key)
+                done = Future()
+                done.set_result(pdf)
+                return done
+
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._executor.submit(self._render, key, html)
+                self._in_flight[key] = future
+            return future
+
+    def render(self, key: str, html: str, timeout: float = None) -> bytes:
+        """Render (or fetch) a PDF and wait for the result."""
+        return self.submit(key, html).result(timeout=timeout or settings.PDF_RENDER_TIMEOUT)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _get_configuration(self):
+        # pdfkit is only needed once a report is actually rendered
+        import pdfkit
+        with self._configuration_lock:
+            if self._configuration is None:
+                if settings.WKHTMLTOPDF_PATH:
+                    self._configuration = pdfkit.configuration(wkhtmltopdf=settings.WKHTMLTOPDF_PATH)
+                else:
+                    self._configuration = pdfkit.configuration()
+            return self._configuration
+
+    def _render(self, key: str, html: str) -> bytes:
+        try:
+            import pdfkit
+            # output_path=False streams the PDF back over stdout; nothing touches the disk
+            pdf = pdfkit.from_string(html, False, configuration=self._get_configuration(), options=self.options)
+            self._store(key, pdf)
+            return pdf
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _store(self, key: str, pdf: bytes) -> None:
+        if len(pdf) > self.max_cache_bytes:
+            return
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = pdf
+            self._cache_bytes += len(pdf)
+            while self._cache_bytes > self.max_cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
@@ -0,0 +1,212 @@
+import json
+import math
+from collections.abc import Mapping
+from typing import Dict, Iterable, IO, Optional, Tuple
+from src.utils.quantile_sketch import DDSketch
+from src.config.settings import settings
+
+ESTIMATE_KEYS = ("low_estimate", "median_estimate", "high_estimate")
+
+def _finite(value) -> Optional[float]:
+    """A finite number or numeric string as a float; None for anything else, booleans included."""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+class _Rollup:
+    """Counts, risk_score sketch and financial sums of one group of claims."""
+
+    def __init__(self, relative_accuracy: float):
+        self.count = 0
+        self.risk_score_sum = 0.0
+        self.risk_scores = DDSketch(relative_accuracy)
+        self.financial = dict.fromkeys(ESTIMATE_KEYS, 0.0)
+
+    def add(self, risk_score: float, estimates: Tuple[float, float, float]) -> None:
+        self.count += 1
+        self.risk_score_sum += risk_score
+        self.risk_scores.add(risk_score)
+        for key, value in zip(ESTIMATE_KEYS, estimates):
+            self.financial[key] += value
+
+    def merge(self, other: "_Rollup") -> None:
+        self.count += other.count
+        self.risk_score_sum += other.risk_score_sum
+        self.risk_scores.merge(other.risk_scores)
+        for key in ESTIMATE_KEYS:
+            self.financial[key] += other.financial[key]
+
+    def report(self, quantiles: Iterable[float]) -> Dict:
+        return {
+            "count": self.count,
+            "mean_risk_score": round(self.risk_score_sum / self.count, 4) if self.count else None,
+            "risk_score_percentiles": {f"p{q * 100:g}": round(self.risk_scores.quantile(q), 4)
+                                       for q in quantiles} if self.count else {},
+            "financial_impact_estimate": {key: round(value, 2) for key, value in self.financial.items()}
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "risk_score_sum": self.risk_score_sum,
+            "risk_scores": self.risk_scores.to_dict(),
+            "financial": self.financial
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "_Rollup":
+        rollup = cls(data["risk_scores"]["relative_accuracy"])
+        rollup.count = data["count"]
+        rollup.risk_score_sum = data["risk_score_sum"]
+        rollup.risk_scores = DDSketch.from_dict(data["risk_scores"])
+        rollup.financial = dict(data["financial"])
+        return rollup
+
+class PortfolioAggregator:
+    """
+    Streaming category and risk-level rollups over analyzed claims.
+
+    Memory depends on the number of categories and risk levels, not on the
+    number of claims. Aggregates of separate shards combine exactly with
+    merge(), and to_dict()/from_dict() carry a partial aggregate between
+    processes.
+    """
+
+    def __init__(self, relative_accuracy: Optional[float] = None):
+        self.relative_accuracy = relative_accuracy or settings.PORTFOLIO_SKETCH_ACCURACY
+        self.total = _Rollup(self.relative_accuracy)
+        self.by_category: Dict[str, _Rollup] = {}
+        self.by_risk_level: Dict[str, _Rollup] = {}
+        # Records without a risk score, or lines that are not valid JSON
+        self.skipped = 0
+
+    def add(self, record: Dict) -> bool:
+        """
+        Add one claim.
+
+        Accepts a full analysis result (with classification and
+        risk_assessment), a bare risk assessment with a category, or a case
+        history row. Case history keeps only the median estimate; low and
+        high follow RiskAssessor's band of 0.7x and 1.3x the median.
+
+        Returns:
+            Whether the record was counted
+        """
+        normalized = self._normalize(record)
+        if normalized is None:
+            self.skipped += 1
+            return False
+
+        category, risk_level, risk_score, estimates = normalized
+        self.total.add(risk_score, estimates)
+        self._rollup(self.by_category, category).add(risk_score, estimates)
+        self._rollup(self.by_risk_level, risk_level).add(risk_score, estimates)
+        return True
+
+    def consume(self, records: Iterable[Dict]) -> "PortfolioAggregator":
+        for record in records:
+            self.add(record)
+        return self
+
+    def consume_jsonl(self, stream: IO[str]) -> "PortfolioAggregator":
+        """Add every record of a JSONL stream, one line at a time."""
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                self.skipped += 1
+                continue
+            if isinstance(record, dict):
+                self.add(record)
+            else:
+                self.skipped += 1
+        return self
+
+    def merge(self, other: "PortfolioAggregator") -> "PortfolioAggregator":
+        """Fold another shard's aggregate into this one."""
+        self.total.merge(other.total)
+        for mine, theirs in ((self.by_category, other.by_category), (self.by_risk_level, other.by_risk_level)):
+            for key, rollup in theirs.items():
+                self._rollup(mine, key).merge(rollup)
+        self.skipped += other.skipped
+        return self
+
+    def report(self, quantiles: Optional[Iterable[float]] = None) -> Dict:
+        """
+        Summaries of the whole portfolio and of each category and risk level.
+
+        Args:
+            quantiles: risk_score quantiles to report (defaults to settings)
+
+        Returns:
+            Dict with total, by_category, by_risk_level and skipped
+        """
+        quantiles = tuple(quantiles or settings.PORTFOLIO_QUANTILES)
+        return {
+            "total": self.total.report(quantiles),
+            "by_category": {key: rollup.report(quantiles) for key, rollup in sorted(self.by_category.items())},
+            "by_risk_level": {key: rollup.report(quantiles) for key, rollup in sorted(self.by_risk_level.items())},
+            "skipped": self.skipped
+        }
+
+    def to_dict(self) -> Dict:
+        """Partial aggregate that from_dict() restores for merging."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "total": self.total.to_dict(),
+            "by_category": {key: rollup.to_dict() for key, rollup in self.by_category.items()},
+            "by_risk_level": {key: rollup.to_dict() for key, rollup in self.by_risk_level.items()},
+            "skipped": self.skipped
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PortfolioAggregator":
+        aggregator = cls(data["relative_accuracy"])
+        aggregator.total = _Rollup.from_dict(data["total"])
+        aggregator.by_category = {key: _Rollup.from_dict(value) for key, value in data["by_category"].items()}
+        aggregator.by_risk_level = {key: _Rollup.from_dict(value) for key, value in data["by_risk_level"].items()}
+        aggregator.skipped = data["skipped"]
+        return aggregator
+
+    def _rollup(self, groups: Dict[str, _Rollup], key: str) -> _Rollup:
+        rollup = groups.get(key)
+        if rollup is None:
+            rollup = groups[key] = _Rollup(self.relative_accuracy)
+        return rollup
+
+    @staticmethod
+    def _normalize(record: Dict) -> Optional[Tuple[str, str, float, Tuple[float, float, float]]]:
+        """Group keys, risk score and estimates of a record; None for a record that must be skipped."""
+        # Records come from files and other processes: anything malformed is skipped, never raised
+        if not isinstance(record, Mapping):
+            return None
+        assessment = record.get("risk_assessment") or record
+        classification = record.get("classification") or {}
+        if not isinstance(assessment, Mapping) or not isinstance(classification, Mapping):
+            return None
+        category = classification.get("category") or record.get("category") or record.get("scenario_type")
+
+        risk_score = assessment.get("risk_score")
+        if not isinstance(risk_score, (int, float)) or isinstance(risk_score, bool) \
+                or not math.isfinite(risk_score) or risk_score < 0:
+            return None
+
+        estimate = assessment.get("financial_impact_estimate")
+        if isinstance(estimate, Mapping):
+            estimates = tuple(_finite(estimate.get(key) or 0.0) for key in ESTIMATE_KEYS)
+        else:
+            median = _finite(assessment.get("financial_estimate") or 0.0)
+            estimates = (None,) if median is None else (median * 0.7, median, median * 1.3)
+        if None in estimates:
+            return None
+
+        risk_level = assessment.get("risk_level")
+        return (category if isinstance(category, str) and category else "unknown",
+                risk_level if isinstance(risk_level, str) and risk_level else "unknown",
+                float(risk_score), estimates)
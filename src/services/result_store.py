@@ -0,0 +1,134 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+from src.config.settings import settings
+from src.results import to_json
+
+class ResultStore:
+    """
+    Server-side store for analysis results, keyed by case_id.
+
+    Every result has an owner, and only the owner can read it back.
+    """
+
+    def __init__(self, max_entries: int = None, db_path: Optional[str] = None):
+        self.max_entries = max_entries or settings.RESULT_STORE_MAX_ENTRIES
+        self.db_path = db_path if db_path is not None else settings.RESULT_STORE_DB
+
+        # case_id -> (user_id, compressed payload); most recently used last
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._db = None
+        if self.db_path:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = self._connect()
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_results (
+                    case_id TEXT PRIMARY KEY,
+                    user_id TEXT,
+                    created_at REAL NOT NULL,
+                    payload BLOB NOT NULL
+                )
+            """)
+            self._db.commit()
+
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _after_fork(self) -> None:
+        """SQLite connections and held locks must not be carried across fork."""
+        self._lock = threading.Lock()
+        if self._db:
+            self._db = self._connect()
+
+    @staticmethod
+    def serialize(results: Dict) -> bytes:
+        """Compact JSON, zlib-compressed."""
+        data = to_json(results).encode("utf-8")
+        return zlib.compress(data, settings.RESULT_STORE_COMPRESSION_LEVEL)
+
+    @staticmethod
+    def deserialize(payload: bytes) -> Dict:
+        return json.loads(zlib.decompress(payload))
+
+    def put(self, case_id: str, results: Dict, user_id: str) -> None:
+        """
+        Store results for a case.
+
+        Args:
+            case_id: Case identifier
+            results: Analysis results
+            user_id: Owner of the results; other users cannot read them
+
+        Raises:
+            ValueError: No owner was given
+        """
+        if not user_id:
+            raise ValueError("Analysis results must have an owner")
+        payload = self.serialize(results)
+
+        with self._lock:
+            self._remember(case_id, user_id, payload)
+            if self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analysis_results (case_id, user_id, created_at, payload) VALUES (?, ?, ?, ?)",
+                    (case_id, user_id, time.time(), payload)
+                )
+                self._db.commit()
+
+    def get(self, case_id: str, user_id: str) -> Optional[Dict]:
+        """
+        Retrieve results for a case.
+
+        Args:
+            case_id: Case identifier
+            user_id: Requesting user; results owned by someone else are not returned
+
+        Returns:
+            The stored results, or None if unknown or not visible to the user
+        """
+        with self._lock:
+            entry = self._entries.get(case_id)
+            if entry is not None:
+                self._entries.move_to_end(case_id)
+            elif self._db:
+                row = self._db.execute(
+                    "SELECT user_id, payload FROM analysis_results WHERE case_id = ?", (case_id,)
+                ).fetchone()
+                if row:
+                    entry = (row[0], row[1])
+                    self._remember(case_id, *entry)
+
+        if entry is None:
+            return None
+
+        owner, payload = entry
+        # Rows stored without an owner (by earlier versions) are visible to nobody
+        if not owner or user_id != owner:
+            return None
+
+        return self.deserialize(payload)
+
+    def close(self) -> None:
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, case_id: str, user_id: str, payload: bytes) -> None:
+        """Add an entry to the in-memory LRU; caller holds the lock."""
+        self._entries[case_id] = (user_id, payload)
+        self._entries.move_to_end(case_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
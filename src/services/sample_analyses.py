@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from src.config.settings import settings
+from src.results import json_default
+
+logger = logging.getLogger(__name__)
+
+class SampleAnalysisCache:
+    """Precomputed, user-independent analyses of the built-in sample scenarios."""
+
+    def __init__(self, pipeline, scenarios: List[Dict], snapshot_path: Optional[str] = None,
+                 refresh_interval: float = None):
+        # An AnalysisPipeline, or a callable returning one so it is only built when needed
+        self._pipeline = pipeline
+        self.scenarios = scenarios
+        self.snapshot_path = snapshot_path if snapshot_path is not None else settings.SAMPLE_ANALYSIS_SNAPSHOT
+        self.refresh_interval = refresh_interval or settings.SAMPLE_ANALYSIS_REFRESH_INTERVAL
+
+        # Replaced wholesale on refresh, so readers never see a half-built set
+        self._analyses: Optional[List[Dict]] = None
+        self._fingerprint: Optional[str] = None
+        self._refresh_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def pipeline(self):
+        if callable(self._pipeline):
+            self._pipeline = self._pipeline()
+        return self._pipeline
+
+    def fingerprint(self) -> str:
+        """Identify the rule tables and scenario texts the analyses were computed from."""
+        digest = hashlib.sha256(self.pipeline.rules_fingerprint().encode("utf-8"))
+        for scenario in self.scenarios:
+            digest.update(scenario["text"].encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def get(self, index: int) -> Optional[Dict]:
+        """
+        Return the precomputed analysis of a sample scenario.
+
+        Args:
+            index: Position in the scenario list
+
+        Returns:
+            Dict with classification, policy_analysis, risk_assessment and
+            explanation, or None if the analyses are not ready
+        """
+        analyses = self._analyses
+        if analyses is None or not 0 <= index < len(analyses):
+            return None
+        return analyses[index]
+
+    def start(self) -> None:
+        """Load the snapshot if it is current, then keep the analyses fresh in the background."""
+        self._load_snapshot()
+        self._start_thread()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start_thread(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sample-analyses", daemon=True)
+        self._thread.start()
+
+    def _after_fork(self) -> None:
+        """Restart the refresh thread in a forked worker; threads and held locks do not survive fork."""
+        self._refresh_lock = threading.Lock()
+        if not self._stopped.is_set():
+            self._start_thread()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Recompute the analyses if the rule tables changed since they were built.
+
+        Args:
+            force: Recompute even if the fingerprint is unchanged
+
+        Returns:
+            True if the analyses were recomputed
+        """
+        with self._refresh_lock:
+            fingerprint = self.fingerprint()
+            if not force and self._analyses is not None and fingerprint == self._fingerprint:
+                return False
+
+            analyses = asyncio.run(self._compute())
+            self._analyses, self._fingerprint = analyses, fingerprint
+            self._save_snapshot()
+            return True
+
+    async def _compute(self) -> List[Dict]:
+        analyses = []
+        for scenario in self.scenarios:
+            # Recommendations depend on the user's profile and are added per request
+            analysis = await self.pipeline.analyze(scenario["text"], include_recommendations=False)
+            analyses.append({
+                "classification": analysis["classification"],
+                "policy_analysis": analysis["policy_analysis"],
+                "risk_assessment": analysis["risk_assessment"],
+                "explanation": analysis["explanation"]
+            })
+        return analyses
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Failed to precompute sample scenario analyses")
+            self._stopped.wait(self.refresh_interval)
+
+    def _load_snapshot(self) -> None:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable sample analysis snapshot %s", self.snapshot_path)
+            return
+
+        if snapshot.get("fingerprint") == self.fingerprint() and len(snapshot.get("analyses", [])) == len(self.scenarios):
+            self._analyses, self._fingerprint = snapshot["analyses"], snapshot["fingerprint"]
+
+    def _save_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        snapshot = {
+            "fingerprint": self._fingerprint,
+            "created_at": datetime.now().isoformat(),
+            "analyses": self._analyses
+        }
+        # Write then rename, so a crash never leaves a truncated snapshot behind
+        temp_path = f"{self.snapshot_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(snapshot, f, default=json_default)
+        os.replace(temp_path, self.snapshot_path)
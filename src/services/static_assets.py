@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import os
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Brotli variants are optional; gzip is always built
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".json"}
+
+class StaticAssetBuilder:
+    """Fingerprints static assets and builds pre-compressed variants of them."""
+
+    def __init__(self, source_dir: str, build_dir: str):
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        # Logical path (css/app.css) -> fingerprinted path (css/app.3f2a9c1b0d4e.css)
+        self.manifest: Dict[str, str] = {}
+
+    def build(self) -> Dict[str, str]:
+        """
+        Write a content-addressed copy of every asset, plus .gz and .br variants.
+
+        Returns:
+            The manifest of logical to fingerprinted paths
+        """
+        manifest = {}
+        for root, dirs, files in os.walk(self.source_dir):
+            # Never fingerprint our own output
+            dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) != os.path.abspath(self.build_dir)]
+            for name in files:
+                source_path = os.path.join(root, name)
+                logical = os.path.relpath(source_path, self.source_dir).replace(os.sep, "/")
+                manifest[logical] = self._build_asset(source_path, logical)
+
+        self.manifest = manifest
+        return manifest
+
+    def url_path(self, logical: str) -> str:
+        """Fingerprinted path of an asset, or the logical path if it was not built."""
+        return self.manifest.get(logical, logical)
+
+    def resolve(self, fingerprinted: str, accept_encoding: str = "") -> Tuple[Optional[str], Optional[str]]:
+        """
+        Pick the best built file for a request.
+
+        Args:
+            fingerprinted: Path from url_path()
+            accept_encoding: The request's Accept-Encoding header
+
+        Returns:
+            Tuple of (file path, content encoding), or (None, None) if unknown
+        """
+        path = os.path.abspath(os.path.join(self.build_dir, fingerprinted))
+        if not path.startswith(os.path.abspath(self.build_dir) + os.sep) or not os.path.isfile(path):
+            return None, None
+
+        accepted = {part.split(";")[0].strip() for part in accept_encoding.lower().split(",")}
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding in accepted and os.path.isfile(path + suffix):
+                return path + suffix, encoding
+        return path, None
+
+    def _build_asset(self, source_path: str, logical: str) -> str:
+        with open(source_path, "rb") as f:
+            data = f.read()
+
+        base, extension = os.path.splitext(logical)
+        fingerprinted = f"{base}.{hashlib.sha256(data).hexdigest()[:12]}{extension}"
+        target = os.path.join(self.build_dir, fingerprinted)
+        if os.path.exists(target):
+            # Content-addressed: an existing file already has these exact bytes
+            return fingerprinted
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        self._write(target, data)
+        if extension in COMPRESSIBLE_EXTENSIONS:
+            # mtime=0 keeps the gzip output byte-identical across builds
+            self._write(target + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                self._write(target + ".br", brotli.compress(data, quality=11))
+        return fingerprinted
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
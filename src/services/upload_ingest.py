@@ -0,0 +1,194 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import BinaryIO, Dict, Optional
+from src.config.settings import settings
+
+TEXT_EXTENSIONS = {"txt"}
+PDF_EXTENSIONS = {"pdf"}
+
+def _load_pdf_reader():
+    """pypdf is optional and only imported when the first PDF is extracted."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    return PdfReader
+
+class UploadIngestService:
+    """Stores uploads by content hash and extracts their text on a worker pool."""
+
+    def __init__(self, upload_dir: str, max_workers: int = None,
+                 chunk_size: int = None, cache_entries: int = None):
+        self.upload_dir = upload_dir
+        self.chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+        self.cache_entries = cache_entries or settings.UPLOAD_TEXT_CACHE_ENTRIES
+        os.makedirs(upload_dir, exist_ok=True)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.UPLOAD_EXTRACT_WORKERS,
+            thread_name_prefix="upload-extract"
+        )
+        # sha256 -> extracted text; most recently used last
+        self._texts: "OrderedDict[str, str]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def save(self, stream: BinaryIO, filename: str) -> Dict:
+        """
+        Stream an upload to disk in chunks, hashing it on the way.
+
+        Files are stored as <sha256>.<ext>, so identical uploads share one copy
+        and concurrent uploads with the same name never collide.
+
+        Args:
+            stream: Readable binary stream of the upload
+            filename: Sanitized original filename
+
+        Returns:
+            Dict with sha256, path, filename, extension, size and duplicate flag
+        """
+        extension = filename.rsplit(".", 1)[1].lower() if "." in filename else ""
+        digest = hashlib.sha256()
+        size = 0
+
+        fd, temp_path = tempfile.mkstemp(dir=self.upload_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+
+            sha256 = digest.hexdigest()
+            path = os.path.join(self.upload_dir, f"{sha256}.{extension}" if extension else sha256)
+            duplicate = os.path.exists(path)
+            if duplicate:
+                os.remove(temp_path)
+            else:
+                os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return {
+            "sha256": sha256,
+            "path": path,
+            "filename": filename,
+            "extension": extension,
+            "size": size,
+            "duplicate": duplicate
+        }
+
+    def submit_extraction(self, upload: Dict) -> Future:
+        """Schedule text extraction unless the text is cached or already being extracted."""
+        sha256 = upload["sha256"]
+        with self._lock:
+            text = self._texts.get(sha256)
+            if text is not None:
+                self._texts.move_to_end(sha256)
+                done = Future()
+                done.set_result(text)
+                return done
+
+            future = self._in_flight.get(sha256)
+            if future is None:
+                future = self._executor.submit(self._extract, upload)
+                self._in_flight[sha256] = future
+            return future
+
+    def extract_text(self, upload: Dict, timeout: float = None) -> Optional[str]:
+        """
+        Wait for an upload's text.
+
+        Args:
+            upload: Dict returned by save()
+            timeout: Seconds to wait before giving up
+
+        Returns:
+            Extracted text ("" for files without text), or None if extraction did
+            not finish in time; it keeps running and is cached for the next request
+        """
+        future = self.submit_extraction(upload)
+        try:
+            return future.result(timeout=timeout or settings.UPLOAD_EXTRACT_TIMEOUT)
+        except FutureTimeoutError:
+            return None
+
+    @staticmethod
+    def append_within_budget(scenario_text: str, extracted_text: str, header: str) -> str:
+        """
+        Append extracted text to a scenario without exceeding the token budget.
+
+        Args:
+            scenario_text: Scenario as typed by the user
+            extracted_text: Text extracted from an upload
+            header: Line introducing the extracted text
+
+        Returns:
+            The scenario with as much of the extracted text as fits
+        """
+        budget_chars = settings.UPLOAD_TEXT_TOKEN_BUDGET * settings.CHARS_PER_TOKEN
+        # Never push the scenario past the classifier's input limit
+        remaining = settings.SCENARIO_MAX_CHARS - len(scenario_text) - len(header) - 3
+        limit = min(budget_chars, remaining)
+
+        extracted_text = " ".join(extracted_text.split())
+        if limit <= 0 or not extracted_text:
+            return scenario_text
+
+        if len(extracted_text) > limit:
+            # Cut at a word boundary so the model does not see a half word
+            extracted_text = extracted_text[:limit].rsplit(" ", 1)[0]
+
+        return f"{scenario_text}\n\n{header}\n{extracted_text}"
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _extract(self, upload: Dict) -> str:
+        try:
+            text = self._read_text(upload)
+            with self._lock:
+                self._texts[upload["sha256"]] = text
+                self._texts.move_to_end(upload["sha256"])
+                while len(self._texts) > self.cache_entries:
+                    self._texts.popitem(last=False)
+            return text
+        finally:
+            with self._lock:
+                self._in_flight.pop(upload["sha256"], None)
+
+    def _read_text(self, upload: Dict) -> str:
+        # Reading more than the budget could ever use is wasted work
+        max_chars = settings.UPLOAD_TEXT_TOKEN_BUDGET * settings.CHARS_PER_TOKEN
+
+        if upload["extension"] in TEXT_EXTENSIONS:
+            with open(upload["path"], "r", encoding="utf-8", errors="replace") as f:
+                return f.read(max_chars)
+
+        PdfReader = _load_pdf_reader() if upload["extension"] in PDF_EXTENSIONS else None
+        if PdfReader is not None:
+            parts = []
+            length = 0
+            try:
+                for page in PdfReader(upload["path"]).pages:
+                    page_text = page.extract_text() or ""
+                    parts.append(page_text)
+                    length += len(page_text)
+                    if length >= max_chars:
+                        break
+            except Exception:
+                # A damaged PDF is still kept as evidence; it just adds no text
+                pass
+            return "\n".join(parts)[:max_chars]
+
+        # Images and PDFs without an extractor contribute no text
+        return ""
@@ -1,12 +1,38 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Per-request record of cache lookups, keyed by cache name
+_cache_events: ContextVar[Optional[Dict[str, str]]] = ContextVar("cache_events", default=None)
+
+@contextmanager
+def track_cache_events():
+    """Collect hit/miss outcomes of named cache lookups made in this context."""
+    events = {}
+    token = _cache_events.set(events)
+    try:
+        yield events
+    finally:
+        _cache_events.reset(token)
+
 class TokenCache:
     """Simple in-memory cache for classification results."""
 
-    def __init__(self):
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
         self._cache = {}
+        # Rule version the entries were computed under, for caches that depend on rules
+        self.version: Optional[str] = None
 
     def get(self, key: str):
         """Retrieve a cached result."""
-        return self._cache.get(key)
+        value = self._cache.get(key)
+
+        events = _cache_events.get()
+        if events is not None and self.name:
+            events[self.name] = "hit" if value else "miss"
+
+        return value
 
     def store(self, key: str, value: dict):
         """Store a result in the cache."""
@@ -15,3 +41,14 @@ class TokenCache:
     def clear(self):
         """Clear all cached results."""
         self._cache = {}
+
+    def invalidate_unless(self, version: str) -> None:
+        """
+        Drop every entry if they were computed under another rule version.
+
+        Callers also put the version in their keys, so a request finishing on
+        an older snapshot cannot store a result newer requests would read.
+        """
+        if version != self.version:
+            self._cache = {}
+            self.version = version
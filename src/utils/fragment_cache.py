@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+class FragmentCache:
+    """Bounded LRU of rendered template fragments."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._fragments: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+            return fragment
+
+    def set(self, key: str, fragment: str) -> None:
+        with self._lock:
+            self._fragments[key] = fragment
+            self._fragments.move_to_end(key)
+            while len(self._fragments) > self.max_entries:
+                self._fragments.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+
+class FragmentCacheExtension(Extension):
+    """
+    Adds a {% cache key, ... %}...{% endcache %} tag to Jinja.
+
+    The key parts must identify everything the block renders; the block is
+    rendered once per key and served from environment.fragment_cache after that.
+    """
+
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+
+        key_parts = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            key_parts.append(parser.parse_expression())
+
+        body = parser.parse_statements(["name:endcache"], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_render_cached", [nodes.List(key_parts)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render_cached(self, key_parts, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+
+        key = "|".join(str(part) for part in key_parts)
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = caller()
+            cache.set(key, fragment)
+        return fragment
@@ -0,0 +1,54 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from src.config.settings import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def create_openai_client(api_key: str):
+    """
+    Build an OpenAI client.
+
+    The SDK is imported here rather than at module level, so processes that
+    never make an LLM call (CLI, rule-only paths, cold workers) never load it.
+    """
+    from openai import OpenAI
+    return OpenAI(api_key=api_key, base_url=settings.OPENAI_BASE_URL)
+
+async def create_chat_completion(client, **request: Any) -> Any:
+    """
+    Make a chat completion call without blocking the event loop.
+
+    The SDK call is synchronous and waits on the network for up to seconds,
+    and the shared loop serves every Flask and FastAPI request of the
+    process, so the call runs in a pool of LLM threads while the loop moves on.
+
+    Args:
+        client: OpenAI client (see create_openai_client)
+        **request: Arguments of client.chat.completions.create()
+
+    Returns:
+        The completion
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_llm_executor(), functools.partial(client.chat.completions.create, **request))
+
+def _llm_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.LLM_CALL_THREADS, thread_name_prefix="llm-call")
+    return _executor
+
+def _after_fork() -> None:
+    # Pool threads do not survive fork; a worker starts its own pool on its first call
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_after_fork)
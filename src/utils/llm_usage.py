@@ -0,0 +1,42 @@
+from typing import Dict, Optional
+from src.config.settings import settings
+
+def build_usage_record(stage: str, model: str, completion, latency: float) -> Dict:
+    """
+    Build a usage record for a single LLM call.
+
+    Args:
+        stage: Pipeline stage that issued the call (e.g. "classification")
+        model: Model name the call was made with
+        completion: Chat completion returned by the OpenAI client
+        latency: Wall-clock duration of the call in seconds
+
+    Returns:
+        Dict with token counts and latency
+    """
+    usage = getattr(completion, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+
+    return {
+        "stage": stage,
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "latency": latency
+    }
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Estimate the USD cost of a call, or None if the model has no known pricing."""
+    pricing = settings.LLM_PRICING.get(model)
+    if pricing is None:
+        # Dated snapshots such as "gpt-4o-2024-08-06" share their base model's price
+        for name in sorted(settings.LLM_PRICING, key=len, reverse=True):
+            if model.startswith(name):
+                pricing = settings.LLM_PRICING[name]
+                break
+    if pricing is None:
+        return None
+
+    return (prompt_tokens * pricing["prompt"] + completion_tokens * pricing["completion"]) / 1000
@@ -1,11 +1,16 @@
 from typing import Dict, List, Optional
 from datetime import datetime
+from collections import deque
+import heapq
 import statistics
+import time
+from src.utils.llm_usage import estimate_cost
+from src.config.settings import settings
 
 class PerformanceMonitor:
     """Monitors and tracks system performance metrics."""
 
-    def __init__(self):
+    def __init__(self, slow_request_log=None):
         self.metrics = {
             "api_requests": 0,
             "classifications": 0,
@@ -27,6 +32,25 @@ class PerformanceMonitor:
         self.recent_processing_times = []
         self.max_recent_samples = 1000  # Keep last 1000 samples
 
+        # LLM token usage, aggregated along several dimensions
+        self.llm_totals = self._new_usage_bucket()
+        self.llm_usage = {
+            "by_stage": {},
+            "by_model": {},
+            "by_user": {},
+            "by_category": {}
+        }
+        self.llm_cache = {}  # stage -> {"hits": n, "misses": n}
+        self.llm_started_at = time.time()
+
+        # (timestamp, total_tokens) pairs for rolling token rates
+        self.recent_llm_calls = deque()
+
+        # Per-request stage breakdowns of recent analyses
+        self.recent_requests = deque(maxlen=settings.RECENT_REQUEST_SAMPLES)
+        self.slow_request_log = slow_request_log
+        self.metrics["slow_requests"] = 0
+
     async def track_request(self, request_type: str, start_time: float,
                       end_time: float, success: bool,
                       details: Dict = None) -> None:
@@ -79,6 +103,104 @@ class PerformanceMonitor:
         # Calculate error rate
         self.metrics["error_rate"] = self.metrics["error_count"] / self.metrics["api_requests"]
 
+    async def track_llm_usage(self, stage: str, usage: List[Dict],
+                              cache_hit: bool = False,
+                              user: Optional[str] = None,
+                              category: Optional[str] = None) -> None:
+        """
+        Track token usage of the LLM calls made by one pipeline stage.
+
+        Args:
+            stage: Pipeline stage (e.g. "classification", "explanation")
+            usage: Usage records produced by the stage, one per LLM call
+            cache_hit: Whether the stage was served from its cache
+            user: User the request was made for
+            category: Scenario category of the request
+        """
+        cache_stats = self.llm_cache.setdefault(stage, {"hits": 0, "misses": 0})
+        cache_stats["hits" if cache_hit else "misses"] += 1
+
+        now = time.time()
+        for record in usage:
+            cost = estimate_cost(record["model"], record["prompt_tokens"], record["completion_tokens"])
+
+            buckets = [
+                self.llm_totals,
+                self.llm_usage["by_stage"].setdefault(record.get("stage", stage), self._new_usage_bucket()),
+                self.llm_usage["by_model"].setdefault(record["model"], self._new_usage_bucket())
+            ]
+            if user:
+                buckets.append(self.llm_usage["by_user"].setdefault(user, self._new_usage_bucket()))
+            if category:
+                buckets.append(self.llm_usage["by_category"].setdefault(category, self._new_usage_bucket()))
+
+            for bucket in buckets:
+                bucket["calls"] += 1
+                bucket["prompt_tokens"] += record["prompt_tokens"]
+                bucket["completion_tokens"] += record["completion_tokens"]
+                bucket["total_tokens"] += record["total_tokens"]
+                bucket["total_latency"] += record["latency"]
+                if cost is not None:
+                    bucket["estimated_cost"] += cost
+
+            self.recent_llm_calls.append((now, record["total_tokens"]))
+
+        self._trim_llm_window(now)
+
+    async def track_analysis(self, details: Dict) -> None:
+        """
+        Track the stage breakdown of a single analysis.
+
+        Args:
+            details: Analysis details including "processing_time" and "stage_timings"
+        """
+        self.recent_requests.append(details)
+
+        if self.slow_request_log and self.slow_request_log.is_slow(details["processing_time"]):
+            self.metrics["slow_requests"] += 1
+            self.slow_request_log.record(details)
+
+    async def get_slowest_requests(self, limit: int = 10) -> List[Dict]:
+        """Get the slowest recent analyses, slowest first."""
+        return heapq.nlargest(limit, self.recent_requests, key=lambda d: d["processing_time"])
+
+    async def get_llm_usage_report(self) -> Dict:
+        """Generate a token usage and spend report for LLM calls."""
+        now = time.time()
+        self._trim_llm_window(now)
+
+        window = settings.LLM_USAGE_WINDOW
+        window_tokens = sum(tokens for _, tokens in self.recent_llm_calls)
+        elapsed = max(now - self.llm_started_at, 1e-9)
+
+        # Estimate tokens saved by caching from each stage's average call size
+        cache = {}
+        for stage, stats in self.llm_cache.items():
+            lookups = stats["hits"] + stats["misses"]
+            stage_bucket = self.llm_usage["by_stage"].get(stage)
+            avg_tokens = stage_bucket["total_tokens"] / stage_bucket["calls"] if stage_bucket and stage_bucket["calls"] else 0
+            cache[stage] = {
+                **stats,
+                "hit_rate": stats["hits"] / lookups if lookups else 0,
+                "estimated_tokens_saved": round(stats["hits"] * avg_tokens)
+            }
+
+        return {
+            "totals": self._summarize_usage_bucket(self.llm_totals),
+            "rates": {
+                "window_seconds": window,
+                "tokens_per_second": window_tokens / window,
+                "tokens_per_minute": window_tokens * 60 / window,
+                "lifetime_tokens_per_second": self.llm_totals["total_tokens"] / elapsed
+            },
+            "by_stage": self._summarize_usage_buckets(self.llm_usage["by_stage"]),
+            "by_model": self._summarize_usage_buckets(self.llm_usage["by_model"]),
+            "by_user": self._summarize_usage_buckets(self.llm_usage["by_user"]),
+            "by_category": self._summarize_usage_buckets(self.llm_usage["by_category"]),
+            "cache": cache,
+            "timestamp": datetime.now().isoformat()
+        }
+
     async def update_classifier_metrics(self, metrics: Dict) -> None:
         """Update classifier performance metrics."""
         self.classifier_metrics.update(metrics)
@@ -120,3 +242,35 @@ class PerformanceMonitor:
             "p99": sorted_times[int(n * 0.99)],
             "max": sorted_times[-1]
         }
+
+    def _new_usage_bucket(self) -> Dict:
+        """Create an empty token usage accumulator."""
+        return {
+            "calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "total_latency": 0.0,
+            "estimated_cost": 0.0
+        }
+
+    def _summarize_usage_bucket(self, bucket: Dict) -> Dict:
+        """Add derived averages to a token usage accumulator."""
+        calls = bucket["calls"]
+        return {
+            **bucket,
+            "estimated_cost": round(bucket["estimated_cost"], 6),
+            "average_latency": bucket["total_latency"] / calls if calls else 0,
+            "average_tokens": bucket["total_tokens"] / calls if calls else 0,
+            "tokens_per_second": bucket["total_tokens"] / bucket["total_latency"] if bucket["total_latency"] else 0
+        }
+
+    def _summarize_usage_buckets(self, buckets: Dict) -> Dict:
+        """Summarize every accumulator in a dimension."""
+        return {key: self._summarize_usage_bucket(bucket) for key, bucket in buckets.items()}
+
+    def _trim_llm_window(self, now: float) -> None:
+        """Drop LLM calls that fell out of the rolling rate window."""
+        cutoff = now - settings.LLM_USAGE_WINDOW
+        while self.recent_llm_calls and self.recent_llm_calls[0][0] < cutoff:
+            self.recent_llm_calls.popleft()
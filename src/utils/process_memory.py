@@ -0,0 +1,36 @@
+import os
+from typing import Dict, Optional, Union
+
+def read_memory(pid: Union[int, str] = "self") -> Optional[Dict[str, int]]:
+    """
+    Read a process's memory breakdown from /proc/<pid>/smaps_rollup (Linux only).
+
+    USS (unique set size) is the memory that would be freed if the process
+    exited; for a forked worker it is what the worker costs on top of the
+    pages it still shares with the master.
+
+    Args:
+        pid: Process id, or "self"
+
+    Returns:
+        Dict with rss, pss, uss and shared in bytes, or None if unavailable
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    fields = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+            fields[parts[0][:-1]] = int(parts[1]) * 1024
+
+    return {
+        "pid": os.getpid() if pid == "self" else int(pid),
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    }
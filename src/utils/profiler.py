@@ -0,0 +1,163 @@
+import asyncio
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List
+from src.config.settings import settings
+
+class ProfilerBusyError(Exception):
+    """Raised when a capture is requested while another one is running."""
+    pass
+
+# Only one capture may run per worker; a second request is rejected rather than queued
+_capture_lock = threading.Lock()
+
+def _clamp_seconds(seconds: float) -> float:
+    """Keep capture duration within the configured bounds."""
+    return max(0.1, min(float(seconds), settings.PROFILER_MAX_SECONDS))
+
+def _acquire():
+    if not _capture_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profiler capture is already running on this worker")
+
+def _frame_label(filename: str, lineno: int, function: str) -> str:
+    """
+    Format a frame the way flame graph tooling expects it.
+
+    lineno is the function's first line, as cProfile reports it, so every
+    sample of a function folds into one frame whatever line it was on.
+    """
+    return f"{function} ({os.path.basename(filename)}:{lineno})"
+
+def format_collapsed(stacks: Dict[str, int]) -> str:
+    """Render stacks in collapsed ("folded") format, heaviest first."""
+    return "\n".join(f"{stack} {weight}" for stack, weight in
+                     sorted(stacks.items(), key=lambda item: item[1], reverse=True))
+
+def sample_stacks(seconds: float, interval: float = None) -> Dict[str, int]:
+    """
+    Sample the stacks of every thread in this process.
+
+    Stacks are read from sys._current_frames() by a background thread, so the
+    sampled threads are never paused or instrumented.
+
+    Args:
+        seconds: Capture duration
+        interval: Delay between samples in seconds
+
+    Returns:
+        Dict mapping collapsed stacks (root first) to sample counts
+    """
+    seconds = _clamp_seconds(seconds)
+    interval = max(0.001, interval or settings.PROFILER_SAMPLE_INTERVAL)
+    _acquire()
+    try:
+        own_thread = threading.get_ident()
+        stacks = Counter()
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                labels = []
+                while frame is not None:
+                    code = frame.f_code
+                    labels.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stacks[";".join(reversed(labels))] += 1
+            time.sleep(interval)
+
+        return dict(stacks)
+    finally:
+        _capture_lock.release()
+
+def _collapse_profile(profiler: cProfile.Profile) -> Dict[str, int]:
+    """Convert cProfile caller/callee edges into two-frame collapsed stacks (weights in µs)."""
+    stacks = {}
+    for (filename, lineno, function), (_, _, own_time, _, callers) in pstats.Stats(profiler).stats.items():
+        callee = _frame_label(filename, lineno, function)
+        if not callers:
+            stacks[callee] = stacks.get(callee, 0) + int(own_time * 1_000_000)
+            continue
+        for (caller_file, caller_line, caller_function), edge in callers.items():
+            caller = _frame_label(caller_file, caller_line, caller_function)
+            key = f"{caller};{callee}"
+            stacks[key] = stacks.get(key, 0) + int(edge[2] * 1_000_000)
+
+    return {stack: weight for stack, weight in stacks.items() if weight > 0}
+
+async def profile_event_loop(seconds: float) -> Dict[str, int]:
+    """
+    Run cProfile on the event loop thread for a number of seconds.
+
+    Every coroutine scheduled on the loop during the capture is profiled,
+    which covers all in-flight async requests of the worker.
+
+    Returns:
+        Dict mapping caller;callee stacks to own time in microseconds
+    """
+    seconds = _clamp_seconds(seconds)
+    _acquire()
+    try:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+        return _collapse_profile(profiler)
+    finally:
+        _capture_lock.release()
+
+def tracemalloc_diff(seconds: float, limit: int = 25) -> Dict:
+    """
+    Report allocation growth between two tracemalloc snapshots.
+
+    Tracing is only switched on for the capture unless it was already running.
+
+    Args:
+        seconds: Time between the two snapshots
+        limit: Number of top allocation sites to return
+
+    Returns:
+        Dict with the top allocation sites by size growth
+    """
+    seconds = _clamp_seconds(seconds)
+    _acquire()
+    started_tracing = not tracemalloc.is_tracing()
+    try:
+        if started_tracing:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        time.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+
+        top: List[Dict] = []
+        for stat in stats[:limit]:
+            frame = stat.traceback[0]
+            top.append({
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size_diff": stat.size_diff,
+                "size": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count
+            })
+
+        return {
+            "seconds": seconds,
+            "total_size_diff": sum(stat.size_diff for stat in stats),
+            "top_allocations": top
+        }
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _capture_lock.release()
@@ -0,0 +1,111 @@
+import math
+from typing import Dict
+
+class DDSketch:
+    """
+    Mergeable quantile sketch with relative-error guarantees (DDSketch).
+
+    Values are counted in logarithmic buckets, so any quantile is returned
+    within `relative_accuracy` of the true value, memory grows with the
+    value range rather than the number of values, and sketches of separate
+    shards merge exactly by adding bucket counts. Values must be >= 0.
+    """
+
+    # Values below this are counted as zero
+    MIN_INDEXABLE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        if value < 0:
+            raise ValueError("DDSketch only accepts non-negative values")
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        if value < self.MIN_INDEXABLE:
+            self.zero_count += 1
+            return
+
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+        if len(self.bins) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the q-th quantile (0 <= q <= 1).
+
+        Returns:
+            The estimate, or NaN for an empty sketch
+        """
+        if not self.count:
+            return math.nan
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(key-1), gamma^key] in relative terms
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def merge(self, other: "DDSketch") -> None:
+        """Add another sketch's values to this one."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.bins) > self.max_buckets:
+            self._collapse()
+
+    def to_dict(self) -> Dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            # JSON object keys are strings
+            "bins": {str(key): count for key, count in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DDSketch":
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.bins = {int(key): count for key, count in data["bins"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+    def _collapse(self) -> None:
+        """Fold the lowest buckets together; only the smallest quantiles lose accuracy."""
+        keys = sorted(self.bins)
+        excess = keys[:len(keys) - self.max_buckets + 1]
+        target = excess[-1]
+        self.bins[target] = sum(self.bins.pop(key) for key in excess[:-1]) + self.bins[target]
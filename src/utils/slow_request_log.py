@@ -0,0 +1,103 @@
+import atexit
+import json
+import os
+import threading
+from typing import Dict, List
+from src.config.settings import settings
+
+class SlowRequestLog:
+    """Rotating JSON-lines log of analyses that exceeded the slow-request threshold."""
+
+    def __init__(self, path: str = None, threshold: float = None,
+                 max_bytes: int = None, backup_count: int = None,
+                 batch_size: int = None, flush_interval: float = None):
+        self.path = path or settings.SLOW_REQUEST_LOG_PATH
+        self.threshold = settings.SLOW_REQUEST_THRESHOLD if threshold is None else threshold
+        self.max_bytes = max_bytes or settings.SLOW_REQUEST_LOG_MAX_BYTES
+        self.backup_count = settings.SLOW_REQUEST_LOG_BACKUPS if backup_count is None else backup_count
+        self.batch_size = batch_size or settings.SLOW_REQUEST_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.SLOW_REQUEST_FLUSH_INTERVAL
+
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        # Entries are appended in batches by a background writer thread
+        self._start_writer()
+        atexit.register(self.close)
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def is_slow(self, processing_time: float) -> bool:
+        """Check whether a request exceeded the threshold."""
+        return processing_time >= self.threshold
+
+    def record(self, entry: Dict) -> None:
+        """Queue an entry for the next batched append."""
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            self._buffer.append(line)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Append all queued entries to the log file."""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if not lines:
+            return
+
+        payload = "\n".join(lines) + "\n"
+        with self._write_lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(payload) > self.max_bytes:
+                self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(payload)
+
+    def close(self) -> None:
+        """Stop the writer thread and flush remaining entries."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join(timeout=self.flush_interval)
+        self.flush()
+
+    def _start_writer(self) -> None:
+        self._writer = threading.Thread(target=self._run, name="slow-request-log", daemon=True)
+        self._writer.start()
+
+    def _after_fork(self) -> None:
+        """Give a forked worker its own writer; threads and held locks do not survive fork."""
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        if not self._closed:
+            self._start_writer()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except OSError:
+                # A full or read-only disk must never take the worker down
+                pass
+
+    def _rotate(self) -> None:
+        """Shift log.N -> log.N+1 and start a fresh file, dropping the oldest backup."""
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
@@ -0,0 +1,29 @@
+import pytest
+from benchmarks.bench_pipeline import compare_results, run_benchmarks
+
+def results(**medians):
+    return {"results": {name: {"median_us": value, "min_us": value} for name, value in medians.items()}}
+
+def test_regression_over_threshold_is_flagged():
+    comparisons = compare_results(results(stage=12.0), results(stage=10.0), max_regression=10.0)
+
+    assert comparisons == [{
+        "benchmark": "stage",
+        "baseline_us": 10.0,
+        "current_us": 12.0,
+        "change_pct": 20.0,
+        "regressed": True
+    }]
+
+def test_improvements_and_new_benchmarks_pass():
+    comparisons = compare_results(results(stage=8.0, new_stage=5.0), results(stage=10.0), max_regression=10.0)
+
+    assert len(comparisons) == 1
+    assert not comparisons[0]["regressed"]
+
+@pytest.mark.asyncio
+async def test_every_stage_benchmark_runs_offline():
+    stage_results = await run_benchmarks(iterations=1, warmup=0)
+
+    assert "end_to_end_pipeline" in stage_results
+    assert all(result["samples"] > 0 for result in stage_results.values())
@@ -0,0 +1,79 @@
+import pytest
+from src.services.case_history import CaseHistoryStore
+
+def make_case(i, user_id="user1", risk_level="low"):
+    return {
+        "case_id": f"case-{i:04d}",
+        "user_id": user_id,
+        "created_at": f"2025-03-01T00:{i // 60:02d}:{i % 60:02d}",
+        "date": "2025-03-01",
+        "scenario_type": "collision",
+        "risk_level": risk_level,
+        "status": "analyzed",
+        "description": f"Case {i}"
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    store = CaseHistoryStore(db_path=str(tmp_path / "history.db"), batch_size=10, flush_interval=60)
+    yield store
+    store.close()
+
+def test_keyset_pages_cover_history_newest_first(store):
+    for i in range(25):
+        store.record(make_case(i))
+    store.record(make_case(99, user_id="user2"))
+
+    seen = []
+    cursor = None
+    while True:
+        cases, cursor = store.page("user1", limit=10, cursor=cursor)
+        seen.extend(case["id"] for case in cases)
+        if cursor is None:
+            break
+
+    assert seen == [f"case-{i:04d}" for i in reversed(range(25))]
+
+def test_filters_and_seed(store):
+    for i in range(6):
+        store.record(make_case(i, risk_level="high" if i % 2 else "low"))
+
+    cases, cursor = store.page("user1", risk_level="high")
+    assert [case["id"] for case in cases] == ["case-0005", "case-0003", "case-0001"]
+    assert cursor is None
+
+    # Users with existing history are not re-seeded
+    store.seed("user1", [{"id": "demo-1", "date": "2025-01-01", "scenario_type": "theft",
+                          "risk_level": "high", "status": "resolved"}])
+    assert store.page("user1", scenario_type="theft")[0] == []
+
+def test_iter_all_streams_every_case_in_batches(store):
+    for i in range(25):
+        store.record(make_case(i))
+    store.record(make_case(99, user_id="user2"))
+
+    assert len(list(store.iter_all(batch_size=7))) == 26
+    assert [case["id"] for case in store.iter_all("user2", batch_size=7)] == ["case-0099"]
+
+def test_version_comes_from_the_database(store, tmp_path):
+    assert store.version("user1") == 0
+    store.record(make_case(2, user_id="user2"))
+    store.record(make_case(1))
+    # Reading the version leaves queued cases to the writer
+    assert store.version("user1") == 0 and store._pending
+    store.flush()
+    first = store.version("user1")
+    assert first > 0
+
+    # Another process's store over the same database agrees on the version
+    other = CaseHistoryStore(db_path=str(tmp_path / "history.db"), batch_size=10, flush_interval=60)
+    try:
+        assert other.version("user1") == first
+        # Rewriting the newest row changes the version too
+        store.record(make_case(1, risk_level="high"))
+        store.flush()
+        assert store.version("user1") > first
+        assert other.version("user1") == store.version("user1")
+        assert other.version("user2") == 1
+    finally:
+        other.close()
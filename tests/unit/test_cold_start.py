@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+PROBE = """
+import sys
+import src.cli, app
+print(",".join(name for name in ("openai", "pdfkit", "pypdf") if name in sys.modules) or "-")
+"""
+
+def test_entry_points_do_not_import_heavy_dependencies(tmp_path):
+    env = dict(os.environ,
+               OPENAI_API_KEY="test-key",
+               SAMPLE_ANALYSIS_PRECOMPUTE="false",
+               CASE_HISTORY_DB=str(tmp_path / "case_history.db"),
+               TEMPLATE_BYTECODE_CACHE_DIR=str(tmp_path / "jinja_cache"),
+               STATIC_BUILD_DIR=str(tmp_path / "static"))
+
+    completed = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True,
+                               env=env, check=True, cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+    assert completed.stdout.splitlines()[-1] == "-"
+
+SEED_PROBE = """
+import os, sys
+import app
+print(os.path.exists(sys.argv[1]))
+app.app.test_cli_runner().invoke(args=["seed-demo-history"])
+cases, _ = app.registry.case_history.page("user1")
+print(len(cases))
+"""
+
+def test_case_history_is_seeded_only_on_request(tmp_path):
+    db = tmp_path / "case_history.db"
+    env = dict(os.environ,
+               OPENAI_API_KEY="test-key",
+               SAMPLE_ANALYSIS_PRECOMPUTE="false",
+               CASE_HISTORY_DB=str(db),
+               TEMPLATE_BYTECODE_CACHE_DIR=str(tmp_path / "jinja_cache"),
+               STATIC_BUILD_DIR=str(tmp_path / "static"))
+
+    completed = subprocess.run([sys.executable, "-c", SEED_PROBE, str(db)], capture_output=True, text=True,
+                               env=env, check=True, cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+    # Importing the app leaves the database alone; the explicit step creates and seeds it
+    assert completed.stdout.split() == ["False", "4"]
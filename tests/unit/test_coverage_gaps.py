@@ -0,0 +1,71 @@
+import io
+import json
+from src.policy_analyzer import PolicyAnalyzer
+from src.rules.loader import load_rules
+from src.services.coverage_book import CoverageBook
+
+POLICYHOLDERS = [
+    {"id": "full", "user_policy": {"coverages": {
+        "liability": {"limit": "$100,000/$300,000/$100,000"}, "collision": {"deductible": 500},
+        "comprehensive": {"deductible": 250}, "medical_payments": {"limit": 10000}}}},
+    {"id": "low_limit", "user_policy": {"coverages": {
+        "liability": {"limit": "$25,000/$50,000/$25,000"}, "collision": {"deductible": 500},
+        "personal_injury_protection": {"limit": 10000}}}},
+    {"id": "high_deductible", "user_policy": {"coverages": {
+        "liability": {}, "collision": {"deductible": 2500}, "comprehensive": {"deductible": "$2,000"},
+        "medical_payments": {}}}},
+    {"id": "names_only", "user_policy": {"coverages": ["liability", "comprehensive"]}},
+    {"id": "no_coverages", "user_policy": {"note": "unstructured"}}
+]
+
+def _gap_types(analysis):
+    return [(gap["type"], gap["policy"]) for gap in analysis["coverage_gaps"]]
+
+def test_gaps_are_found_against_the_held_policy():
+    analyzer = PolicyAnalyzer(rules=load_rules())
+    classification = {"category": "collision", "relevant_policies": [], "confidence": 0.7}
+    policies = {record["id"]: record["user_policy"] for record in POLICYHOLDERS}
+
+    assert _gap_types(analyzer.analyze_policies(classification, policies["full"])) == []
+    low_limit = analyzer.analyze_policies(classification, policies["low_limit"])
+    assert _gap_types(low_limit) == [("insufficient_limit", "liability")]
+    assert low_limit["coverage_gaps"][0]["recommended_limit"] == 50000
+    assert [r["action"] for r in low_limit["recommendations"]] == ["increase_limit"]
+    assert _gap_types(analyzer.analyze_policies(classification, policies["high_deductible"])) == \
+        [("high_deductible", "collision")]
+    assert _gap_types(analyzer.analyze_policies(classification, policies["names_only"])) == \
+        [("missing_coverage", "collision"), ("missing_coverage", "medical_payments")]
+
+    # A user policy that does not list coverages keeps the standard analysis
+    assert analyzer.analyze_policies(classification, policies["no_coverages"]) == \
+        analyzer.analyze_policies(classification)
+
+def test_book_matches_single_policy_analysis():
+    rules = load_rules()
+    book = CoverageBook(rules).consume_jsonl(io.StringIO("\n".join(map(json.dumps, POLICYHOLDERS)) + "\nnot json\n"))
+
+    assert len(book) == 4 and book.skipped == 2
+    for category in ("collision", "theft", "medical", "parking_damage", "general_incident"):
+        expected = [record["id"] for record in POLICYHOLDERS[:4]
+                    if rules.coverage.gaps(category, rules.coverage.held(record["user_policy"]))]
+        assert book.report(category)["policyholder_ids"] == expected
+        assert [book.ids[row] for row in book.under_covered(category).nonzero()[0]] == expected
+
+def test_book_report_counts_gaps_per_requirement():
+    book = CoverageBook(load_rules()).consume(POLICYHOLDERS)
+
+    report = book.report("theft")
+
+    assert report["under_covered"] == 2
+    assert report["requirements"] == [{"any_of": ["comprehensive"], "severity": "high",
+                                       "missing_coverage": 1, "insufficient_limit": 0, "high_deductible": 1}]
+
+def test_malformed_coverage_lists_are_no_coverage_list():
+    rules = load_rules()
+    analyzer = PolicyAnalyzer(rules=rules)
+    classification = {"category": "theft", "relevant_policies": []}
+
+    for user_policy in ({"coverages": 5}, {"coverages": [{"a": 1}]}, {"coverages": "liability"},
+                        {"coverages": ["liability", 3]}, {"coverages": None}, ["liability"]):
+        assert rules.coverage.held(user_policy) is None
+        assert analyzer.analyze_policies(classification, user_policy) == analyzer.analyze_policies(classification)
@@ -0,0 +1,17 @@
+from jinja2 import Environment
+from src.utils.fragment_cache import FragmentCache, FragmentCacheExtension
+
+def test_fragments_render_once_per_key():
+    env = Environment(extensions=[FragmentCacheExtension])
+    env.fragment_cache = FragmentCache(max_entries=10)
+    template = env.from_string("{% cache 'case', case_id %}{{ render() }}{% endcache %}")
+
+    calls = []
+    def render():
+        calls.append(1)
+        return len(calls)
+
+    assert template.render(case_id="a", render=render) == "1"
+    assert template.render(case_id="a", render=render) == "1"
+    assert template.render(case_id="b", render=render) == "2"
+    assert len(calls) == 2
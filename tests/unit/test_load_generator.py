@@ -0,0 +1,63 @@
+import asyncio
+import json
+import httpx
+import pytest
+from loadtest.load_generator import LoadGenerator
+
+class Service:
+    """In-process stand-in for the analysis endpoints."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/v1/token":
+            return httpx.Response(200, json={"access_token": "token"})
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        if request.url.path == "/api/analyze":
+            return httpx.Response(200 if request.headers.get("X-API-Key") == "demo_key" else 401)
+        if request.headers.get("Authorization") != "Bearer token":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"category": "collision"})
+
+def generator(target, service, **kwargs):
+    return LoadGenerator(target, "http://service/", transport=httpx.MockTransport(service), **kwargs)
+
+@pytest.mark.asyncio
+async def test_closed_loop_authenticates_and_records_every_request():
+    service = Service(delay=0.01)
+    load = generator("fastapi", service, unique_scenarios=True)
+
+    elapsed = await load.run_closed_loop(concurrency=4, duration=0.1)
+    report = load.report(elapsed)
+
+    assert {request.url.path for request in service.requests} == {"/api/v1/classify"}
+    assert report["requests"] == len(service.requests) == report["successes"] > 0
+    assert report["statuses"] == {"200": report["requests"]}
+    scenarios = [json.loads(request.content)["scenario_text"] for request in service.requests]
+    assert len(set(scenarios)) == len(scenarios)
+
+@pytest.mark.asyncio
+async def test_open_loop_sheds_requests_it_cannot_keep_in_flight():
+    service = Service(delay=0.2)
+    load = generator("flask", service)
+
+    elapsed = await load.run_open_loop(rps=100, duration=0.1, max_in_flight=2)
+    report = load.report(elapsed)
+
+    assert report["requests"] == len(service.requests) == 2
+    assert report["statuses"]["200"] == 2 and report["statuses"]["dropped"] >= 5
+
+def test_report_percentiles():
+    load = LoadGenerator("flask", "http://service")
+    load.latencies = [i / 1000 for i in range(1, 101)]
+    load.statuses.update({200: 90, 500: 9, "ConnectError": 1})
+
+    report = load.report(elapsed=10.0)
+
+    assert report["latency_ms"] == {"p50": 51.0, "p90": 91.0, "p95": 96.0, "p99": 100.0, "max": 100.0}
+    assert report["successes"] == 90 and report["success_rps"] == 9.0 and report["throughput_rps"] == 10.0
+    with pytest.raises(ValueError):
+        LoadGenerator("grpc", "http://service")
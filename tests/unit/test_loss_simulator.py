@@ -0,0 +1,40 @@
+import pytest
+from src.loss_simulator import LossSimulator
+from src.risk_assessor import RiskAssessor
+
+def test_simulation_is_reproducible_and_centered_on_the_estimate():
+    simulator = LossSimulator(draws=200_000, chunk_size=50_000, seed=7)
+
+    first = simulator.simulate("collision", 5000.0)
+    second = simulator.simulate("collision", 5000.0)
+
+    assert first == second
+    assert first["mean"] == pytest.approx(5000.0, rel=0.02)
+    percentiles = list(first["percentiles"].values())
+    assert percentiles == sorted(percentiles)
+    assert first["expected_shortfall"]["es99"] > first["percentiles"]["p99"]
+
+def test_heavier_tailed_categories_have_larger_tails():
+    simulator = LossSimulator(draws=100_000, seed=7)
+
+    medical = simulator.simulate("medical", 5000.0)
+    parking = simulator.simulate("parking_damage", 5000.0)
+
+    assert medical["expected_shortfall"]["es99"] > parking["expected_shortfall"]["es99"]
+
+def test_portfolio_total_adds_claim_means():
+    simulator = LossSimulator(draws=100_000, chunk_size=30_000, seed=7)
+
+    portfolio = simulator.simulate_portfolio([("theft", 8000.0), ("vandalism", 1800.0), ("unknown", 2500.0)])
+
+    assert portfolio["claims"] == 3
+    assert portfolio["mean"] == pytest.approx(12300.0, rel=0.02)
+
+@pytest.mark.asyncio
+async def test_risk_assessment_includes_distribution_when_enabled():
+    assessor = RiskAssessor(loss_simulator=LossSimulator(draws=10_000))
+
+    assessment = await assessor.assess_risk({"category": "theft"}, "My car was stolen")
+
+    assert assessment["loss_distribution"]["draws"] == 10_000
+    assert "loss_distribution" not in await RiskAssessor().assess_risk({"category": "theft"}, "My car was stolen")
@@ -0,0 +1,38 @@
+import pytest
+from src.classifiers.enhanced_scenario_classifier import EnhancedScenarioClassifier, ClassificationError
+from src.explanation_generator import ExplanationGenerator
+from src.pipeline import AnalysisPipeline
+from src.policy_analyzer import PolicyAnalyzer
+from src.recommendation_engine import RecommendationEngine
+from src.risk_assessor import RiskAssessor
+
+@pytest.fixture
+def no_network(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    def refuse(api_key):
+        raise AssertionError("an LLM client was constructed in offline mode")
+
+    monkeypatch.setattr("src.classifiers.enhanced_scenario_classifier.create_openai_client", refuse)
+    monkeypatch.setattr("src.explanation_generator.create_openai_client", refuse)
+
+def test_hybrid_mode_still_requires_an_api_key(no_network):
+    with pytest.raises(EnvironmentError):
+        EnhancedScenarioClassifier(offline=False)
+
+@pytest.mark.asyncio
+async def test_offline_pipeline_uses_rules_and_templates_only(no_network):
+    classifier = EnhancedScenarioClassifier(offline=True)
+    explanation_generator = ExplanationGenerator(offline=True)
+    pipeline = AnalysisPipeline(classifier, PolicyAnalyzer(), RiskAssessor(),
+                                explanation_generator, RecommendationEngine())
+
+    # Low rule confidence makes this a "complex" scenario, which would call the LLM in hybrid mode
+    result = await pipeline.analyze("Someone keyed my car overnight")
+
+    assert result["classification"]["category"] == "vandalism"
+    assert not result["classification"]["rule_based_fallback"]
+    assert result["explanation"]["complex_scenario"]
+    assert result["explanation"]["detailed_explanation"].startswith("The incident has been classified")
+    with pytest.raises(ClassificationError):
+        classifier.client
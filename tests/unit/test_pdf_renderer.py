@@ -0,0 +1,72 @@
+import threading
+import pdfkit
+import pytest
+from src.results import FinancialImpact
+from src.services.pdf_renderer import PDFRenderService
+
+class Wkhtmltopdf:
+    """Stands in for wkhtmltopdf: the PDF is the HTML's bytes, and renders wait until released."""
+
+    def __init__(self):
+        self.renders = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def from_string(self, html, output_path, configuration=None, options=None):
+        self.renders.append(html)
+        self.release.wait(5)
+        return html.encode("utf-8")
+
+@pytest.fixture
+def wkhtmltopdf(monkeypatch):
+    wkhtmltopdf = Wkhtmltopdf()
+    monkeypatch.setattr(pdfkit, "from_string", wkhtmltopdf.from_string)
+    monkeypatch.setattr(pdfkit, "configuration", lambda **kwargs: object())
+    return wkhtmltopdf
+
+@pytest.fixture
+def service():
+    service = PDFRenderService(max_workers=2, max_cache_bytes=10)
+    yield service
+    service.shutdown()
+
+def test_cache_evicts_least_recently_used_by_bytes(wkhtmltopdf, service):
+    service.render("a", "aaaa")
+    service.render("b", "bbbb")
+    assert service.get_cached("a") == b"aaaa"
+
+    # 12 bytes would exceed the bound: "b", the least recently used, goes
+    service.render("c", "cccc")
+    assert service.get_cached("b") is None
+    assert service.get_cached("a") == b"aaaa" and service.get_cached("c") == b"cccc"
+    assert service._cache_bytes == 8
+
+    # Larger than the whole cache: returned but never cached
+    assert service.render("d", "d" * 11) == b"d" * 11
+    assert service.get_cached("d") is None and service._cache_bytes == 8
+
+    service.render("a", "aaaa")
+    assert wkhtmltopdf.renders == ["aaaa", "bbbb", "cccc", "d" * 11]
+
+def test_concurrent_requests_share_one_render(wkhtmltopdf, service):
+    wkhtmltopdf.release.clear()
+    first = service.submit("a", "aaaa")
+    second = service.submit("a", "aaaa")
+    assert second is first
+
+    wkhtmltopdf.release.set()
+    assert first.result(5) == b"aaaa"
+    assert not service._in_flight
+    assert service.submit("a", "aaaa").result(5) == b"aaaa"
+    assert wkhtmltopdf.renders == ["aaaa"]
+
+def test_cache_key_is_stable_across_key_order_and_result_types():
+    results = {"risk_assessment": {"risk_level": "high", "financial_impact_estimate":
+               FinancialImpact(low_estimate=1.0, median_estimate=2.0, high_estimate=3.0)}, "case_id": "c1"}
+    reordered = {"case_id": "c1", "risk_assessment": {"financial_impact_estimate":
+                 {"low_estimate": 1.0, "median_estimate": 2.0, "high_estimate": 3.0, "currency": "USD"},
+                 "risk_level": "high"}}
+
+    assert PDFRenderService.cache_key("c1", results) == PDFRenderService.cache_key("c1", reordered)
+    assert PDFRenderService.cache_key("c2", results) != PDFRenderService.cache_key("c1", results)
+    assert PDFRenderService.cache_key("c1", dict(results, case_id="c2")) != PDFRenderService.cache_key("c1", results)
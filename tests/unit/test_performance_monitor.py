@@ -0,0 +1,95 @@
+import pytest
+from src.utils.performance_monitor import PerformanceMonitor
+
+@pytest.fixture
+def monitor():
+    return PerformanceMonitor()
+
+def usage_record(stage, prompt_tokens, completion_tokens, latency=0.5, model="gpt-3.5-turbo"):
+    return {
+        "stage": stage,
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "latency": latency
+    }
+
+@pytest.mark.asyncio
+async def test_llm_usage_aggregated_by_dimension(monitor):
+    await monitor.track_llm_usage(
+        "classification", [usage_record("classification", 100, 50)],
+        user="user1", category="collision"
+    )
+    await monitor.track_llm_usage(
+        "explanation", [usage_record("explanation", 300, 200)],
+        user="user2", category="collision"
+    )
+
+    report = await monitor.get_llm_usage_report()
+
+    assert report["totals"]["total_tokens"] == 650
+    assert report["by_stage"]["classification"]["prompt_tokens"] == 100
+    assert report["by_stage"]["explanation"]["completion_tokens"] == 200
+    assert report["by_user"]["user1"]["calls"] == 1
+    assert report["by_category"]["collision"]["calls"] == 2
+    assert report["rates"]["tokens_per_minute"] == pytest.approx(650)
+    # 400 prompt and 250 completion tokens at gpt-3.5-turbo pricing
+    assert report["totals"]["estimated_cost"] == pytest.approx(0.000575)
+
+@pytest.mark.asyncio
+async def test_llm_cache_hits_estimate_tokens_saved(monitor):
+    await monitor.track_llm_usage("classification", [usage_record("classification", 80, 20)])
+    await monitor.track_llm_usage("classification", [], cache_hit=True)
+
+    report = await monitor.get_llm_usage_report()
+
+    assert report["cache"]["classification"]["hits"] == 1
+    assert report["cache"]["classification"]["hit_rate"] == 0.5
+    assert report["cache"]["classification"]["estimated_tokens_saved"] == 100
+
+@pytest.mark.asyncio
+async def test_unknown_model_has_no_cost(monitor):
+    await monitor.track_llm_usage("classification", [usage_record("classification", 10, 10, model="local-llm")])
+
+    report = await monitor.get_llm_usage_report()
+
+    assert report["by_model"]["local-llm"]["total_tokens"] == 20
+    assert report["totals"]["estimated_cost"] == 0
+
+def analysis_details(processing_time):
+    return {
+        "processing_time": processing_time,
+        "stage_timings": {"classification": processing_time},
+        "cache": {"classification": "miss"},
+        "scenario_length": 42
+    }
+
+@pytest.mark.asyncio
+async def test_slowest_requests_are_ranked():
+    monitor = PerformanceMonitor()
+    for processing_time in [0.2, 3.1, 0.5, 1.7]:
+        await monitor.track_analysis(analysis_details(processing_time))
+
+    slowest = await monitor.get_slowest_requests(2)
+
+    assert [d["processing_time"] for d in slowest] == [3.1, 1.7]
+
+@pytest.mark.asyncio
+async def test_slow_requests_written_in_batches(tmp_path):
+    from src.utils.slow_request_log import SlowRequestLog
+
+    log_path = tmp_path / "slow.jsonl"
+    slow_log = SlowRequestLog(path=str(log_path), threshold=1.0, batch_size=100, flush_interval=60)
+    monitor = PerformanceMonitor(slow_request_log=slow_log)
+
+    await monitor.track_analysis(analysis_details(0.4))
+    await monitor.track_analysis(analysis_details(2.5))
+    assert not log_path.exists()
+
+    slow_log.close()
+
+    lines = log_path.read_text().splitlines()
+    assert len(lines) == 1
+    assert '"processing_time": 2.5' in lines[0]
+    assert monitor.metrics["slow_requests"] == 1
@@ -0,0 +1,48 @@
+import pytest
+from src.config.settings import settings
+from src.policy_analyzer import PolicyAnalyzer
+from src.rules.loader import load_rules
+
+def test_known_combinations_are_served_from_the_table():
+    analyzer = PolicyAnalyzer(rules=load_rules())
+    table = analyzer.analysis_table()
+
+    first = analyzer.analyze_policies({"category": "collision", "relevant_policies": [], "confidence": 0.9})
+    second = analyzer.analyze_policies({"category": "collision", "relevant_policies": [], "confidence": 0.9})
+
+    assert ("collision", ("liability", "collision", "medical_payments")) in table.analyses
+    assert first is second
+    assert first["policy_details"] == {name: load_rules().policies[name]
+                                       for name in ("liability", "collision", "medical_payments")}
+
+def test_confidence_is_overlaid_on_shared_gaps():
+    analyzer = PolicyAnalyzer(rules=load_rules())
+
+    low = analyzer.analyze_policies({"category": "theft", "relevant_policies": ["liability"], "confidence": 0.4})
+    high = analyzer.analyze_policies({"category": "theft", "relevant_policies": ["liability"], "confidence": 0.8})
+
+    assert [r["confidence"] for r in low["recommendations"]] == [0.4]
+    assert [r["confidence"] for r in high["recommendations"]] == [0.8]
+    assert low["coverage_gaps"] is high["coverage_gaps"]
+
+def test_analyses_cannot_corrupt_the_catalog():
+    rules = load_rules()
+    analysis = PolicyAnalyzer(rules=rules).analyze_policies({"category": "theft", "relevant_policies": ["liability"]})
+
+    with pytest.raises(TypeError):
+        analysis["policy_details"]["liability"]["required"] = False
+    with pytest.raises(TypeError):
+        analysis["coverage_gaps"][0]["severity"] = "low"
+    assert rules.policies["liability"]["required"] is True
+
+def test_unknown_combinations_are_memoized_within_a_bound():
+    analyzer = PolicyAnalyzer(rules=load_rules())
+    table = analyzer.analysis_table()
+    key = ("vandalism", ("collision", "liability"))
+
+    analysis = analyzer.analyze_policies({"category": key[0], "relevant_policies": list(key[1])})
+
+    assert key not in table.analyses
+    assert table.get(*key) is table.get(*key)
+    assert analysis["coverage_gaps"] is table.get(*key)["coverage_gaps"]
+    assert table._build_memoized.cache_info().maxsize == settings.POLICY_ANALYSIS_MEMO_SIZE
@@ -0,0 +1,81 @@
+import io
+import json
+import random
+import pytest
+from src.services.portfolio_aggregation import PortfolioAggregator
+from src.utils.quantile_sketch import DDSketch
+
+def claim(category, risk_level, risk_score, median):
+    return {
+        "classification": {"category": category},
+        "risk_assessment": {
+            "risk_level": risk_level,
+            "risk_score": risk_score,
+            "financial_impact_estimate": {
+                "low_estimate": median * 0.7, "median_estimate": median, "high_estimate": median * 1.3
+            }
+        }
+    }
+
+def test_sketch_quantiles_stay_within_relative_accuracy():
+    values = [random.Random(3).lognormvariate(0, 1) for _ in range(20000)]
+    sketch = DDSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.01)
+
+def test_merged_shards_equal_a_single_pass():
+    rng = random.Random(5)
+    claims = [claim(rng.choice(["collision", "theft"]), rng.choice(["low", "high"]),
+                    round(rng.random(), 2), rng.uniform(500, 9000)) for _ in range(2000)]
+
+    whole = PortfolioAggregator().consume(claims)
+    shards = [PortfolioAggregator().consume(claims[i::3]) for i in range(3)]
+    # Partials travel between processes as JSON
+    merged = PortfolioAggregator.from_dict(json.loads(json.dumps(shards[0].to_dict())))
+    for shard in shards[1:]:
+        merged.merge(shard)
+
+    assert merged.report() == whole.report()
+    assert whole.report()["total"]["count"] == 2000
+
+def test_jsonl_and_case_history_rows():
+    stream = io.StringIO("\n".join([
+        json.dumps(claim("collision", "high", 0.7, 1000.0)),
+        json.dumps({"scenario_type": "theft", "risk_level": "low", "risk_score": 0.2, "financial_estimate": 500.0}),
+        "not json",
+        json.dumps({"scenario_type": "theft", "risk_level": "unknown", "risk_score": None})
+    ]))
+
+    report = PortfolioAggregator().consume_jsonl(stream).report()
+
+    assert report["total"]["count"] == 2
+    assert report["skipped"] == 2
+    assert report["by_category"]["theft"]["financial_impact_estimate"]["high_estimate"] == 650.0
+    assert report["by_risk_level"]["high"]["mean_risk_score"] == 0.7
+
+def test_malformed_records_are_skipped_not_raised():
+    good = claim("collision", "high", 0.7, 1000.0)
+    malformed = [
+        claim("collision", "high", float("nan"), 1000.0),
+        claim("collision", "high", float("inf"), 1000.0),
+        claim("collision", "high", True, 1000.0),
+        claim("collision", "high", 0.5, float("nan")),
+        {"scenario_type": "theft", "risk_score": 0.2, "financial_estimate": "n/a"},
+        {"scenario_type": "theft", "risk_score": 0.2, "financial_estimate": [500]},
+        {"classification": "x", "risk_assessment": good["risk_assessment"]},
+        {"classification": good["classification"], "risk_assessment": ["high"]},
+        "not a record"
+    ]
+
+    aggregator = PortfolioAggregator().consume([good] + malformed)
+
+    assert aggregator.skipped == len(malformed)
+    assert aggregator.report()["total"]["count"] == 1
+    # Unusable group keys fall back to "unknown" rather than failing
+    aggregator.add({"category": ["collision"], "risk_level": {}, "risk_score": 0.1, "financial_estimate": "500"})
+    assert aggregator.report()["by_category"]["unknown"]["count"] == 1
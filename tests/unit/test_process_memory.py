@@ -0,0 +1,10 @@
+import sys
+import pytest
+from src.utils.process_memory import read_memory
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_reads_own_memory_breakdown():
+    memory = read_memory()
+    assert memory["rss"] >= memory["uss"] > 0
+    assert memory["pss"] > 0
+    assert read_memory(2 ** 22 + 1) is None
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import pytest
+from src.utils import profiler
+
+def busy_loop(stop):
+    total = 0
+    while not stop.is_set():
+        total += 1
+        total -= 1
+    return total
+
+def spin(iterations):
+    total = 0
+    for i in range(iterations):
+        total += i
+    return total
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stop,), daemon=True)
+    thread.start()
+    yield
+    stop.set()
+    thread.join()
+
+def test_samples_fold_each_function_into_one_frame(busy_thread):
+    stacks = profiler.sample_stacks(0.2, interval=0.005)
+
+    label = f"busy_loop (test_profiler.py:{busy_loop.__code__.co_firstlineno})"
+    # Samples land on different lines of the loop, and in calls it makes, but
+    # the loop's own frame is the same in all of them
+    busy = {stack[:stack.index(label) + len(label)] for stack in stacks if label in stack}
+    assert len(busy) == 1
+    assert busy.pop().split(";")[0].startswith("_bootstrap ")
+
+@pytest.mark.asyncio
+async def test_event_loop_profile_uses_the_same_labels():
+    async def request():
+        await asyncio.sleep(0.02)
+        spin(200_000)
+
+    task = asyncio.ensure_future(request())
+    stacks = await profiler.profile_event_loop(0.1)
+    await task
+
+    label = f"spin (test_profiler.py:{spin.__code__.co_firstlineno})"
+    assert any(stack.endswith(f";{label}") for stack in stacks)
+    assert profiler.format_collapsed({"a;b": 1, "a": 3}) == "a 3\na;b 1"
+
+def test_one_capture_at_a_time():
+    profiler._capture_lock.acquire()
+    try:
+        with pytest.raises(profiler.ProfilerBusyError):
+            profiler.sample_stacks(0.1)
+    finally:
+        profiler._capture_lock.release()
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import pytest
+from src.classifiers.enhanced_scenario_classifier import EnhancedScenarioClassifier
+from src.registry import ComponentRegistry
+
+LLM_SECONDS = 0.3
+
+class SlowClient:
+    """Stands in for the OpenAI client: a synchronous call that waits on the network."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        time.sleep(LLM_SECONDS)
+        content = json.dumps({"category": "theft", "confidence": 0.9, "relevant_policies": ["comprehensive"]})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+@pytest.fixture
+def registry():
+    registry = ComponentRegistry()
+    yield registry
+    if registry._loop is not None:
+        registry._loop.call_soon_threadsafe(registry._loop.stop)
+
+def test_components_are_built_once(registry):
+    built = []
+
+    def factory():
+        built.append(threading.get_ident())
+        time.sleep(0.05)
+        return object()
+
+    with ThreadPoolExecutor(4) as pool:
+        components = list(pool.map(lambda _: registry.get("component", factory), range(4)))
+
+    assert len(built) == 1
+    assert all(component is components[0] for component in components)
+
+def test_llm_calls_do_not_hold_up_the_shared_loop(registry, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    classifier = EnhancedScenarioClassifier(use_cache=False, offline=False)
+    classifier.client = SlowClient()
+
+    # Four Flask threads each waiting on an LLM call made on the one shared loop
+    start = time.perf_counter()
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: registry.run(classifier._ml_classification("my car was stolen")), range(4)))
+    elapsed = time.perf_counter() - start
+
+    assert [result["category"] for result in results] == ["theft"] * 4
+    assert elapsed < 2 * LLM_SECONDS
+
+def test_run_refuses_the_loop_thread(registry):
+    async def nested():
+        return registry.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        registry.run(nested())
+    assert registry.run(asyncio.sleep(0, result="done")) == "done"
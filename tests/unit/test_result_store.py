@@ -0,0 +1,52 @@
+import sqlite3
+import pytest
+from src.results import FinancialImpact
+from src.services.result_store import ResultStore
+
+def results(case_id):
+    return {"case_id": case_id, "risk_assessment": {"financial_impact_estimate":
+            FinancialImpact(low_estimate=1.0, median_estimate=2.0, high_estimate=3.0)}}
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "results.db")
+
+def test_only_the_owner_reads_results():
+    store = ResultStore(max_entries=10, db_path="")
+    store.put("c1", results("c1"), user_id="alice")
+
+    assert store.get("c1", user_id="alice")["risk_assessment"]["financial_impact_estimate"]["currency"] == "USD"
+    assert store.get("c1", user_id="bob") is None
+    assert store.get("c1", user_id=None) is None
+    assert store.get("missing", user_id="alice") is None
+    with pytest.raises(ValueError):
+        store.put("c2", results("c2"), user_id=None)
+
+def test_memory_keeps_the_most_recently_used():
+    store = ResultStore(max_entries=2, db_path="")
+    store.put("c1", results("c1"), user_id="alice")
+    store.put("c2", results("c2"), user_id="alice")
+    store.get("c1", user_id="alice")
+    store.put("c3", results("c3"), user_id="alice")
+
+    assert list(store._entries) == ["c1", "c3"]
+    assert store.get("c2", user_id="alice") is None
+
+def test_evicted_results_are_read_back_from_sqlite(db_path):
+    store = ResultStore(max_entries=1, db_path=db_path)
+    store.put("c1", results("c1"), user_id="alice")
+    store.put("c2", results("c2"), user_id="alice")
+
+    assert "c1" not in store._entries
+    assert store.get("c1", user_id="alice")["case_id"] == "c1"
+    assert store.get("c1", user_id="bob") is None
+    # Another worker's store over the same database
+    assert ResultStore(max_entries=1, db_path=db_path).get("c2", user_id="alice")["case_id"] == "c2"
+
+def test_rows_without_an_owner_are_visible_to_nobody(db_path):
+    store = ResultStore(max_entries=10, db_path=db_path)
+    payload = ResultStore.serialize(results("legacy"))
+    with sqlite3.connect(db_path) as db:
+        db.execute("INSERT INTO analysis_results VALUES ('legacy', NULL, 0, ?)", (payload,))
+
+    assert store.get("legacy", user_id="alice") is None
@@ -0,0 +1,72 @@
+import copy
+import json
+import pickle
+import pytest
+from src.policy_analyzer import PolicyAnalyzer
+from src.recommendation_engine import RecommendationEngine
+from src.results import FinancialImpact, Recommendation, RiskAssessment, to_json, to_plain
+from src.risk_assessor import RiskAssessor
+from src.rules.loader import load_rules
+
+TEXT = "I rear-ended a car at a red light while speeding in the rain"
+CLASSIFICATION = {"category": "collision", "confidence": 0.8, "relevant_policies": []}
+
+@pytest.mark.asyncio
+async def test_risk_assessment_reads_like_a_dict():
+    assessment = await RiskAssessor(rules=load_rules()).assess_risk(CLASSIFICATION, TEXT)
+
+    assert isinstance(assessment, RiskAssessment)
+    assert not hasattr(assessment, "__dict__")
+    assert assessment["risk_level"] == assessment.risk_level
+    assert assessment.get("financial_impact_estimate", {}).get("currency") == "USD"
+    # Optional fields are absent while unset, as the dict left them out
+    assert "loss_distribution" not in assessment
+    assert assessment.get("loss_distribution") is None
+    assert assessment == json.loads(assessment.to_json())
+
+def test_policy_details_read_the_catalog():
+    rules = load_rules()
+    analysis = PolicyAnalyzer(rules=rules).analyze_policies({"category": "theft", "relevant_policies": []})
+
+    assert analysis["primary_coverage"] == "comprehensive"
+    assert analysis["policy_details"] == {"comprehensive": rules.policies["comprehensive"]}
+    with pytest.raises(AttributeError):
+        analysis.primary_coverage = "liability"
+
+def test_to_json_matches_plain_json():
+    impact = FinancialImpact(low_estimate=700.0, median_estimate=1000.0, high_estimate=1300.0)
+    results = {"estimates": [impact], "pair": (impact, None)}
+
+    assert json.loads(to_json(results)) == to_plain(results)
+    assert to_plain(impact) == {"low_estimate": 700.0, "median_estimate": 1000.0,
+                                "high_estimate": 1300.0, "currency": "USD"}
+
+@pytest.mark.asyncio
+async def test_results_copy_and_pickle():
+    rules = load_rules()
+    assessment = await RiskAssessor(rules=rules).assess_risk(CLASSIFICATION, TEXT)
+    analysis = PolicyAnalyzer(rules=rules).analyze_policies(CLASSIFICATION, {"coverages": ["liability"]})
+    recommendations = await RecommendationEngine(rules=rules).generate_recommendations(
+        CLASSIFICATION, analysis, assessment)
+
+    assert copy.copy(assessment) is assessment
+    for result in (assessment, analysis, recommendations):
+        for duplicate in (copy.deepcopy(result), pickle.loads(pickle.dumps(result))):
+            assert duplicate == result and type(duplicate) is type(result)
+    # A deep copy owns its plain dicts
+    copy.deepcopy(assessment).risk_factors["vehicle_speed"] = None
+    assert assessment.risk_factors["vehicle_speed"] is True
+    assert type(pickle.loads(pickle.dumps(analysis)).coverage_gaps[0]) is type(analysis.coverage_gaps[0])
+
+@pytest.mark.asyncio
+async def test_recommendations_are_shared_immutable_records():
+    engine = RecommendationEngine(rules=load_rules())
+    args = (CLASSIFICATION, {"policy_details": {"liability": {}}}, {"risk_level": "high", "identified_factors": []})
+
+    recommendations = await engine.generate_recommendations(*args)
+
+    assert recommendations and all(isinstance(rec, Recommendation) for rec in recommendations)
+    assert recommendations[0]["id"] == "REC-collision-1"
+    with pytest.raises(TypeError):
+        recommendations[0]["details"]["changed"] = True
+    assert await engine.generate_recommendations(*args) is recommendations
@@ -0,0 +1,47 @@
+import copy
+import itertools
+import pytest
+from src.risk_assessor import RiskAssessor, RISK_LEVELS
+from src.rules.loader import RuleSet, load_rules
+
+SCENARIOS = [
+    ({"category": "collision", "confidence": 0.8}, "I was speeding in the rain and caused a crash, my passenger is hurt"),
+    ({"category": "parking_damage", "confidence": 0.6}, "Extensive dent on my car in the parking lot"),
+    ({"category": "theft", "confidence": 0.7}, "My car was stolen in a high crime neighborhood"),
+    ({"category": "mystery", "confidence": 0.5}, "Something odd happened")
+]
+
+@pytest.mark.asyncio
+async def test_batch_matches_single_assessments():
+    assessor = RiskAssessor()
+
+    single = [await assessor.assess_risk(c, text) for c, text in SCENARIOS]
+    batch = assessor.assess_risk_batch([c for c, _ in SCENARIOS], [text for _, text in SCENARIOS])
+
+    assert batch == single
+
+def test_scores_match_scalar_path_at_every_threshold():
+    assessor = RiskAssessor()
+    categories, factors = [], []
+    for category in [*assessor.base_risk_scores, "mystery"]:
+        for n in range(len(assessor.rule_set.factor_order) + 1):
+            for subset in itertools.combinations(assessor.rule_set.factor_order, n):
+                categories.append(category)
+                factors.append(dict.fromkeys(subset, True))
+
+    scores = assessor.score_batch(categories, factors)
+
+    for i, (category, risk_factors) in enumerate(zip(categories, factors)):
+        expected = assessor._apply_risk_modifiers(assessor._calculate_base_risk(category), category, risk_factors)
+        assert scores["risk_score"][i] == expected
+        assert RISK_LEVELS[scores["risk_level"][i]] == assessor._determine_risk_level(expected)
+
+def test_rescoring_picks_up_weight_changes():
+    before = RiskAssessor().score_batch(["theft"], [{"high_crime_area": True}])
+
+    sources = copy.deepcopy(load_rules().sources)
+    sources["risk"]["weights"]["theft"]["high_crime_area"] = 3.0
+    after = RiskAssessor(rules=RuleSet(sources)).score_batch(["theft"], [{"high_crime_area": True}])
+
+    assert after["risk_score"][0] > before["risk_score"][0]
+    assert after["median_estimate"][0] > before["median_estimate"][0]
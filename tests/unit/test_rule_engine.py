@@ -0,0 +1,69 @@
+import json
+import pytest
+from src.rules.engine import DecisionTable, FactIndex, RuleError, compile_rule
+from src.rules.loader import load_rules, RuleSet
+from src.recommendation_engine import RecommendationEngine
+
+def test_decision_table_matches_rule_by_rule_evaluation():
+    facts = FactIndex()
+    rules = [
+        compile_rule({"when": {"all": ["a"], "none": ["b"]}, "then": "a-not-b"}, facts),
+        compile_rule({"when": {"category": ["x"], "any": [["b", "c"], ["d"]]}, "then": "x-bc-d"}, facts),
+        compile_rule({"when": {"risk_level": ["high"]}, "then": "high"}, facts)
+    ]
+    # One eager cell, one lazily memoized one
+    for max_eager_bits in (10, 0):
+        table = DecisionTable(rules, categories=["x"], risk_levels=["high", None], max_eager_bits=max_eager_bits)
+        for category in ("x", "y"):
+            for risk_level in ("high", None):
+                for mask in range(1 << len(facts.bits)):
+                    expected = tuple(rule.payload for rule in rules
+                                     if (rule.categories is None or category in rule.categories)
+                                     and (rule.risk_levels is None or risk_level in rule.risk_levels)
+                                     and rule.matches(mask))
+                    assert table.lookup(category, risk_level, mask) == expected
+
+def test_unknown_conditions_are_rejected():
+    with pytest.raises(RuleError):
+        compile_rule({"when": {"sometimes": ["a"]}, "then": {}}, FactIndex())
+    with pytest.raises(RuleError):
+        compile_rule({"when": {"all": ["a"]}}, FactIndex())
+
+def test_unsupported_format_is_rejected():
+    sources = json.loads(json.dumps(load_rules().sources))
+    sources["risk"]["format"] = 99
+    with pytest.raises(RuleError):
+        RuleSet(sources)
+
+def test_risk_levels_select_their_recommendation_rules():
+    engine = RecommendationEngine()
+    classification = {"category": "collision"}
+    policy_analysis = {"policy_details": {"liability": {}}}
+
+    high = engine._get_rule_based_recommendations(classification, policy_analysis, {"risk_level": "very_high"})
+    low = engine._get_rule_based_recommendations(classification, policy_analysis, {"risk_level": "low"})
+
+    assert [(r["action"], r["policy"], r["priority"]) for r in high] == [
+        ("increase_coverage", "liability", "high"), ("add_coverage", "uninsured_motorist", "high")]
+    assert [(r["action"], r["policy"], r["priority"]) for r in low] == [("maintain_coverage", "liability", "low")]
+
+def test_results_are_copies_of_the_shared_tables():
+    engine = RecommendationEngine()
+    args = ({"category": "collision"}, {"policy_details": {}}, {"risk_level": "high"})
+
+    engine._get_rule_based_recommendations(*args)[0]["details"]["min_amount"] = "changed"
+
+    assert engine._get_rule_based_recommendations(*args)[0]["details"]["min_amount"] == "$100,000/$300,000"
+
+@pytest.mark.asyncio
+async def test_cached_recommendations_follow_the_policies_held():
+    engine = RecommendationEngine()
+    engine.cache.clear()
+    classification = {"category": "collision"}
+    risk_assessment = {"risk_level": "high", "identified_factors": []}
+
+    await engine.generate_recommendations(classification, {"policy_details": {"liability": {}}}, risk_assessment)
+    held_both = await engine.generate_recommendations(
+        classification, {"policy_details": {"liability": {}, "uninsured_motorist": {}}}, risk_assessment)
+
+    assert [r["policy"] for r in held_both] == ["liability"]
@@ -0,0 +1,74 @@
+import json
+import shutil
+import pytest
+from src.config.settings import settings
+from src.recommendation_engine import RecommendationEngine
+from src.rules import loader
+from src.rules.loader import RuleError, RuleStore, current_rules, pin_rules, rule_store
+
+@pytest.fixture
+def rules_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "rules"
+    shutil.copytree(settings.RULES_DIR, directory)
+    monkeypatch.setattr(settings, "RULES_DIR", str(directory))
+    monkeypatch.setattr(settings, "RULES_SNAPSHOT", str(tmp_path / "rules.snapshot"))
+    # Stores of the temporary directory stay out of the process-wide ones
+    monkeypatch.setattr(loader, "_stores", {})
+    return directory
+
+def edit(rules_dir, name, change):
+    path = rules_dir / f"{name}.json"
+    rules = json.loads(path.read_text())
+    change(rules)
+    path.write_text(json.dumps(rules))
+
+def test_reload_swaps_in_a_new_snapshot(rules_dir):
+    store = RuleStore(str(rules_dir))
+    before = store.current
+
+    assert store.reload()["reloaded"] is False
+    edit(rules_dir, "risk", lambda rules: rules["weights"]["theft"].update(high_crime_area=0.9))
+    summary = store.reload()
+
+    assert summary["changed_files"] == ["risk"]
+    assert store.current is not before
+    assert store.current.risk_factors["theft"]["high_crime_area"] == 0.9
+    assert before.risk_factors["theft"]["high_crime_area"] == 0.8
+
+def test_invalid_rules_keep_the_current_snapshot(rules_dir):
+    store = RuleStore(str(rules_dir))
+    before = store.current
+
+    (rules_dir / "policies.json").write_text("{not json")
+    with pytest.raises(RuleError):
+        store.reload()
+
+    assert store.current is before
+
+def test_pinned_requests_finish_on_their_snapshot(rules_dir):
+    with pin_rules() as pinned:
+        edit(rules_dir, "classification", lambda rules: rules["categories"]["theft"]["keywords"].append("burgled"))
+        rule_store().reload()
+        assert current_rules() is pinned
+
+    assert current_rules() is not pinned
+    assert "burgled" in current_rules().categories["theft"]["keywords"]
+
+@pytest.mark.asyncio
+async def test_caches_only_drop_entries_of_changed_rules(rules_dir):
+    engine = RecommendationEngine()
+    args = ({"category": "theft"}, {"policy_details": {}}, {"risk_level": "high"})
+    await engine.generate_recommendations(*args)
+    cached = dict(engine.cache._cache)
+
+    # Classification keywords do not affect recommendations
+    edit(rules_dir, "classification", lambda rules: rules["categories"]["theft"]["keywords"].append("burgled"))
+    rule_store().reload()
+    await engine.generate_recommendations(*args)
+    assert engine.cache._cache == cached
+
+    edit(rules_dir, "recommendations", lambda rules: rules["rules"][0]["then"].update(reason="Changed"))
+    rule_store().reload()
+    await engine.generate_recommendations(*args)
+    assert not set(engine.cache._cache) & set(cached)
+    assert len(engine.cache._cache) == 1
@@ -0,0 +1,42 @@
+import shutil
+from src.config.settings import settings
+from src.rules.loader import RuleSet, RuleStore, build_snapshot, read_rule_files
+
+def test_snapshot_restores_the_compiled_rules(tmp_path):
+    snapshot = tmp_path / "rules.snapshot"
+    compiled = build_snapshot(settings.RULES_DIR, str(snapshot))
+
+    restored = RuleStore(settings.RULES_DIR, str(snapshot)).current
+
+    assert restored.fingerprint == compiled.fingerprint
+    for name in RuleSet.TABLES:
+        table = getattr(restored, name)
+        for category, risk_level in getattr(compiled, name)._cells:
+            for facts in range(1 << 10):
+                assert table.lookup(category, risk_level, facts) == \
+                    getattr(compiled, name).lookup(category, risk_level, facts)
+
+def test_store_writes_the_snapshot_it_falls_back_from(tmp_path, monkeypatch):
+    snapshot = tmp_path / "rules.snapshot"
+    RuleStore(settings.RULES_DIR, str(snapshot))
+    assert snapshot.exists()
+
+    # The second store maps the snapshot instead of compiling
+    monkeypatch.setattr(RuleSet, "__init__", None)
+    assert RuleStore(settings.RULES_DIR, str(snapshot)).current.risk_factors
+
+def test_stale_or_corrupt_snapshots_fall_back_to_the_rule_files(tmp_path):
+    rules_dir = tmp_path / "rules"
+    shutil.copytree(settings.RULES_DIR, rules_dir)
+    snapshot = tmp_path / "rules.snapshot"
+    build_snapshot(str(rules_dir), str(snapshot))
+
+    path = rules_dir / "risk.json"
+    path.write_text(path.read_text().replace('"theft": 0.7', '"theft": 0.75'))
+    assert RuleStore(str(rules_dir), str(snapshot)).current.base_risk_scores["theft"] == 0.75
+
+    data = bytearray(snapshot.read_bytes())
+    data[-10] ^= 0xFF
+    snapshot.write_bytes(bytes(data))
+    assert RuleStore(str(rules_dir), str(snapshot)).current.fingerprint == \
+        RuleSet(read_rule_files(str(rules_dir))).fingerprint
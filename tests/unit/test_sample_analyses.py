@@ -0,0 +1,43 @@
+from src.services.sample_analyses import SampleAnalysisCache
+
+class FakePipeline:
+    def __init__(self):
+        self.calls = 0
+        self.rules = "v1"
+
+    def rules_fingerprint(self):
+        return self.rules
+
+    async def analyze(self, scenario_text, include_recommendations=True):
+        self.calls += 1
+        return {
+            "classification": {"category": "collision", "text": scenario_text},
+            "policy_analysis": {}, "risk_assessment": {}, "explanation": {},
+            "recommendations": None
+        }
+
+SCENARIOS = [{"title": "A", "text": "first scenario"}, {"title": "B", "text": "second scenario"}]
+
+def test_refresh_only_when_rules_change(tmp_path):
+    pipeline = FakePipeline()
+    cache = SampleAnalysisCache(pipeline, SCENARIOS, snapshot_path=str(tmp_path / "samples.json"))
+
+    assert cache.get(0) is None
+    assert cache.refresh() is True
+    assert cache.get(1)["classification"]["text"] == "second scenario"
+    assert cache.refresh() is False
+
+    pipeline.rules = "v2"
+    assert cache.refresh() is True
+    assert pipeline.calls == 4
+
+def test_snapshot_is_reused_across_restarts(tmp_path):
+    path = str(tmp_path / "samples.json")
+    SampleAnalysisCache(FakePipeline(), SCENARIOS, snapshot_path=path).refresh()
+
+    pipeline = FakePipeline()
+    cache = SampleAnalysisCache(pipeline, SCENARIOS, snapshot_path=path)
+    cache._load_snapshot()
+    assert cache.get(0)["classification"]["text"] == "first scenario"
+    assert cache.refresh() is False
+    assert pipeline.calls == 0
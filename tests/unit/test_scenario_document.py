@@ -0,0 +1,39 @@
+import pytest
+from src.classifiers.enhanced_scenario_classifier import EnhancedScenarioClassifier
+from src.risk_assessor import RiskAssessor
+from src.rules.loader import load_rules
+from src.scenario_document import ScenarioDocument
+
+TEXT = "I rear-ended a car at the  light while speeding in the rain; my fault"
+
+def test_document_is_validated_and_slotted():
+    document = ScenarioDocument.parse(TEXT)
+
+    assert document.text == " ".join(TEXT.split())
+    assert document.length == len(document.text)
+    assert document.lower == document.text.lower()
+    assert not hasattr(document, "__dict__")
+
+    with pytest.raises(ValueError):
+        ScenarioDocument.parse("short")
+
+def test_term_mask_covers_classification_and_risk_terms():
+    rules = load_rules()
+    mask = ScenarioDocument.parse(TEXT).term_mask(rules)
+
+    assert {term for term, bit in rules.terms.bits.items() if mask & bit} >= \
+        {"rear-ended", "speeding", "rain", "my fault", "fault"}
+    assert not mask & rules.terms.bits["hail"]
+
+@pytest.mark.asyncio
+async def test_stages_share_one_scan(monkeypatch):
+    rules = load_rules()
+    scans = []
+    monkeypatch.setattr(type(rules), "term_mask", lambda self, text: scans.append(text) or 0)
+
+    document = ScenarioDocument.parse(TEXT)
+    classifier = EnhancedScenarioClassifier(use_cache=False, offline=True, rules=rules)
+    classification = await classifier.classify_scenario(document)
+    await RiskAssessor(rules=rules).assess_risk(classification, document)
+
+    assert scans == [document.lower]
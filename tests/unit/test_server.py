@@ -0,0 +1,95 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import serve
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+PROBE = """
+import gc, json
+from fastapi.testclient import TestClient
+import asgi, serve
+
+app = serve.preload()
+with TestClient(app) as client:
+    health = client.get("/api/v1/health")
+    login = client.get("/login")
+    docs = client.get("/api/docs")
+print(json.dumps({
+    "same_app": app is asgi.app,
+    "frozen": gc.get_freeze_count() > 0,
+    "health": [health.status_code, health.json()["status"]],
+    "login": [login.status_code, login.headers["content-type"]],
+    "docs": docs.status_code
+}))
+"""
+
+def test_preloaded_app_serves_api_and_falls_through_to_flask(tmp_path):
+    env = dict(os.environ,
+               OPENAI_API_KEY="test-key",
+               SAMPLE_ANALYSIS_PRECOMPUTE="false",
+               CASE_HISTORY_DB=str(tmp_path / "case_history.db"),
+               TEMPLATE_BYTECODE_CACHE_DIR=str(tmp_path / "jinja_cache"),
+               STATIC_BUILD_DIR=str(tmp_path / "static"))
+
+    completed = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True,
+                               env=env, check=True, cwd=ROOT)
+    result = json.loads(completed.stdout.splitlines()[-1])
+
+    assert result["same_app"] and result["frozen"]
+    assert result["health"] == [200, "healthy"]
+    assert result["login"][0] == 200 and result["login"][1].startswith("text/html")
+    assert result["docs"] == 200
+
+def test_memory_report_covers_master_and_workers():
+    report = serve.memory_report({os.getpid()})
+
+    assert report["master"]["pid"] == os.getpid()
+    assert [worker["pid"] for worker in report["workers"]] == [os.getpid()]
+    assert report["mean_worker_uss_mb"] > 0
+
+    assert serve.memory_report({2 ** 22 + 1})["workers"] == [None]
+
+WORKER_PROBE = """
+import os, signal, sys, time
+import uvicorn
+import serve
+from src.api.main import app
+from src.config.settings import settings
+from src.registry import registry
+
+# Nothing reaches the database unless the worker flushes on its way out
+settings.CASE_HISTORY_BATCH_SIZE = 1000
+settings.CASE_HISTORY_FLUSH_INTERVAL = 3600
+ready = sys.argv[1]
+
+async def record_case():
+    registry.case_history.record({"case_id": "case-1", "user_id": "user1", "created_at": "2025-03-01T00:00:00",
+                                  "date": "2025-03-01", "scenario_type": "theft", "risk_level": "low",
+                                  "status": "analyzed"})
+    open(ready, "w").close()
+
+app.router.on_startup.append(record_case)
+config = uvicorn.Config(app, host="127.0.0.1", port=0, lifespan="on", log_level="warning")
+sock = config.bind_socket()
+pid = serve.spawn_worker(config, sock, False)
+deadline = time.time() + 20
+while not os.path.exists(ready) and time.time() < deadline:
+    time.sleep(0.05)
+os.kill(pid, signal.SIGTERM)
+os.waitpid(pid, 0)
+"""
+
+def test_stopped_worker_flushes_queued_cases(tmp_path):
+    db = tmp_path / "case_history.db"
+    env = dict(os.environ, OPENAI_API_KEY="test-key", CASE_HISTORY_DB=str(db),
+               SLOW_REQUEST_LOG_PATH=str(tmp_path / "slow.jsonl"))
+
+    subprocess.run([sys.executable, "-c", WORKER_PROBE, str(tmp_path / "ready")], capture_output=True,
+                   text=True, env=env, check=True, cwd=ROOT, timeout=60)
+
+    assert (tmp_path / "ready").exists()
+    with sqlite3.connect(db) as connection:
+        assert connection.execute("SELECT case_id FROM case_history").fetchall() == [("case-1",)]
@@ -0,0 +1,18 @@
+import gzip
+from src.services.static_assets import StaticAssetBuilder
+
+def test_assets_are_fingerprinted_and_precompressed(tmp_path):
+    source = tmp_path / "static"
+    (source / "css").mkdir(parents=True)
+    (source / "css" / "app.css").write_text("body { color: red; }")
+    builder = StaticAssetBuilder(str(source), str(source / "build"))
+
+    fingerprinted = builder.build()["css/app.css"]
+    assert fingerprinted.startswith("css/app.") and fingerprinted.endswith(".css")
+    assert builder.build() == {"css/app.css": fingerprinted}
+
+    path, encoding = builder.resolve(fingerprinted, "gzip, deflate")
+    assert encoding == "gzip"
+    assert gzip.decompress(open(path, "rb").read()) == b"body { color: red; }"
+    assert builder.resolve(fingerprinted)[1] is None
+    assert builder.resolve("../../etc/passwd") == (None, None)
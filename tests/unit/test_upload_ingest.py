@@ -0,0 +1,23 @@
+import io
+from src.config.settings import settings
+from src.services.upload_ingest import UploadIngestService
+
+def test_identical_uploads_are_stored_once(tmp_path):
+    service = UploadIngestService(str(tmp_path), chunk_size=4)
+    first = service.save(io.BytesIO(b"the other driver ran the light"), "statement.txt")
+    second = service.save(io.BytesIO(b"the other driver ran the light"), "copy.txt")
+
+    assert first["sha256"] == second["sha256"]
+    assert first["path"] == second["path"]
+    assert not first["duplicate"] and second["duplicate"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"{first['sha256']}.txt"]
+    assert service.extract_text(first) == "the other driver ran the light"
+    service.shutdown()
+
+def test_extracted_text_respects_scenario_limit():
+    scenario_text = "x" * (settings.SCENARIO_MAX_CHARS - 100)
+    combined = UploadIngestService.append_within_budget(scenario_text, "word " * 1000, "Header:")
+
+    assert combined.startswith(scenario_text + "\n\nHeader:\n")
+    assert len(combined) <= settings.SCENARIO_MAX_CHARS
+    assert not combined.endswith(" ")